@@ -18,14 +18,22 @@
 #       MA 02110-1301, USA.
 
 import os.path
-from xdg import BaseDirectory
+import copy
 import gettext
 
 import logging
-import argparse
 
 from .utils import Utils
-from .item import Item
+from .item import Item, ModuleItem
+from .cache import DesktopEntryCache
+from .registry import ItemRegistry
+from .triage import TriagePipeline, TriageFilter
+from .modules_manager import ModulesManager
+from .profiler import Profiler
+from .settings import SETTINGS, SETTINGS_BY_KEY, get_invalidated
+from .categories import CategoryTable
+from .executables import ExecutableIndex
+from .launcher import Launcher, get_exec_program
 
 _ = gettext.gettext
 
@@ -37,50 +45,66 @@ class Main(Utils):
     def __init__(self):
         Utils.__init__(self)
 
-        self.version_config = 0.1
+        # Timings and counters of the startup, see --profile
+        self.profiler = Profiler()
+        # Construction only sets the defaults, settings and items are loaded by load()
+        self.loaded = False
+
         self.settings_path = None
         self.loglevel_args = None
         self.logfile_args = None
-        # TODO Use a dict {"path": item} for fast searching
-        self.items = []
+        self.no_cache_args = False
+        self.rebuild_cache_args = False
+        self.strict_parser_args = False
+        self.profile_args = None
+        self.profile_dump_args = None
+        self.daemon_args = False
+        self.no_daemon_args = False
+        # Connection to the daemon serving the items, None when items are scanned in process
+        self.daemon_client = None
+        # Generation of the items of the daemon, see update_items_from_daemon
+        self.daemon_generation = 0
+        self.desktop_cache = None
+        # Maximum number of directories scanned in parallel
+        self.scan_threads_max = 4
+        self.item_registry = ItemRegistry()
+        self.triage = None
+        # Executables of PATH, for TryExec and Exec
+        self.executables = ExecutableIndex()
+        # Applications launched, see launch_item
+        self.launcher = Launcher(self.executables, self.profiler)
+        # Delay (in s) between the checks of the applications launched, without a child watch
+        self.children_poll_delay = 1.0
+        # Applications desactivated by a module, see apply_modules_replace_applications
+        self.replaced_paths = set()
+        # Compiled categories_triaged, see categories_triaged_generate
+        self.category_table = None
+        self.category_table_applied = None
+        self.watcher = None
+        # Delay without events before applying changes of watched directories
+        self.watcher_debounce = 0.5
+        # Directory of applications_path or modules_path not existing => its nearest existing parent, watched instead
+        self.missing_directories = {}
         self.desktop_environments = []
-        self.trigger_save_settings_file = False
+        # Settings file as read by load_settings, updated by save_settings
+        self.settings_keyfile = None
+        # (group, key) changed in settings_keyfile and not yet written
+        self.settings_changed = set()
+        # Delay (in ms) before writing the settings changed by set_setting, to write once for several changes
+        self.settings_autosave_delay = 2000
+        self.settings_autosave_pending = False
         self.module_activated = None
+        self.modules_manager = None
         self.toolkit = None
 
-        self.keyword_categories_settings_list_default = [   "Settings",
-													        "System",
-													        "DesktopSettings",
-                                                            "X-LXDE-Settings",
-                                                            "X-GNOME-Settings-Panel",
-													        "X-GNOME-PersonalSettings",
-													        "X-XFCE-SettingsDialog",
-												            "X-XFCE-HardwareSetting"]
-        self.keyword_categories_settings_list = self.keyword_categories_settings_list_default
-
-        self.desktop_environments_setting_default = ["Auto"]
-        self.desktop_environments_setting = self.desktop_environments_setting_default
-
-        self.version_config_default = 0.1
-        self.version_config = self.version_config_default
-
-        self.modules_support_default = True
-        self.modules_support = self.modules_support_default
-
-        self.applications_support_default = True
-        self.applications_support = self.applications_support_default
-
-        # Order by importance (first read take advantage)
-        self.applications_path_default = ["/usr/share/applications", ";"]
-        self.applications_path = self.applications_path_default
-
-        self.modules_path_default = [   "/usr/lib/lx-control-center",
-                                        "/usr/share/lx-control-center",
-                                        "LXControlCenter/modules/"]
-        self.modules_path = self.modules_path_default
-
-        self.categories_fixed_default = False
-        self.categories_fixed = self.categories_fixed_default
+        # Settings of settings.conf, with the attribute + "_default" for their default value, see settings.SETTINGS
+        for setting in SETTINGS:
+            setattr(self, setting.attribute + "_default", copy.copy(setting.default))
+            setattr(self, setting.attribute, copy.copy(setting.default))
+        self.window_title_default = _("LX-Control-Center")
+        self.window_title = self.window_title_default
+        # Functions called with the settings keys changed by set_setting, as (group, key), and the derived state invalidated
+        self.settings_subscribers = []
 
         self.categories_keys_default = {    _("DesktopSettings"):("DesktopSettings"),
                                             _("HardwareSettings"):("HardwareSettings"),
@@ -95,76 +119,88 @@ class Main(Utils):
 
         self.categories_triaged = {}
         self.categories_triaged_generate()
-        
-        # UI - View
-        self.window_size_w_default = 800
-        self.window_size_w = self.window_size_w_default
-
-        self.window_size_h_default = 600
-        self.window_size_h = self.window_size_h_default
-
-        self.window_icon_default = "preferences-system"
-        self.window_icon = self.window_icon_default
-
-        self.window_title_default = _("LX-Control-Center")
-        self.window_title = self.window_title_default
-
-        self.icon_view_columns_default = 5
-        self.icon_view_columns = self.icon_view_columns_default
-
-        self.icon_view_icons_size_default = 32
-        self.icon_view_icons_size = self.icon_view_icons_size_default
-
-        self.icon_not_theme_allow_default = False
-        self.icon_not_theme_allow = self.icon_not_theme_allow_default
-
-        self.icon_force_size_default = True
-        self.icon_force_size = self.icon_force_size_default
 
-        self.icon_fallback_default = "gtk-stop"
-        self.icon_fallback = self.icon_fallback_default
+    @property
+    def items(self):
+        """ Registry of the items, loaded on first access"""
+        if (self.loaded == False):
+            self.load()
+        return self.item_registry
 
-        self.view_mode_default = "icons-all"
-        self.view_mode = self.view_mode_default
-
-        self.view_visual_effects_default = False
-        self.view_visual_effects = self.view_visual_effects_default
+    def load(self, args=None):
+        """ Parse args (default sys.argv), read the settings, scan applications and modules, and triage them.
+            Only the first call does something."""
+        if (self.loaded == True):
+            return
+        self.loaded = True
 
         # Parse command line arguments
-        self.get_args_parameters()
+        with self.profiler.phase("parse_arguments"):
+            self.get_args_parameters(args)
 
         # Enable log
         self.set_log()
+        self.profiler.configure(self.profile_args, self.profile_dump_args)
 
         # Function to launch at startup
-        self.load_configuration_file()
-        self.load_settings()
-
-        self.load_all_applications()
-        self.load_all_modules()
+        with self.profiler.phase("load_configuration_file"):
+            self.load_configuration_file()
+        with self.profiler.phase("load_settings"):
+            self.load_settings()
+
+        self.load_modules_manager()
+        if (self.connect_daemon() == True):
+            with self.profiler.phase("load_items_from_daemon"):
+                self.load_items_from_daemon()
+        else:
+            with self.profiler.phase("load_desktop_cache"):
+                self.load_desktop_cache()
+            with self.profiler.phase("load_all_applications"):
+                self.load_all_applications()
+            with self.profiler.phase("load_all_modules"):
+                self.load_all_modules()
+            with self.profiler.phase("save_desktop_cache"):
+                self.save_desktop_cache()
         self.desktop_environments_generate()
+        self.triage_filters_generate()
 
         # Desactivate items
-        self.triage_items()
+        with self.profiler.phase("triage_items"):
+            self.triage_items()
 
         # Debug if enable
         self.print_debug()
 
     def triage_items(self):
-        self.apply_applications_modules_suport()
-        self.apply_desktop_env_sort()
-        self.apply_try_exec_test()
-        self.apply_no_exec_applications()
-        self.apply_module_toolkit()
-        self.apply_items_categories()
-
-    def get_args_parameters(self):
+        """ Activate or desactivate items. Only the items affected by a change since the last triage are evaluated"""
+        self.executables.refresh()
+        evaluated = self.triage.run(self.items)
+        self.profiler.count("items_triaged", len(evaluated))
+        self.apply_modules_replace_applications()
+        self.apply_items_categories(evaluated)
+
+    def get_args_parameters(self, args=None):
+        import argparse
         parser = argparse.ArgumentParser(description='Launch LX Control Center')
         parser.add_argument('-l', '--log', help='Set log level (values available : WARNING, INFO or DEBUG)')
         parser.add_argument('-f', '--logfile', help='Set log file to write logs')
-        args = parser.parse_args()
+        parser.add_argument('--no-cache', action='store_true', help='Do not use the cache of desktop files')
+        parser.add_argument('--rebuild-cache', action='store_true', help='Discard and rebuild the cache of desktop files')
+        parser.add_argument('--strict-parser', action='store_true', help='Parse desktop files with pyxdg instead of the fast reader')
+        parser.add_argument('--profile', metavar='FILE', help='Write timings and counters of the startup as JSON in FILE (or set LXCC_PROFILE)')
+        parser.add_argument('--daemon', action='store_true', help='Run the daemon keeping the items loaded for the frontends (lx-control-center --daemon)')
+        parser.add_argument('--no-daemon', action='store_true', help='Scan the items in process, even if the daemon is running')
+        parser.add_argument('--profile-dump', metavar='FILE', help='Write a cProfile dump of the startup in FILE (or set LXCC_PROFILE_DUMP)')
+        args = parser.parse_args(args)
         self.loglevel_args =  args.log
         self.logfile_args =  args.logfile
+        self.no_cache_args = args.no_cache
+        self.rebuild_cache_args = args.rebuild_cache
+        self.strict_parser_args = args.strict_parser
+        self.profile_args = args.profile
+        self.profile_dump_args = args.profile_dump
+        self.daemon_args = args.daemon
+        self.no_daemon_args = args.no_daemon
 
     def set_log(self):
         """ Set log level by parsing"""
@@ -181,6 +217,7 @@ class Main(Utils):
     def load_configuration_file (self):
         """ Set configuration path to self.settings_path"""
 
+        from xdg import BaseDirectory
         config_dirs = BaseDirectory.xdg_config_dirs
 
         for path in config_dirs:
@@ -200,15 +237,20 @@ class Main(Utils):
             self.load_configuration_file ()
 
         keyfile = self.load_inifile(self.settings_path)
+        self.settings_keyfile = keyfile
+        self.settings_changed = set()
 
         if (keyfile):
-            # Configuration
-            self.keyword_categories_settings_list = self.load_setting(keyfile, "Configuration", "desktop_categories", self.keyword_categories_settings_list_default, "list")
-            self.desktop_environments_setting = self.load_setting(keyfile, "Configuration", "desktop_environments", self.desktop_environments_setting_default, "list")
-            self.version_config = self.load_setting(keyfile, "Configuration", "version_config", self.version_config_default, "float")
-            self.modules_support = self.load_setting(keyfile, "Configuration", "modules_support", self.modules_support_default, "boolean")
-            self.applications_support = self.load_setting(keyfile, "Configuration", "applications_support", self.applications_support_default, "boolean")
-            self.categories_fixed = self.load_setting(keyfile, "Configuration", "categories_fixed", self.categories_fixed_default, "boolean")
+            for setting in SETTINGS:
+                default = getattr(self, setting.attribute + "_default")
+                try:
+                    value = self.load_setting(keyfile, setting.group, setting.key, default, setting.type_to_get)
+                except ValueError:
+                    value = None
+                if (value is None or setting.is_valid(value) == False):
+                    logging.warning("load_settings: invalid value for %s in [%s], using %s" % (setting.key, setting.group, default))
+                    value = default
+                setattr(self, setting.attribute, copy.copy(value))
 
             # Categories
             if (self.categories_fixed == False):
@@ -222,139 +264,611 @@ class Main(Utils):
 
                     self.categories_triaged_generate()
 
-            # Path
-            self.applications_path = self.load_setting(keyfile, "Path","applications_path", self.applications_path_default, "list")
-            self.modules_path = self.load_setting(keyfile, "Path","modules_path", self.modules_path_default, "list")
-
-            # UI
-            self.window_size_w = self.load_setting(keyfile, "UI", "window_size_w", self.window_size_w_default, "int")
-            self.window_size_h = self.load_setting(keyfile, "UI", "window_size_h", self.window_size_h_default, "int")
-            self.window_icon = self.load_setting(keyfile, "UI", "window_icon", self.window_icon_default, "string")
-            self.window_title = self.load_setting(keyfile, "UI", "window_title", self.window_title_default, "string")
-            self.icon_view_columns = self.load_setting(keyfile, "UI", "icon_view_columns", self.icon_view_columns_default, "int")
-            self.icon_view_icons_size = self.load_setting(keyfile, "UI", "icon_view_icons_size", self.icon_view_icons_size_default, "int")
-            self.icon_not_theme_allow = self.load_setting(keyfile, "UI", "icon_not_theme_allow", self.icon_not_theme_allow_default, "boolean")
-            self.icon_force_size = self.load_setting(keyfile, "UI", "icon_force_size", self.icon_force_size_default, "boolean")
-            self.icon_fallback = self.load_setting(keyfile, "UI", "icon_fallback", self.icon_fallback_default, "string")
-            self.view_mode = self.load_setting(keyfile, "UI", "view_mode", self.view_mode_default, "string")
-            self.view_visual_effects = self.load_setting(keyfile, "UI", "view_visual_effects", self.view_visual_effects_default, "boolean")
+    def get_cache_path(self, name):
+        from xdg import BaseDirectory
+        return os.path.join(BaseDirectory.xdg_cache_home, "lx-control-center", name)
+
+    def connect_daemon(self):
+        """ Connect to the daemon if it's running, return False to scan the items in process"""
+        if (self.daemon_args == True or self.no_daemon_args == True):
+            return False
+        from .daemon import DaemonClient, get_socket_path
+        socket_path = get_socket_path()
+        if (socket_path is None or os.path.exists(socket_path) == False):
+            return False
+        client = DaemonClient(socket_path)
+        if (client.connect() == False):
+            return False
+        self.daemon_client = client
+        logging.info("connect_daemon: items served by the daemon on %s" % socket_path)
+        return True
+
+    def load_items_from_daemon(self):
+        """ Get the items from the daemon, scan them in process if the daemon doesn't answer"""
+        from .daemon import DaemonError
+        try:
+            response = self.daemon_client.request({"command": "items"})
+        except DaemonError as e:
+            logging.warning("load_items_from_daemon: error, scanning in process : %s" % e)
+            self.disconnect_daemon()
+            self.load_desktop_cache()
+            self.load_all_applications()
+            self.load_all_modules()
+            self.save_desktop_cache()
+            return
+        # Desktop files are read by the daemon
+        self.desktop_cache = DesktopEntryCache(self.get_cache_path("desktop-entries.json"), False)
+        for data in response["items"]:
+            item = self.item_from_daemon_data(data)
+            if (item is not None):
+                self.items.add(item)
+        self.daemon_generation = response["generation"]
+        self.profiler.count("items_from_daemon", len(self.items))
+
+    def item_from_daemon_data(self, data):
+        """ Build the Item of an item sent by the daemon"""
+        if (data["entry"] is None):
+            return None
+        if (data["type"] == "application"):
+            item = Item()
+            item.load_application_from_entry(data["path"], data["entry"])
+        else:
+            item = ModuleItem()
+            item.load_module_from_entry(data["path"], data["entry"])
+        self.category_table.assign(item)
+        # Triaged again in process, the toolkit and settings of the frontend may differ
+        item.activate = data["activate"]
+        if (item.check == False):
+            return None
+        return item
+
+    def disconnect_daemon(self):
+        if (self.daemon_client is not None):
+            self.daemon_client.close()
+            if (self.watcher is self.daemon_client):
+                self.watcher = None
+            self.daemon_client = None
+
+    def update_items_from_daemon(self):
+        """ Apply the changes notified by the daemon, return the paths of the items changed.
+            If the daemon stopped, scan the items in process."""
+        from .daemon import DaemonError
+        self.daemon_client.pop_changes()
+        response = None
+        if (self.daemon_client.lost == False):
+            try:
+                response = self.daemon_client.request({"command": "changes", "generation": self.daemon_generation})
+            except DaemonError as e:
+                logging.warning("update_items_from_daemon: error : %s" % e)
+        if (response is None):
+            logging.warning("update_items_from_daemon: daemon lost, scanning in process")
+            self.disconnect_daemon()
+            self.load_desktop_cache()
+            return self.rescan_all_items()
+
+        changed = set(response.get("removed", []))
+        if (response["full"] == True):
+            changed.update(i.path for i in self.items)
+            self.items.clear()
+        for path in changed:
+            old_item = self.items.get_by_path(path)
+            if (old_item is not None):
+                self.items.remove(old_item)
+        for data in response["items"]:
+            old_item = self.items.get_by_path(data["path"])
+            if (old_item is not None):
+                self.items.remove(old_item)
+            item = self.item_from_daemon_data(data)
+            if (item is not None):
+                self.items.add(item)
+            changed.add(data["path"])
+        for path in changed:
+            self.modules_manager.forget(path)
+            self.triage.invalidate_item(path)
+        self.daemon_generation = response["generation"]
+        if (len(changed) > 0):
+            self.triage_items()
+        logging.info("update_items_from_daemon: %s items changed" % len(changed))
+        return changed
+
+    def update_items_from_watcher(self):
+        """ Apply the changes reported by self.watcher, return the paths of the items changed"""
+        if (self.daemon_client is not None and self.watcher is self.daemon_client):
+            return self.update_items_from_daemon()
+        return self.update_items_from_paths(self.watcher.pop_changes())
+
+    def load_desktop_cache(self):
+        """ Load the cache of desktop files, according to --no-cache and --rebuild-cache"""
+        # Entries of each parser are kept apart
+        if (self.strict_parser_args == True):
+            cache_name = "desktop-entries-strict.json"
+        else:
+            cache_name = "desktop-entries.json"
+        self.desktop_cache = DesktopEntryCache(self.get_cache_path(cache_name), self.no_cache_args == False, self.rebuild_cache_args)
+        self.desktop_cache.load()
+
+    def load_modules_manager(self):
+        self.modules_manager = ModulesManager(self.get_cache_path("modules-usage.json"))
+        self.modules_manager.load_usage()
+
+    def get_modules_to_preload(self):
+        """ Return the active modules opened the most often, up to self.modules_preload"""
+        modules = []
+        if (self.modules_preload <= 0):
+            return modules
+        for path in self.modules_manager.get_most_used(self.modules_preload):
+            i = self.items.get_by_path(path)
+            if (i is not None and i.type == "module" and i.activate == True):
+                modules.append(i)
+        return modules
+
+    def save_desktop_cache(self):
+        self.desktop_cache.print_stats()
+        self.desktop_cache.save()
+
+    def categories_match(self, categories):
+        """ True if one of categories is in the categories to display"""
+        for item in self.keyword_categories_settings_list:
+            if (item in categories):
+                return True
+        return False
+
+    def get_desktop_entry(self, path, categories_filter=None):
+        """ Return the fields of the desktop file path, from the cache if the file is unchanged.
+            With categories_filter, the entry of a rejected file may be partial (only categories)."""
+        self.profiler.count("desktop_files")
+        entry = self.desktop_cache.lookup(path)
+        if (entry is not None):
+            self.profiler.count("desktop_files_cached")
+        if (entry is not None and entry.get("partial") == True):
+            # Rejected by a previous filter, read it again if it's now accepted
+            if (categories_filter is None or self.categories_match(entry["categories"])):
+                entry = None
+        if (entry is None):
+            self.profiler.count("desktop_files_parsed")
+            if (self.strict_parser_args == True):
+                keyfile = self.load_xdgfile(path)
+                if (keyfile is not None):
+                    entry = self.desktop_entry_from_xdgfile(keyfile)
+            else:
+                entry = self.read_desktop_entry(path, categories_filter)
+            if (entry is not None):
+                self.desktop_cache.store(path, entry)
+        return entry
+
+    def list_files_from_dir(self, path):
+        """ List files of the directory path, from the cache if the directory is unchanged"""
+        list_files = self.desktop_cache.lookup_directory(path)
+        if (list_files is None):
+            list_files = sorted(self.scan_directory(path)[0])
+            self.desktop_cache.store_directory(path, list_files)
+            self.profiler.count("directories_scanned")
+        else:
+            self.profiler.count("directories_cached")
+        return list_files
+
+    def map_paths(self, function, paths):
+        """ Apply function on each path, in a pool of threads if there are several paths.
+            The results are returned in the order of paths."""
+        nbr_threads = min(len(paths), self.scan_threads_max)
+        if (nbr_threads <= 1):
+            return [function(path) for path in paths]
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(nbr_threads)
+        try:
+            return pool.map(function, paths)
+        finally:
+            pool.close()
+
+    def list_applications_from_dir(self, path):
+        """ List applications of one applications directory, as (path, entry) tuples"""
+        return_list = []
+        try:
+            list_files = self.list_files_from_dir(path)
+        except OSError:
+            logging.info("list_all_applications_from_dirs: %s not found in applications path" % path)
+            return return_list
+        for application_file in list_files:
+            app_path = os.path.join(path,application_file)
+            if (os.path.splitext(app_path)[1] == ".desktop"):
+                entry = self.get_desktop_entry(app_path, self.keyword_categories_settings_list)
+                if (entry is not None and entry.get("partial") != True and self.categories_match(entry["categories"])):
+                    return_list.append((app_path, entry))
+                else:
+                    self.profiler.count("desktop_files_rejected")
+        return return_list
 
     def list_all_applications_from_dirs(self):
-        """ List all applications from applications directories"""
+        """ List all applications from applications directories, as (path, entry) tuples.
+            Each desktop file is parsed once, the entry is reused to build the Item.
+            Directories are scanned in parallel, results are merged in the order of applications_path."""
         logging.debug("list_all_applications_from_dirs: enter function")
         return_list = []
-        for path in self.applications_path:
-            try:
-                list_files = [f for f in os.listdir(path) if os.path.isfile(os.path.join(path, f))]
-                for application_file in list_files:
-                    app_path = os.path.join(path,application_file)
-                    keyfile = None
-                    if (os.path.splitext(app_path)[1] == ".desktop"):
-                        keyfile = self.load_xdgfile(app_path)
-                        categories = []
-                        categories = keyfile.getCategories()
-                        if (categories != []):
-                            to_add = 0
-                            for item in self.keyword_categories_settings_list:
-                                if (item in categories):
-                                    to_add = 1
-                            if (to_add == 1):
-                                item_to_add = app_path
-                                if (item_to_add not in return_list):
-                                    return_list.append(app_path)
-            except OSError:
-                logging.info("list_all_applications_from_dirs: %s not found in applications path" % path)
+        paths_added = set()
+        for dir_list in self.map_paths(self.list_applications_from_dir, self.applications_path):
+            for app_path, entry in dir_list:
+                if (app_path not in paths_added):
+                    paths_added.add(app_path)
+                    return_list.append((app_path, entry))
+        return return_list
+
+    def list_all_applications_from_menu_cache(self):
+        """ List the applications of applications_path from the menu-cache file, as (path, entry) tuples.
+            Return None if the menu-cache file is missing, stale or doesn't cover applications_path."""
+        from xdg import BaseDirectory
+        from .menucache import MenuCache, MenuCacheError, find_menu_cache_file
+        cache_path = find_menu_cache_file(os.path.join(BaseDirectory.xdg_cache_home, "menus"))
+        if (cache_path is None):
+            logging.info("list_all_applications_from_menu_cache: no menu-cache file, scanning directories")
+            return None
+        menu_cache = MenuCache(cache_path)
+        try:
+            menu_cache.load()
+        except MenuCacheError as e:
+            logging.warning("list_all_applications_from_menu_cache: error reading %s, scanning directories : %s" % (cache_path, e))
+            return None
+        if (menu_cache.is_stale() == True):
+            logging.info("list_all_applications_from_menu_cache: %s is outdated, scanning directories" % cache_path)
+            return None
+
+        # Same order as list_all_applications_from_dirs
+        dirs = [os.path.normpath(d) for d in self.applications_path if os.path.isdir(d)]
+        cache_dirs = set(os.path.normpath(d) for d in menu_cache.dirs)
+        for path in dirs:
+            if (path not in cache_dirs):
+                logging.info("list_all_applications_from_menu_cache: %s not in %s, scanning directories" % (path, cache_path))
+                return None
+
+        applications_by_dir = dict((d, []) for d in dirs)
+        for application in menu_cache.applications:
+            file_dir = os.path.normpath(application["file_dir"])
+            if (file_dir not in applications_by_dir):
+                continue
+            if (self.categories_match(application["categories"]) == False):
+                self.profiler.count("desktop_files_rejected")
+                continue
+            entry = self.new_desktop_entry()
+            entry["name"] = application["name"]
+            entry["comment"] = application["comment"]
+            entry["generic_name"] = application["generic_name"]
+            entry["keywords"] = application["keywords"]
+            entry["categories"] = application["categories"]
+            entry["icon"] = application["icon"]
+            entry["only_show_in"] = menu_cache.get_only_show_in(application)
+            entry["not_show_in"] = menu_cache.get_not_show_in(application)
+            entry["exec"] = application["exec"]
+            entry["try_exec"] = application["try_exec"]
+            applications_by_dir[file_dir].append((menu_cache.get_path(application), entry))
+
+        return_list = []
+        for path in dirs:
+            return_list.extend(sorted(applications_by_dir[path], key=lambda a: a[0]))
+        self.profiler.count("applications_from_menu_cache", len(return_list))
         return return_list
 
     def load_all_applications (self):
-        list_app = self.list_all_applications_from_dirs()
-        logging.debug("load_all_applications: %s" % list_app)
-        for i in list_app:
-            item = Item(self.categories_triaged)
-            item.load_application_from_path(i)
+        list_app = None
+        if (self.applications_backend == "menu-cache"):
+            list_app = self.list_all_applications_from_menu_cache()
+        if (list_app is None):
+            list_app = self.list_all_applications_from_dirs()
+        logging.debug("load_all_applications: %s" % [path for path, entry in list_app])
+        for path, entry in list_app:
+            item = Item()
+            item.load_application_from_entry(path, entry)
+            self.category_table.assign(item)
             if (item.check == True):
-                self.items.append(item)
+                self.items.add(item)
+                self.profiler.count("applications")
+            else:
+                self.profiler.count("items_rejected")
+
+    def list_modules_from_dir(self, path):
+        """ List modules of one modules directory, as (path, entry) tuples"""
+        return_list = []
+        try:
+            list_dirs = sorted(self.scan_directory(path)[1])
+        except OSError:
+            logging.info("list_all_modules_from_dirs: %s doesn't exist in path" % path)
+            return return_list
+        for dirs in list_dirs:
+            dir_path = os.path.join(path, dirs)
+            logging.debug("list_all_modules_from_dirs: list_dirs = %s " % dirs)
+            try:
+                list_files = self.list_files_from_dir(dir_path)
+            except OSError:
+                continue
+            for module_file in list_files:
+                file_path = os.path.join(dir_path, module_file)
+                logging.debug("list_all_modules_from_dirs: list_files = %s " % module_file)
+                if (os.path.splitext(file_path)[1] == ".desktop"):
+                    entry = self.get_desktop_entry(file_path)
+                    if (entry is not None):
+                        return_list.append((file_path, entry))
+                    else:
+                        self.profiler.count("desktop_files_rejected")
+        return return_list
 
     def list_all_modules_from_dirs(self):
+        """ List all modules from modules directories, as (path, entry) tuples"""
         return_list = []
-        for path in self.modules_path:
-            if(os.path.exists(path)):
-                list_dirs = [d for d in os.listdir(path) if os.path.isdir(os.path.join(path, d))]
-                for dirs in list_dirs:
-                    dir_path = os.path.join(path, dirs)
-                    logging.debug("list_all_modules_from_dirs: list_dirs = %s " % dirs)
-                    list_files = [f for f in os.listdir(dir_path) if os.path.isfile(os.path.join(dir_path, f))]
-                    for module_file in list_files:
-                        file_path = os.path.join(dir_path, module_file)
-                        logging.debug("list_all_modules_from_dirs: list_files = %s " % module_file)
-                        if (os.path.splitext(file_path)[1] == ".desktop"):
-                            keyfile = None
-                            keyfile = self.load_xdgfile(file_path)
-                            return_list.append(file_path)
-            else:
-                logging.info("list_all_modules_from_dirs: %s doesn't exist in path" % path)
+        for dir_list in self.map_paths(self.list_modules_from_dir, self.modules_path):
+            return_list.extend(dir_list)
         return return_list
 
     def load_all_modules (self):
         list_modules = self.list_all_modules_from_dirs()
-        logging.debug("load_all_modules: %s :" % list_modules)
-        for i in list_modules:
-            item = Item(self.categories_triaged)
-            item.load_module_from_path(i)
+        logging.debug("load_all_modules: %s :" % [path for path, entry in list_modules])
+        for path, entry in list_modules:
+            item = ModuleItem()
+            item.load_module_from_entry(path, entry)
+            self.category_table.assign(item)
             if (item.check == True):
-                self.items.append(item)
-
-            to_replace = item.module_replace_application
-            for i in self.items:
-                for r in to_replace:
-                    if (i.filename == r):
-                        i.activate = False
-
-    def apply_desktop_env_sort(self):
-        for i in self.items:
-            if (len(i.not_show_in) != 0):
-                for desktop in self.desktop_environments:
-                    if (desktop in i.not_show_in):
-                        i.activate = False
-
-            if (i.activate == True):
-                if (len(i.only_show_in) != 0):
-                    for desktop in self.desktop_environments:
-                        if (desktop not in i.only_show_in):
-                            i.activate = False
-
-    def apply_try_exec_test(self):
-        for i in self.items:
-            if (i.type == "application"):
-                if (i.try_exec != ""):
-                    if (os.path.exists(i.try_exec) == False):
-                        i.activate = False
-
-    def apply_no_exec_applications(self):
-        for i in self.items:
-            if (i.type == "application"):
-                if (i.execute_command is None):
-                        i.activate = False
-
-    def apply_applications_modules_suport(self):
-        for i in self.items:    
-            if (i.type == "module"):
-                i.activate = self.modules_support
-            elif (i.type == "application"):
-                i.activate = self.applications_support
-
-    def apply_module_toolkit(self):
-        for i in self.items:
-            if (i.type == "module"):
-                if (i.module_toolkit != None):
-                    if (i.module_toolkit != self.toolkit):
-                        i.activate = False
-
-    def apply_items_categories(self):
-        logging.debug("apply_items_categories: enter fonction with self.categories_triaged = %s" % self.categories_triaged)
+                self.items.add(item)
+                self.profiler.count("modules")
+            else:
+                self.profiler.count("items_rejected")
+
+    def watch_directories(self):
+        """ Start watching applications and modules directories, return the watcher or None if not available.
+            With the daemon, the watcher receives the notifications of the daemon."""
+        if (self.daemon_client is not None):
+            if (self.daemon_client.subscribe() == True):
+                self.watcher = self.daemon_client
+                return self.watcher
+            return None
+        from .watcher import DirectoryWatcher
+        watcher = DirectoryWatcher(self.watcher_debounce)
+        if (watcher.is_available() == False):
+            logging.info("watch_directories: inotify not available, directories are not monitored")
+            return None
+        for path in self.applications_path:
+            self.watch_root_directory(watcher, path)
+        for path in self.modules_path:
+            if (self.watch_root_directory(watcher, path) == True):
+                self.watch_module_directories(watcher, path)
+        self.watcher = watcher
+        return watcher
+
+    def watch_root_directory(self, watcher, path):
+        """ Watch path, a directory of applications_path or modules_path. If it doesn't exist,
+            watch its nearest existing parent instead, to watch it when it's created.
+            Return True if path is watched."""
+        if (os.path.isdir(path)):
+            self.missing_directories.pop(path, None)
+            watcher.add_watch(path)
+            return True
+        if (not os.path.isabs(path)):
+            return False
+        parent = os.path.dirname(os.path.normpath(path))
+        while (os.path.isdir(parent) == False and os.path.dirname(parent) != parent):
+            parent = os.path.dirname(parent)
+        if (self.missing_directories.get(path) != parent):
+            logging.info("watch_root_directory: %s doesn't exist, watching %s" % (path, parent))
+        self.missing_directories[path] = parent
+        watcher.add_watch(parent)
+        return False
+
+    def watch_module_directories(self, watcher, path):
+        try:
+            for module_dir in self.scan_directory(path)[1]:
+                watcher.add_watch(os.path.join(path, module_dir))
+        except OSError:
+            pass
+
+    def update_missing_directories(self, paths):
+        """ Watch the missing directories of applications_path and modules_path created in paths,
+            and the removed ones again. Return True if one was created."""
+        roots = [os.path.normpath(p) for p in self.applications_path + self.modules_path]
+        parents = set(self.missing_directories.values())
+        created = False
+        for path in paths:
+            if (os.path.normpath(path) in roots and os.path.isdir(path) == False):
+                # Removed, watch it again when created
+                for root in self.applications_path + self.modules_path:
+                    if (os.path.normpath(root) == os.path.normpath(path)):
+                        self.watch_root_directory(self.watcher, root)
+        if (len([p for p in paths if p in parents or os.path.dirname(p) in parents]) == 0):
+            return False
+        for path in list(self.missing_directories):
+            if (self.watch_root_directory(self.watcher, path) == True):
+                logging.info("update_missing_directories: %s created" % path)
+                created = True
+                if (path in self.modules_path):
+                    self.watch_module_directories(self.watcher, path)
+        # Stop watching the parents not needed anymore
+        for parent in parents - set(self.missing_directories.values()):
+            if (os.path.normpath(parent) not in roots):
+                self.watcher.remove_watch(parent)
+        return created
+
+    def get_path_type(self, path):
+        """ Return "application" or "module" according to the directory of path, or None"""
+        directory = os.path.normpath(os.path.dirname(path))
+        for app_dir in self.applications_path:
+            if (directory == os.path.normpath(app_dir)):
+                return "application"
+        for module_root in self.modules_path:
+            if (os.path.normpath(os.path.dirname(directory)) == os.path.normpath(module_root)):
+                return "module"
+        return None
+
+    def load_item_from_path(self, path, item_type):
+        """ Build the Item of the desktop file path, or None if it must not be displayed"""
+        if (item_type == "application"):
+            entry = self.get_desktop_entry(path, self.keyword_categories_settings_list)
+            if (entry is None or entry.get("partial") == True or self.categories_match(entry["categories"]) == False):
+                return None
+            item = Item()
+            item.load_application_from_entry(path, entry)
+        else:
+            entry = self.get_desktop_entry(path)
+            if (entry is None):
+                return None
+            item = ModuleItem()
+            item.load_module_from_entry(path, entry)
+        if (item.check == False):
+            return None
+        self.category_table.assign(item)
+        return item
+
+    def update_items_from_paths(self, paths):
+        """ Add, update or remove the items of the changed paths, and triage them.
+            Return the paths of the items changed."""
+        if (self.watcher is not None and self.update_missing_directories(paths) == True):
+            # A directory of applications_path or modules_path was created
+            return self.rescan_all_items()
+        changed = set()
+        for path in paths:
+            if (self.watcher is not None and self.watcher.overflow == True):
+                break
+            for module_root in self.modules_path:
+                if (os.path.normpath(os.path.dirname(path)) == os.path.normpath(module_root)):
+                    # A module directory was added or removed
+                    for i in self.items.get_by_type("module"):
+                        if (os.path.dirname(i.path) == path):
+                            self.items.remove(i)
+                            self.modules_manager.forget(i.path)
+                            self.triage.invalidate_item(i.path)
+                            changed.add(i.path)
+                    if (os.path.isdir(path)):
+                        if (self.watcher is not None):
+                            self.watcher.add_watch(path)
+                        try:
+                            module_files = self.list_files_from_dir(path)
+                        except OSError as e:
+                            # Removed or renamed since the notification, its items are removed above
+                            logging.info("update_items_from_paths: %s not listed : %s" % (path, e))
+                            module_files = []
+                        for module_file in module_files:
+                            changed.update(self.update_item_from_path(os.path.join(path, module_file)))
+            changed.update(self.update_item_from_path(path))
+
+        if (self.watcher is not None and self.watcher.overflow == True):
+            self.watcher.overflow = False
+            return self.rescan_all_items()
+
+        if (len(changed) > 0):
+            self.triage_items()
+            self.desktop_cache.save()
+        logging.info("update_items_from_paths: %s items changed" % len(changed))
+        return changed
+
+    def update_item_from_path(self, path):
+        if (os.path.splitext(path)[1] != ".desktop"):
+            return set()
+        item_type = self.get_path_type(path)
+        if (item_type is None):
+            return set()
+
+        old_item = self.items.get_by_path(path)
+        if (old_item is not None):
+            self.items.remove(old_item)
+            if (old_item.type == "module"):
+                self.modules_manager.forget(path)
+        new_item = None
+        if (os.path.isfile(path)):
+            new_item = self.load_item_from_path(path, item_type)
+        if (new_item is not None):
+            self.items.add(new_item)
+        if (old_item is None and new_item is None):
+            return set()
+        self.triage.invalidate_item(path)
+        return set([path])
+
+    def rescan_all_items(self):
+        """ Scan all directories again, when changes were lost. Return all paths"""
+        changed = set(i.path for i in self.items)
+        self.items.clear()
+        self.load_all_applications()
+        self.load_all_modules()
+        self.desktop_cache.save()
         for i in self.items:
-            i.category_array = self.categories_triaged
-            i.define_category_from_list()
+            changed.add(i.path)
+        for path in changed:
+            self.triage.invalidate_item(path)
+        self.triage_items()
+        return changed
+
+    def triage_filters_generate(self):
+        """ Declare the filters of the triage, with the items they apply to and the settings they depend on"""
+        self.triage = TriagePipeline(self)
+        self.triage.add_filter(TriageFilter("applications_support", self.filter_applications_support, ["application"], ["applications_support"]))
+        self.triage.add_filter(TriageFilter("modules_support", self.filter_modules_support, ["module"], ["modules_support"]))
+        self.triage.add_filter(TriageFilter("desktop_env", self.filter_desktop_env, ["application", "module"], ["desktop_environments"]))
+        self.triage.add_filter(TriageFilter("try_exec", self.filter_try_exec, ["application"], ["executables_generation"]))
+        self.triage.add_filter(TriageFilter("no_exec", self.filter_no_exec, ["application"], ["executables_generation"]))
+        self.triage.add_filter(TriageFilter("module_toolkit", self.filter_module_toolkit, ["module"], ["toolkit"]))
+
+    def filter_applications_support(self, i):
+        return self.applications_support
+
+    def filter_modules_support(self, i):
+        return self.modules_support
+
+    def filter_desktop_env(self, i):
+        if (len(i.not_show_in) != 0):
+            for desktop in self.desktop_environments:
+                if (desktop in i.not_show_in):
+                    return False
+
+        if (len(i.only_show_in) != 0):
+            for desktop in self.desktop_environments:
+                if (desktop not in i.only_show_in):
+                    return False
+        return True
+
+    @property
+    def executables_generation(self):
+        """ Changes when the executables of PATH change, to triage the applications again"""
+        return self.executables.generation
+
+    def filter_try_exec(self, i):
+        if (i.try_exec != ""):
+            return self.executables.find(i.try_exec) is not None
+        return True
+
+    def filter_no_exec(self, i):
+        """ Desactivate applications without Exec, or with a program not installed"""
+        if (i.execute_command is None):
+            return False
+        if (i.execute_command == ""):
+            # DBusActivatable applications may have no Exec
+            return True
+        return self.executables.find(get_exec_program(i.execute_command)) is not None
+
+    def filter_module_toolkit(self, i):
+        if (i.module_toolkit != None):
+            if (i.module_toolkit != self.toolkit):
+                return False
+        return True
+
+    def apply_modules_replace_applications(self):
+        """ Desactivate applications replaced by an active module (X-LX-Control-Center-Application-Replaces)"""
+        replaced_paths = set()
+        for module in self.items.get_by_type("module"):
+            if (module.activate == True):
+                for filename in module.module_replace_application:
+                    for i in self.items.get_by_filename(filename):
+                        if (i.type == "application"):
+                            replaced_paths.add(i.path)
+
+        # Restore the applications not replaced anymore
+        for path in self.replaced_paths | replaced_paths:
+            i = self.items.get_by_path(path)
+            if (i is not None):
+                i.activate = self.triage.activated.get(path, i.activate) and path not in replaced_paths
+        self.replaced_paths = replaced_paths
+
+    def apply_items_categories(self, paths=None):
+        """ Define the category of the items in paths, or of all items if categories changed"""
+        if (paths is None or self.category_table is not self.category_table_applied):
+            items = list(self.items)
+            self.category_table_applied = self.category_table
+        else:
+            items = [self.items.get_by_path(path) for path in paths if path in self.items.by_path]
+        for i in items:
+            self.category_table.assign(i)
 
     def desktop_environments_generate(self):
         if self.desktop_environments_setting == ["Auto"]:
@@ -365,26 +879,25 @@ class Main(Utils):
             self.desktop_environments = self.desktop_environments_setting
 
     def categories_triaged_generate(self):
+        """ Map each desktop category of categories_keys to its group, and compile it for the items"""
         for key in self.categories_keys.keys():
-            for item in self.categories_keys[key]:
-                if (len(item) > 1):
-                    self.categories_triaged[item] = key
-                else:
-                    to_add = self.categories_keys[key]
-                    self.categories_triaged[to_add] = key
-                    break
+            categories = self.categories_keys[key]
+            # ("DesktopSettings") is a string, not a tuple
+            if (isinstance(categories, (list, tuple)) == False):
+                categories = [categories]
+            for category in categories:
+                self.categories_triaged[category] = key
+        self.category_table = CategoryTable(self.categories_triaged)
 
     def save_settings(self):
-        keyfile = self.load_inifile(self.settings_path)
-        logging.debug("save_settings: loading %s as a keyfile" % self.settings_path)
+        """ Write the settings which changed since load_settings, nothing if none changed"""
+        self.settings_autosave_pending = False
+        if (self.settings_keyfile is None):
+            self.load_settings()
+        keyfile = self.settings_keyfile
 
-        # Configuration
-        self.save_setting(keyfile, "Configuration","desktop_categories", self.keyword_categories_settings_list, self.keyword_categories_settings_list_default,"list")
-        self.save_setting(keyfile, "Configuration","desktop_environments", self.desktop_environments_setting, self.desktop_environments_setting, "list")
-        self.save_setting(keyfile, "Configuration", "version_config", self.version_config, self.version_config_default, "float")
-        self.save_setting(keyfile, "Configuration", "modules_support", self.modules_support, self.modules_support_default, "boolean")
-        self.save_setting(keyfile, "Configuration", "applications_support", self.applications_support, self.applications_support_default, "boolean")
-        self.save_setting(keyfile, "Configuration", "categories_fixed", self.categories_fixed, self.categories_fixed_default, "boolean")
+        for setting in SETTINGS:
+            self.save_setting(keyfile, setting.group, setting.key, getattr(self, setting.attribute), getattr(self, setting.attribute + "_default"), setting.type_to_get)
 
         # Categories
         if (self.categories_fixed == False):
@@ -392,118 +905,160 @@ class Main(Utils):
                 for category in self.categories_keys:
                     self.save_setting(keyfile, "Categories",category, self.categories_keys[category], None, "list")
 
-        # Path
-        self.save_setting(keyfile, "Path","applications_path", self.applications_path, self.applications_path_default, "list")
-        self.save_setting(keyfile, "Path","modules_path", self.modules_path, self.modules_path_default, "list")
-
+        if (len(self.settings_changed) > 0):
+            logging.debug("save_settings: changed %s" % sorted(self.settings_changed))
+            if (self.save_file(keyfile) == True):
+                self.settings_changed = set()
 
-        # UI
-        self.save_setting(keyfile, "UI", "window_size_w", self.window_size_w, self.window_size_w_default, "int")
-        self.save_setting(keyfile, "UI", "window_size_h", self.window_size_h, self.window_size_h_default, "int")
-        self.save_setting(keyfile, "UI", "window_icon", self.window_icon, self.window_icon_default, "generic")
-        self.save_setting(keyfile, "UI", "window_title", self.window_title, self.window_title_default, "generic")
-        self.save_setting(keyfile, "UI", "icon_view_columns", self.icon_view_columns, self.icon_view_columns_default, "int")
-        self.save_setting(keyfile, "UI", "icon_view_icons_size", self.icon_view_icons_size, self.icon_view_icons_size_default, "int")
-        self.save_setting(keyfile, "UI", "icon_not_theme_allow", self.icon_not_theme_allow, self.icon_not_theme_allow_default, "boolean")
-        self.save_setting(keyfile, "UI", "icon_force_size", self.icon_force_size, self.icon_force_size_default, "boolean")
-        self.save_setting(keyfile, "UI", "icon_fallback", self.icon_fallback, self.icon_fallback_default, "generic")
-        self.save_setting(keyfile, "UI", "view_mode", self.view_mode, self.view_mode_default, "generic")
-        self.save_setting(keyfile, "UI", "view_visual_effects", self.view_visual_effects, self.view_visual_effects_default, "boolean")
+    def request_save_settings(self):
+        """ Save the settings after settings_autosave_delay, once for all the changes made meanwhile"""
+        if (self.settings_autosave_pending == False):
+            self.settings_autosave_pending = True
+            self.schedule_save_settings()
 
-        if (self.trigger_save_settings_file == True):
-            self.save_file(keyfile)
+    def schedule_save_settings(self):
+        """ Call save_settings later, frontends with a main loop use a timeout"""
+        self.save_settings()
 
     def save_setting(self, keyfile, group, key, variable, default, type_to_set):
         logging.debug("save_setting: group, key and variable => %s, %s, %s" %(group, key, variable))
         if (variable == default):
             logging.debug("save_setting: variable == default, checking for existing key")
-            if(keyfile.has_option(group, key)):
+            # A key set to its default value is kept, only a value changed back to the default is removed
+            if(keyfile.has_option(group, key) and self.load_setting(keyfile, group, key, default, type_to_set) != variable):
                 logging.debug("save_setting: variable == default, existing key, removing")
                 keyfile.remove_option(group, key)
-                self.trigger_save_settings_file = True
+                self.settings_changed.add((group, key))
         else:
             if (keyfile.has_section(group) == False):
                 keyfile.add_section(group)
-                self.trigger_save_settings_file = True
+                self.settings_changed.add((group, key))
 
             if (type_to_set == "float"):
                 if (keyfile.has_option(group, key) == False):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True 
+                    self.settings_changed.add((group, key)) 
   
                 elif (keyfile.getfloat(group, key) != variable):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
             elif(type_to_set == "int"):
                 if (keyfile.has_option(group, key) == False):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
                 
                 elif (keyfile.getint(group, key) != variable):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
             elif(type_to_set == "boolean"):
                 if (keyfile.has_option(group, key) == False):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
                 elif (keyfile.getboolean(group, key) != variable):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
             elif(type_to_set == "list"):
                 if (keyfile.has_option(group, key) == False):
                     list_to_save = ';'.join(variable) + ";"
                     keyfile.set(group, key, list_to_save)
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
-                elif (keyfile.get(group, key) != variable):
+                elif (self.load_setting(keyfile, group, key, None, "list") != list(variable)):
                     list_to_save = ';'.join(variable) + ";"
                     keyfile.set(group, key, list_to_save)
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
             else:
                 if (keyfile.has_option(group, key) == False):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
                 elif (keyfile.get(group, key) != variable):
                     keyfile.set(group, key, str(variable))
-                    self.trigger_save_settings_file = True
+                    self.settings_changed.add((group, key))
 
     def save_file(self, keyfile):
+        """ Write keyfile in the home directory. The file is replaced only once completely written,
+            so it's never truncated. Return False on error."""
         dir_path = os.path.join(os.path.expanduser('~'), ".config","lx-control-center")
         home_path = os.path.join(dir_path, "settings.conf")
+        tmp_path = home_path + ".tmp"
+
+        try:
+            if (os.path.exists(dir_path) == False):
+                logging.debug("save_file: Directory doesn't exist => create it")
+                os.makedirs(dir_path)
+
+            logging.debug("save_file: Save file on %s" % home_path)
+            with open(tmp_path, 'w') as file_to_save:
+                keyfile.write(file_to_save)
+                file_to_save.flush()
+                os.fsync(file_to_save.fileno())
+            os.rename(tmp_path, home_path)
+        except (IOError, OSError) as e:
+            logging.error("save_file: error saving %s : %s" % (home_path, e))
+            return False
+
+        self.settings_path = home_path
+        return True
 
-        if (self.settings_path != home_path):
-            self.settings_path = home_path
-
-        if (os.path.exists(dir_path) == False):
-            logging.debug("save_file: Directory doesn't exist => create it")
-            os.makedirs(dir_path)
+    def set_setting(self, group, key, variable):
+        """ Change the setting key of group, notify the subscribers and save it later.
+            Return False if the setting doesn't exist or variable is not valid for it."""
+        setting = SETTINGS_BY_KEY.get((group, key))
+        if (setting is None):
+            logging.warning("set_setting: unknown setting %s - %s" % (group, key))
+            return False
+        if (setting.is_valid(variable) == False):
+            logging.warning("set_setting: invalid value %s for %s - %s" % (variable, group, key))
+            return False
+        if (getattr(self, setting.attribute) == variable):
+            return True
+        setattr(self, setting.attribute, variable)
+        self.notify_settings_changed(set([(group, key)]))
+        self.request_save_settings()
+        return True
+
+    def subscribe_settings(self, callback):
+        """ Call callback(keys, invalidated) when settings change, with the (group, key) changed
+            and the derived state to compute again, see settings.SETTINGS"""
+        self.settings_subscribers.append(callback)
+
+    def notify_settings_changed(self, keys):
+        invalidated = get_invalidated(keys)
+        logging.debug("notify_settings_changed: %s changed, invalidating %s" % (sorted(keys), sorted(invalidated)))
+        self.apply_settings_changes(keys, invalidated)
+        for callback in list(self.settings_subscribers):
+            callback(keys, invalidated)
+
+    def apply_settings_changes(self, keys, invalidated):
+        """ Compute again the derived state of Main invalidated by a change of settings"""
+        if (self.loaded == False):
+            return
+        if ("desktop_environments" in invalidated):
+            self.desktop_environments_generate()
+        if ("items" in invalidated):
+            if (self.daemon_client is None):
+                self.rescan_all_items()
+            else:
+                logging.info("apply_settings_changes: items served by the daemon, %s ignored until restart" % sorted(keys))
+        if ("triage" in invalidated):
+            self.triage_items()
 
-        if (os.path.exists(home_path) == False):
-            logging.debug("save_file: File doesn't exist => create it")
-            file_to_create = open(self.settings_path,'x')
-            file_to_create.close()
+    def launch_item(self, i):
+        """ Launch the application i, without waiting for it. Raise LaunchError if it can't be launched."""
+        pid = self.launcher.launch(i)
+        self.watch_child(pid)
+        return pid
 
-        logging.debug("save_file: Save file on %s" % self.settings_path)
-        file_to_save = open(self.settings_path,'w')
-        keyfile.write(file_to_save)
-        file_to_save.close()
+    def watch_child(self, pid):
+        """ Wait for the launched application pid when it exits. Frontends with a main loop
+            use a child watch, without one the children are waited by launcher.reap"""
+        self.launcher.reap()
 
-    def set_setting(self, group, key, variable):
-        if (group == "Configuration"):
-            if (key == "modules_support"):
-                self.modules_support = variable
-            elif (key == "applications_support"):
-                self.applications_support = variable                
-            else:
-                logging.debug("set_setting: %s - %s not implemented" % (group, key))
-        else:
-            logging.debug("set_setting: %s - %s not implemented" % (group, key))
-            
     def module_active(self,item):
         self.module_activated = item
 
@@ -515,7 +1070,9 @@ class Main(Utils):
         logging.debug("self.applications_path : %s" % self.applications_path)
         logging.debug("self.modules_path : %s" % self.modules_path)
         logging.debug("self.applications_support: %s" % self.applications_support)
+        logging.debug("self.applications_backend: %s" % self.applications_backend)
         logging.debug("self.modules_support: %s" % self.modules_support)
+        logging.debug("self.modules_preload: %s" % self.modules_preload)
         logging.debug("self.categories_triaged: %s" % self.categories_triaged)
         logging.debug("self.categories_keys : %s" % self.categories_keys)
         logging.debug("self.desktop_environments : %s" % self.desktop_environments)
@@ -526,13 +1083,12 @@ class Main(Utils):
             logging.debug("Item path : %s" % i.path)
             logging.debug("Item category : %s" % i.category)
             logging.debug("Item icon : %s" % i.icon)
-            logging.debug("Item only_show_in : %s" % i.only_show_in)
-            logging.debug("Item not_show_in : %s" % i.not_show_in)
+            logging.debug("Item only_show_in : %s" % (i.only_show_in,))
+            logging.debug("Item not_show_in : %s" % (i.not_show_in,))
             logging.debug("Item execute : %s" % i.execute_command)
             logging.debug("Item activate : %s" % i.activate)
-            logging.debug("Item changed : %s" % i.changed)
             logging.debug("Item check : %s" % i.check)
-            logging.debug("Item module_replace_application : %s" % i.module_replace_application)
+            logging.debug("Item module_replace_application : %s" % (i.module_replace_application,))
             logging.debug("Item module_toolkit : %s" % i.module_toolkit)
             logging.debug("=================")
 
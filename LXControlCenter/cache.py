@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import json
+import logging
+import threading
+
+class DesktopEntryCache(object):
+    """ On-disk cache of the fields extracted from desktop files.
+        A file entry is valid while (mtime, size, inode) of the file is unchanged,
+        a directory listing is valid while the mtime of the directory is unchanged."""
+
+    cache_version = 2
+
+    def __init__(self, cache_path, enabled=True, rebuild=False):
+        self.cache_path = cache_path
+        self.enabled = enabled
+        self.rebuild = rebuild
+        self.files = {}
+        self.dirs = {}
+        self.dirty = False
+        # Paths used during this session, the others are pruned on save
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        # Directories can be scanned by several threads
+        self.lock = threading.Lock()
+
+    def load(self):
+        """ Load the cache file, starting with an empty cache if it's missing or corrupted"""
+        if (self.enabled == False or self.rebuild == True):
+            logging.debug("DesktopEntryCache.load: cache disabled or rebuild requested, starting empty")
+            # Force a write, to replace a possibly corrupted file
+            self.dirty = self.rebuild
+            return
+
+        try:
+            with open(self.cache_path, 'r') as cache_file:
+                data = json.load(cache_file)
+            if (data.get("version") != self.cache_version):
+                logging.info("DesktopEntryCache.load: cache version mismatch, ignoring %s" % self.cache_path)
+                return
+            self.files = data["files"]
+            self.dirs = data["dirs"]
+        except (IOError, OSError):
+            logging.debug("DesktopEntryCache.load: no cache file on %s" % self.cache_path)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logging.warning("DesktopEntryCache.load: %s is corrupted, ignoring it" % self.cache_path)
+            self.files = {}
+            self.dirs = {}
+            self.dirty = True
+
+    def save(self):
+        """ Write the cache file atomically, only if something changed"""
+        if (self.enabled == False or self.dirty == False):
+            return
+
+        for path in [p for p in self.files if p not in self.seen]:
+            del self.files[path]
+        for path in [p for p in self.dirs if p not in self.seen]:
+            del self.dirs[path]
+
+        dir_path = os.path.dirname(self.cache_path)
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            if (os.path.exists(dir_path) == False):
+                os.makedirs(dir_path)
+            with open(tmp_path, 'w') as cache_file:
+                json.dump({"version": self.cache_version, "files": self.files, "dirs": self.dirs}, cache_file)
+            os.rename(tmp_path, self.cache_path)
+            self.dirty = False
+            logging.debug("DesktopEntryCache.save: cache saved on %s" % self.cache_path)
+        except (IOError, OSError) as e:
+            logging.warning("DesktopEntryCache.save: error saving %s : %s" % (self.cache_path, e))
+
+    def file_key(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime, stat.st_size, stat.st_ino]
+
+    def lookup(self, path):
+        """ Return the cached fields of path, or None if they are missing or outdated"""
+        key = None
+        if (self.enabled == True):
+            key = self.file_key(path)
+        with self.lock:
+            self.seen.add(path)
+            cached = self.files.get(path)
+            if (key is not None and cached is not None and cached["stat"] == key):
+                self.hits = self.hits + 1
+                return cached["entry"]
+            self.misses = self.misses + 1
+        return None
+
+    def store(self, path, entry):
+        if (self.enabled == True):
+            key = self.file_key(path)
+            if (key is not None):
+                with self.lock:
+                    self.files[path] = {"stat": key, "entry": entry}
+                    self.dirty = True
+
+    def lookup_directory(self, path):
+        """ Return the cached list of files of the directory path, or None if it changed"""
+        with self.lock:
+            self.seen.add(path)
+        if (self.enabled == True):
+            cached = self.dirs.get(path)
+            if (cached is not None):
+                try:
+                    if (cached["mtime"] == os.stat(path).st_mtime):
+                        return cached["list"]
+                except OSError:
+                    pass
+        return None
+
+    def store_directory(self, path, list_files):
+        if (self.enabled == True):
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                return
+            with self.lock:
+                self.dirs[path] = {"mtime": mtime, "list": list_files}
+                self.dirty = True
+
+    def print_stats(self):
+        logging.info("DesktopEntryCache: %s hits, %s misses" % (self.hits, self.misses))
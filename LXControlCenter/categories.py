@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import gettext
+_ = gettext.gettext
+
+from .utils import intern_string
+
+# Desktop category => bit, shared by all the items and tables of the process
+categories_bits = {}
+
+def get_categories_mask(categories):
+    """ Mask of the bits of categories, a new bit is given to each category not seen before"""
+    mask = 0
+    for category in categories:
+        bit = categories_bits.get(category)
+        if (bit is None):
+            bit = 1 << len(categories_bits)
+            categories_bits[intern_string(category)] = bit
+        mask = mask | bit
+    return mask
+
+class CategoryTable(object):
+    """ Desktop categories of categories_triaged, compiled in a mask, to define the category of the items.
+        A table is never modified, a new one is compiled when categories_triaged changes."""
+
+    def __init__(self, categories_triaged):
+        self.mask = get_categories_mask(categories_triaged.keys())
+        # Bit => desktop category
+        self.names = dict((categories_bits[c], intern_string(c)) for c in categories_triaged.keys())
+        self.other = _("Other")
+
+    def assign(self, item):
+        """ Set the category of item : the category of the table the most listed by item,
+            the first listed if several are, Other if none"""
+        mask = item.categories_mask & self.mask
+        if (mask == 0):
+            item.category = self.other
+        elif (mask & (mask - 1) == 0):
+            # Only one category
+            item.category = self.names[mask]
+        else:
+            counts = {}
+            for category in item.categories_list:
+                bit = categories_bits.get(category, 0)
+                if (bit & mask):
+                    counts[category] = counts.get(category, 0) + 1
+            best = None
+            for category in item.categories_list:
+                if (category in counts and (best is None or counts[category] > counts[best])):
+                    best = category
+            item.category = intern_string(best)
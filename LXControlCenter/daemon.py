@@ -0,0 +1,407 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import sys
+import json
+import errno
+import socket
+import select
+import signal
+import logging
+
+from .base import Main
+from .launcher import LaunchError
+
+# Messages are JSON objects, one per line
+PROTOCOL_VERSION = 1
+
+def get_socket_path():
+    """ Path of the socket of the daemon, or None without XDG_RUNTIME_DIR"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if (not runtime_dir):
+        return None
+    return os.path.join(runtime_dir, "lx-control-center.sock")
+
+def encode_message(message):
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+class DaemonError(Exception):
+    pass
+
+class DaemonClient(object):
+    """ Connection of a frontend to the daemon.
+        After subscribe(), it has the interface of DirectoryWatcher, to be watched by the main loop
+        of the frontends : the daemon notifies the changes, Main.update_items_from_daemon gets them."""
+
+    def __init__(self, socket_path, timeout=2.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.socket = None
+        self.buffer = b""
+        # Socket receiving the notifications of the daemon
+        self.events_socket = None
+        self.events_buffer = b""
+        self.pending = False
+        # The daemon stopped, items must be scanned in process
+        self.lost = False
+        self.overflow = False
+
+    def open_socket(self):
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client_socket.settimeout(self.timeout)
+        try:
+            client_socket.connect(self.socket_path)
+        except socket.error:
+            client_socket.close()
+            raise
+        return client_socket
+
+    def connect(self):
+        """ Connect to the daemon, return False if it's not running"""
+        try:
+            self.socket = self.open_socket()
+        except socket.error as e:
+            logging.debug("DaemonClient.connect: no daemon on %s : %s" % (self.socket_path, e))
+            return False
+        return True
+
+    def read_line(self, client_socket, buffer):
+        while (b"\n" not in buffer):
+            data = client_socket.recv(65536)
+            if (not data):
+                raise DaemonError("connection closed by the daemon")
+            buffer = buffer + data
+        line, buffer = buffer.split(b"\n", 1)
+        return json.loads(line.decode("utf-8")), buffer
+
+    def exchange(self, message):
+        """ Send message to the daemon and return its response, even an error.
+            Raise DaemonError if the daemon can't be reached."""
+        if (self.socket is None):
+            raise DaemonError("not connected")
+        try:
+            self.socket.sendall(encode_message(message))
+            response, self.buffer = self.read_line(self.socket, self.buffer)
+        except (socket.error, ValueError) as e:
+            raise DaemonError(str(e))
+        return response
+
+    def request(self, message):
+        """ Send message to the daemon and return its response. Raise DaemonError on failure"""
+        response = self.exchange(message)
+        if ("error" in response):
+            raise DaemonError(response["error"])
+        return response
+
+    def launch(self, path):
+        """ Ask the daemon to launch the application path, return False if it was not launched.
+            Raise LaunchError if the daemon failed to launch it."""
+        try:
+            response = self.exchange({"command": "launch", "path": path})
+        except DaemonError as e:
+            logging.warning("DaemonClient.launch: error launching %s : %s" % (path, e))
+            return False
+        if ("error" in response):
+            if ("launched" in response):
+                # Found by the daemon but not launchable, launching in process would fail the same way
+                raise LaunchError(response["error"])
+            logging.warning("DaemonClient.launch: error launching %s : %s" % (path, response["error"]))
+            return False
+        return response.get("launched", False)
+
+    def subscribe(self):
+        """ Open the socket receiving the notifications of changes"""
+        try:
+            self.events_socket = self.open_socket()
+            self.events_socket.sendall(encode_message({"command": "subscribe"}))
+            response, self.events_buffer = self.read_line(self.events_socket, self.events_buffer)
+        except (socket.error, ValueError, DaemonError) as e:
+            logging.warning("DaemonClient.subscribe: error subscribing : %s" % e)
+            if (self.events_socket is not None):
+                self.events_socket.close()
+                self.events_socket = None
+            return False
+        self.events_socket.setblocking(False)
+        return True
+
+    def is_available(self):
+        return self.events_socket is not None and self.lost == False
+
+    def fileno(self):
+        return self.events_socket.fileno()
+
+    def read_events(self):
+        """ Read the notifications, without blocking. Return the number of notifications read."""
+        nbr_events = 0
+        while True:
+            try:
+                data = self.events_socket.recv(65536)
+            except socket.error as e:
+                if (e.errno in (errno.EAGAIN, errno.EWOULDBLOCK)):
+                    break
+                data = b""
+            if (not data):
+                logging.warning("DaemonClient.read_events: connection to the daemon lost")
+                self.lost = True
+                break
+            self.events_buffer = self.events_buffer + data
+
+        while (b"\n" in self.events_buffer):
+            line, self.events_buffer = self.events_buffer.split(b"\n", 1)
+            nbr_events = nbr_events + 1
+            self.pending = True
+        return nbr_events
+
+    def is_ready(self):
+        return self.pending == True or self.lost == True
+
+    def pop_changes(self):
+        """ Changes are requested to the daemon, see Main.update_items_from_daemon"""
+        self.pending = False
+        return set()
+
+    def close(self):
+        for client_socket in (self.socket, self.events_socket):
+            if (client_socket is not None):
+                client_socket.close()
+        self.socket = None
+        self.events_socket = None
+
+class Daemon(Main):
+    """ Keep the items loaded and the directories watched, and serve the items
+        to the frontends over a UNIX socket in XDG_RUNTIME_DIR."""
+
+    def __init__(self):
+        Main.__init__(self)
+        # Path => desktop entry of the items, sent to the frontends
+        self.entries = {}
+        # Incremented on each change of the items
+        self.generation = 0
+        # [(generation, paths changed)], the oldest first
+        self.changes = []
+        self.changes_max = 100
+        self.server = None
+        self.socket_path = None
+        # Client socket => data received, not yet processed
+        self.clients = {}
+        self.subscribers = set()
+
+    def get_desktop_entry(self, path, categories_filter=None):
+        entry = Main.get_desktop_entry(self, path, categories_filter)
+        if (entry is not None and entry.get("partial") != True):
+            self.entries[path] = entry
+        return entry
+
+    def list_all_applications_from_menu_cache(self):
+        list_app = Main.list_all_applications_from_menu_cache(self)
+        if (list_app is not None):
+            for path, entry in list_app:
+                self.entries[path] = entry
+        return list_app
+
+    def item_to_data(self, item):
+        return {"path": item.path,
+                "type": item.type,
+                "entry": self.entries.get(item.path),
+                "activate": item.activate,
+                "category": item.category}
+
+    def start_server(self):
+        self.socket_path = get_socket_path()
+        if (self.socket_path is None):
+            logging.error("start_server: XDG_RUNTIME_DIR is not set")
+            return False
+
+        probe = DaemonClient(self.socket_path)
+        if (probe.connect() == True):
+            probe.close()
+            logging.error("start_server: a daemon is already running on %s" % self.socket_path)
+            return False
+        if (os.path.exists(self.socket_path)):
+            # Left by a daemon which didn't stop properly
+            os.unlink(self.socket_path)
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self.server.listen(16)
+        logging.info("start_server: listening on %s" % self.socket_path)
+        return True
+
+    def stop_server(self):
+        for client_socket in list(self.clients):
+            self.drop_client(client_socket)
+        if (self.server is not None):
+            self.server.close()
+            self.server = None
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def drop_client(self, client_socket):
+        self.clients.pop(client_socket, None)
+        self.subscribers.discard(client_socket)
+        client_socket.close()
+
+    def send(self, client_socket, message):
+        try:
+            client_socket.sendall(encode_message(message))
+        except socket.error as e:
+            logging.debug("send: dropping client : %s" % e)
+            self.drop_client(client_socket)
+
+    def main(self, args=None):
+        # Before loading, which scans all the items
+        self.get_args_parameters(args)
+        if (self.daemon_args == False):
+            sys.stderr.write("Pass --daemon to run the daemon of lx-control-center\n")
+            return 2
+        self.load(args)
+        if (self.start_server() == False):
+            return 1
+        self.watch_directories()
+        # Stop properly (and remove the socket) when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            while True:
+                self.process_events()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop_server()
+        return 0
+
+    def process_events(self):
+        sockets = [self.server] + list(self.clients)
+        timeout = None
+        if (self.watcher is not None):
+            sockets.append(self.watcher.fileno())
+            if (len(self.watcher.pending) > 0 or self.watcher.overflow == True):
+                timeout = self.watcher.debounce
+        if (len(self.launcher.children) > 0):
+            # Wake up to wait for the applications launched
+            timeout = min(timeout or self.children_poll_delay, self.children_poll_delay)
+
+        try:
+            readable = select.select(sockets, [], [], timeout)[0]
+        except (select.error, OSError) as e:
+            if (e.args[0] == errno.EINTR):
+                return
+            raise
+
+        for ready in readable:
+            if (ready is self.server):
+                client_socket, address = self.server.accept()
+                # A client not reading its responses must not block the others
+                client_socket.settimeout(5.0)
+                self.clients[client_socket] = b""
+            elif (self.watcher is not None and ready == self.watcher.fileno()):
+                self.watcher.read_events()
+            elif (ready in self.clients):
+                self.read_client(ready)
+
+        if (self.watcher is not None and self.watcher.is_ready() == True):
+            changed = self.update_items_from_paths(self.watcher.pop_changes())
+            if (len(changed) > 0):
+                self.record_changes(changed)
+
+        self.launcher.reap()
+
+    def read_client(self, client_socket):
+        try:
+            data = client_socket.recv(65536)
+        except socket.error:
+            data = b""
+        if (not data):
+            self.drop_client(client_socket)
+            return
+        buffer = self.clients[client_socket] + data
+        while (b"\n" in buffer):
+            line, buffer = buffer.split(b"\n", 1)
+            try:
+                request = json.loads(line.decode("utf-8"))
+                response = self.handle_request(client_socket, request)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                response = {"error": "invalid request : %s" % e}
+            self.send(client_socket, response)
+            if (client_socket not in self.clients):
+                return
+        self.clients[client_socket] = buffer
+
+    def handle_request(self, client_socket, request):
+        command = request["command"]
+        logging.debug("handle_request: %s" % command)
+        if (command == "ping"):
+            return {"version": PROTOCOL_VERSION, "generation": self.generation}
+        elif (command == "items"):
+            return {"version": PROTOCOL_VERSION,
+                    "generation": self.generation,
+                    "items": [self.item_to_data(i) for i in self.items]}
+        elif (command == "changes"):
+            return self.get_changes(request["generation"])
+        elif (command == "launch"):
+            i = self.items.get_by_path(request["path"])
+            if (i is None or i.type != "application"):
+                return {"launched": False}
+            try:
+                self.launch_item(i)
+            except LaunchError as e:
+                logging.warning("handle_request: error launching %s : %s" % (i.path, e))
+                return {"launched": False, "error": str(e)}
+            return {"launched": True}
+        elif (command == "subscribe"):
+            self.subscribers.add(client_socket)
+            return {"generation": self.generation}
+        return {"error": "unknown command %s" % command}
+
+    def record_changes(self, paths):
+        self.generation = self.generation + 1
+        self.changes.append((self.generation, set(paths)))
+        if (len(self.changes) > self.changes_max):
+            self.changes.pop(0)
+        for path in paths:
+            if (self.items.get_by_path(path) is None):
+                self.entries.pop(path, None)
+        logging.info("record_changes: generation %s, %s items changed" % (self.generation, len(paths)))
+        for client_socket in list(self.subscribers):
+            self.send(client_socket, {"event": "changed", "generation": self.generation})
+
+    def get_changes(self, generation):
+        """ Return the items changed and the paths removed since generation,
+            or all the items if the changes are too old"""
+        if (generation > self.generation or (len(self.changes) > 0 and generation < self.changes[0][0] - 1)):
+            return {"generation": self.generation,
+                    "full": True,
+                    "items": [self.item_to_data(i) for i in self.items]}
+        paths = set()
+        for change_generation, change_paths in self.changes:
+            if (change_generation > generation):
+                paths.update(change_paths)
+        items = []
+        removed = []
+        for path in paths:
+            i = self.items.get_by_path(path)
+            if (i is None):
+                removed.append(path)
+            else:
+                items.append(self.item_to_data(i))
+        return {"generation": self.generation, "full": False, "items": items, "removed": removed}
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import time
+import logging
+import threading
+
+monotonic = getattr(time, "monotonic", time.time)
+
+class ExecutableIndex(object):
+    """ Names of the files of the directories of PATH, scanned once, to find the programs of
+        TryExec and Exec without a lookup in each directory for each item.
+        The directories are scanned again when their mtime changes, see refresh. A directory
+        not scanned before timeout (a slow network mount) is skipped until the next refresh."""
+
+    def __init__(self, timeout=1.0):
+        self.timeout = timeout
+        self.path = None
+        # Directories of PATH, in order
+        self.dirs = []
+        # Directory => (mtime at the scan, names)
+        self.dirs_names = {}
+        # Name => path of the executable, in the first directory of PATH having it
+        self.names = {}
+        # Path => executable or not, checked once
+        self.access_cache = {}
+        # Directory => (mtime, names) of the scans, written by the threads, including the ones finished after the timeout
+        self.scans = {}
+        # Directory => mtime, written by the threads checking the directories
+        self.mtimes = {}
+        # Directories still being scanned
+        self.pending = set()
+        self.lock = threading.Lock()
+        # Incremented each time the index changes
+        self.generation = 0
+        self.scanned = False
+
+    def get_dirs(self, path):
+        dirs = []
+        for directory in path.split(os.pathsep):
+            # An empty directory is the working directory, which is not indexed
+            if (directory != "" and os.path.isabs(directory) and directory not in dirs):
+                dirs.append(directory)
+        return dirs
+
+    def get_mtime(self, directory):
+        try:
+            return os.stat(directory).st_mtime
+        except OSError:
+            return None
+
+    def scan_directory(self, directory):
+        """ Read the mtime and the names of directory, in a thread of run_timed"""
+        mtime = self.get_mtime(directory)
+        names = frozenset()
+        if (mtime is not None):
+            try:
+                names = frozenset(os.listdir(directory))
+            except OSError:
+                pass
+        with self.lock:
+            self.scans[directory] = (mtime, names)
+            self.pending.discard(directory)
+
+    def check_directory(self, directory):
+        """ Read the mtime of directory, in a thread of run_timed"""
+        mtime = self.get_mtime(directory)
+        with self.lock:
+            self.mtimes[directory] = mtime
+            self.pending.discard(directory)
+
+    def run_timed(self, function, dirs, results):
+        """ Run function(directory) in a thread for each directory of dirs, and wait for them until timeout.
+            function stores its result in results. Return directory => result for the ones finished in time.
+            A directory still blocked since a previous call is skipped."""
+        threads = []
+        for directory in dirs:
+            with self.lock:
+                results.pop(directory, None)
+                if (directory in self.pending):
+                    continue
+                self.pending.add(directory)
+            thread = threading.Thread(target=function, args=(directory,))
+            thread.daemon = True
+            thread.start()
+            threads.append((directory, thread))
+
+        deadline = monotonic() + self.timeout
+        for directory, thread in threads:
+            thread.join(max(0.0, deadline - monotonic()))
+            if (thread.is_alive()):
+                logging.warning("ExecutableIndex.run_timed: %s not read after %ss, skipped" % (directory, self.timeout))
+        finished = {}
+        with self.lock:
+            for directory, thread in threads:
+                if (directory in results):
+                    finished[directory] = results.pop(directory)
+        return finished
+
+    def scan_directories(self, dirs):
+        """ Scan dirs in parallel, return directory => (mtime, names) for the ones scanned in time.
+            The others are kept in self.scans when they finish, see refresh."""
+        return self.run_timed(self.scan_directory, dirs, self.scans)
+
+    def build_names(self):
+        self.names = {}
+        for directory in reversed(self.dirs):
+            if (directory in self.dirs_names):
+                for name in self.dirs_names[directory][1]:
+                    self.names[name] = os.path.join(directory, name)
+        self.access_cache = {}
+        self.generation = self.generation + 1
+
+    def scan(self):
+        """ Scan all the directories of PATH"""
+        self.path = os.environ.get("PATH", os.defpath)
+        self.dirs = self.get_dirs(self.path)
+        self.dirs_names = self.scan_directories(self.dirs)
+        self.scanned = True
+        self.build_names()
+        logging.debug("ExecutableIndex.scan: %s names in %s directories" % (len(self.names), len(self.dirs_names)))
+
+    def refresh(self):
+        """ Scan again the directories changed since the last scan. Return True if the index changed."""
+        if (self.scanned == False or os.environ.get("PATH", os.defpath) != self.path):
+            self.scan()
+            return True
+
+        late = []
+        changed = []
+        with self.lock:
+            for directory in self.dirs:
+                if (directory in self.scans):
+                    # Finished after the timeout
+                    self.dirs_names[directory] = self.scans.pop(directory)
+                    late.append(directory)
+        # Directories blocked (not in mtimes) keep their names
+        mtimes = self.run_timed(self.check_directory, [d for d in self.dirs if d in self.dirs_names], self.mtimes)
+        for directory in self.dirs:
+            if (directory in self.dirs_names):
+                if (directory in mtimes and mtimes[directory] != self.dirs_names[directory][0]):
+                    changed.append(directory)
+            elif (directory not in self.pending):
+                changed.append(directory)
+
+        if (len(changed) > 0):
+            logging.debug("ExecutableIndex.refresh: scanning %s again" % changed)
+            for directory in changed:
+                self.dirs_names.pop(directory, None)
+            self.dirs_names.update(self.scan_directories(changed))
+        if (len(changed) > 0 or len(late) > 0):
+            self.build_names()
+            return True
+        if (self.refresh_access_cache() == True):
+            self.generation = self.generation + 1
+            return True
+        return False
+
+    def refresh_access_cache(self):
+        """ Check again the executables outside the directories of PATH (TryExec with a path),
+            which are not checked again with their directory. Return True if one changed."""
+        changed = False
+        for path in list(self.access_cache):
+            if (os.path.dirname(path) in self.dirs_names):
+                continue
+            executable = os.path.isfile(path) and os.access(path, os.X_OK)
+            if (executable != self.access_cache[path]):
+                self.access_cache[path] = executable
+                changed = True
+        return changed
+
+    def is_executable(self, path):
+        if (path not in self.access_cache):
+            self.access_cache[path] = os.path.isfile(path) and os.access(path, os.X_OK)
+        return self.access_cache[path]
+
+    def find(self, program):
+        """ Path of the executable program (a name looked up in PATH, or a path), None if not found"""
+        if (self.scanned == False):
+            self.scan()
+        if (program == ""):
+            return None
+        if (os.sep in program):
+            if (os.path.isabs(program) and self.is_executable(program)):
+                return program
+            return None
+        path = self.names.get(program)
+        if (path is None):
+            return None
+        if (self.is_executable(path) == True):
+            return path
+        # Not executable in the first directory having it, like the shell look in the next ones
+        for directory in self.dirs:
+            if (directory in self.dirs_names and program in self.dirs_names[directory][1]):
+                path = os.path.join(directory, program)
+                if (self.is_executable(path) == True):
+                    return path
+        return None
@@ -18,113 +18,98 @@
 #       MA 02110-1301, USA.
 
 import os.path
-import sys
 import logging
-import subprocess
 
-from .utils import Utils
+from .utils import Utils, intern_string
+from .categories import get_categories_mask
 
-import gettext
-_ = gettext.gettext
+def intern_list(values):
+    """ values as a tuple of shared strings, the same empty tuple for all the items without values"""
+    if (not values):
+        return ()
+    return tuple(intern_string(v) for v in values)
 
 class Item(Utils):
-    def __init__(self, categories_array):
-        Utils.__init__(self)
-
+    """ An application, or a module (see ModuleItem).
+        There are many items, so they have no __dict__, and the strings found in many items
+        (categories, desktop environments, icon names) are shared."""
+
+    __slots__ = ("path", "filename", "name", "generic_name", "comment", "keywords", "category", "categories_list", "categories_mask",
+                 "icon", "icon_type", "try_exec", "only_show_in", "not_show_in", "activate", "check",
+                 "type", "execute_command")
+
+    # Module specific, see ModuleItem
+    module_replace_application = ()
+    module_depends = ()
+    module_version = 0.0
+    module_api_version = 0.0
+    module_spec = None
+    module_toolkit = None
+
+    def __init__(self):
         # Item structure
         self.path = ""
         self.filename = ""
-        self.version_config = 0.1
         self.name = ""
-        self.name_original = ""
+        self.generic_name = ""
         self.comment = ""
-        self.comment_original = ""
+        self.keywords = ()
         self.category = ""
-        self.categories_list = []
-        self.categories_array = categories_array
+        self.categories_list = ()
+        # Bits of categories_list, the category is defined by CategoryTable.assign
+        self.categories_mask = 0
         self.icon = ""
         # Icon type : themed, fix or fallback
         self.icon_type = ""
-        self.icon_original = ""
         self.try_exec = ""
-        self.only_show_in = []
-        self.not_show_in = []
+        self.only_show_in = ()
+        self.not_show_in = ()
         self.activate = True
-        self.changed = False
         self.check = True
 
         # module or application
         self.type = ""
 
         # application specific
-        self.execute_command =""
-        
-        # module specific
-        self.module_replace_application = []
-        self.module_depends = []
-        self.module_version = 0.0
-        self.module_api_version = 0.0
-        self.module_spec = None
-        self.module_toolkit = None
+        self.execute_command = ""
 
-    def load_common_app_module_from_path(self,path,keyfile):
+    def load_common_app_module_from_entry(self, path, entry):
         self.path = path
         self.filename = os.path.basename(path)
 
-        self.name = keyfile.getName()
-        self.comment = keyfile.getComment()
-        self.categories_list = keyfile.getCategories()
-        self.icon = keyfile.getIcon()
-        self.only_show_in = keyfile.getOnlyShowIn()
-        self.not_show_in = keyfile.getNotShowIn()
-        self.execute_command = keyfile.getExec()
-        self.try_exec = keyfile.getTryExec()
-
-        self.name_original = self.name
-        self.comment_original = self.comment
-        self.icon_original = self.icon
+        self.name = entry["name"]
+        self.comment = entry["comment"]
+        # Not in the entries of an older daemon
+        self.generic_name = entry.get("generic_name") or ""
+        self.keywords = intern_list(entry.get("keywords"))
+        self.categories_list = entry["categories"]
+        if (self.categories_list is not None):
+            self.categories_list = intern_list(self.categories_list)
+            self.categories_mask = get_categories_mask(self.categories_list)
+        self.icon = entry["icon"]
+        if (self.icon):
+            self.icon = intern_string(self.icon)
+        self.only_show_in = intern_list(entry["only_show_in"])
+        self.not_show_in = intern_list(entry["not_show_in"])
+        self.execute_command = entry["exec"]
+        self.try_exec = entry["try_exec"]
 
         self.category = None
-        self.version_config = 0.1
         # Check if there are the minimum informations
         self.check_common()
 
-        self.define_category_from_list()
         self.define_icon_type()
 
-    def load_application_from_path(self, path):
-        keyfile = self.load_xdgfile(path)
-        self.load_common_app_module_from_path(path, keyfile)
-        self.type = "application"
+    def load_common_app_module_from_path(self, path, keyfile):
+        self.load_common_app_module_from_entry(path, self.desktop_entry_from_xdgfile(keyfile))
 
+    def load_application_from_entry(self, path, entry):
+        self.load_common_app_module_from_entry(path, entry)
+        self.type = "application"
 
-    def load_module_from_path(self, path):
+    def load_application_from_path(self, path):
         keyfile = self.load_xdgfile(path)
-        self.load_common_app_module_from_path(path, keyfile)
-        self.type = "module"
-        self.module_replace_application = keyfile.get("X-LX-Control-Center-Application-Replaces", group="Desktop Entry", type="string", list=True)
-        self.module_depends = keyfile.get("X-LX-Control-Center-Depends", group="Desktop Entry", type="string", list=True)
-        self.module_version = keyfile.get("X-LX-Control-Center-Version", group="Desktop Entry", type="numeric")
-        self.module_api_version = keyfile.get("X-LX-Control-Center-API-Version", group="Desktop Entry", type="numeric")
-        self.module_toolkit = keyfile.get("X-LX-Control-Center-Toolkit", group="Desktop Entry", type="string")
-        self.check_module()
-
-    def define_category_from_list(self):
-        logging.debug("define_category_from_list: enter function with categories_list = %s" % self.categories_list)
-        logging.debug("define_category_from_list: enter function with categories_array = %s" % self.categories_array)
-        tmp_dict = {}
-        keys = self.categories_array.keys()
-        for item in self.categories_list:
-            if (item in keys):
-                if (item in tmp_dict.keys()):
-                    tmp_dict[item] = tmp_dict[item] + 1
-                else:
-                    tmp_dict[item] = 1
-        if (len(tmp_dict) == 0):
-            self.category = _("Other")
-        else:
-            max_category = max(tmp_dict.keys(), key=(lambda k: tmp_dict[k]))
-            self.category = max_category
+        self.load_application_from_entry(path, self.desktop_entry_from_xdgfile(keyfile))
 
     def define_icon_type(self):
         if (len(self.icon) > 0):
@@ -143,6 +128,35 @@ class Item(Utils):
         if (self.execute_command == None):
             self.check = False
 
+class ModuleItem(Item):
+    """ A module of lx-control-center, with the fields of modules"""
+
+    __slots__ = ("module_replace_application", "module_depends", "module_version", "module_api_version",
+                 "module_spec", "module_toolkit")
+
+    def __init__(self):
+        Item.__init__(self)
+        self.module_replace_application = ()
+        self.module_depends = ()
+        self.module_version = 0.0
+        self.module_api_version = 0.0
+        self.module_spec = None
+        self.module_toolkit = None
+
+    def load_module_from_entry(self, path, entry):
+        self.load_common_app_module_from_entry(path, entry)
+        self.type = "module"
+        self.module_replace_application = intern_list(entry["module_replace_application"])
+        self.module_depends = intern_list(entry["module_depends"])
+        self.module_version = entry["module_version"]
+        self.module_api_version = entry["module_api_version"]
+        self.module_toolkit = entry["module_toolkit"]
+        self.check_module()
+
+    def load_module_from_path(self, path):
+        keyfile = self.load_xdgfile(path)
+        self.load_module_from_entry(path, self.desktop_entry_from_xdgfile(keyfile))
+
     def check_module(self):
         if (self.module_api_version <= 0.0):
             self.check = False
@@ -150,35 +164,3 @@ class Item(Utils):
         if (self.module_version == 0.0):
             self.check = False
             
-    def launch(self):
-        logging.info("launch: trying execute : %s" % self.execute_command)
-        if (self.type == "application"):
-            try:
-                command_to_excecute = self.execute_command.split(" ")
-                for i in command_to_excecute:
-                    if (i[0] == "%"):
-                        command_to_excecute.remove(i)
-
-                subprocess.Popen(command_to_excecute)
-            except:
-                logging.info("launch: error launching %s" % command_to_excecute)
-        elif (self.type == "module"):
-            python_version = sys.version_info
-            module_path = os.path.join(os.path.dirname(self.path),self.execute_command)
-            if (python_version[0] == 2):
-                import imp
-                self.module_spec = imp.load_source('module.name', module_path)
-            elif (python_version[0] == 3):
-                if(python_version[1] < 3.5):
-                    from importlib.machinery import SourceFileLoader
-                    self.module_spec = SourceFileLoader("module.name", module_path).load_module()
-                else:
-                    import importlib.util
-                    logging.debug("launch: trying to import : %s" % module_path)
-                    spec = importlib.util.spec_from_file_location("module.name", module_path)
-                    self.module_spec = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(self.module_spec)
-
-
-
-
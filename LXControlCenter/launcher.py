@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import sys
+import time
+import errno
+import logging
+
+monotonic = getattr(time, "monotonic", time.time)
+
+# os.posix_spawn exists since python 3.7, its setsid argument since 3.8
+POSIX_SPAWN_SETSID = hasattr(os, "posix_spawn") and sys.version_info >= (3, 8)
+
+# Escapes of the string values of desktop files
+STRING_ESCAPES = {"s": " ", "n": "\n", "t": "\t", "r": "\r", "\\": "\\"}
+
+# Characters escaped by a backslash in a quoted argument of Exec
+QUOTED_ESCAPES = '"`$\\'
+
+# Field codes of files and URLs (and deprecated ones), removed : the applications are launched without files
+FIELD_CODES_REMOVED = "fFuUdDnNvm"
+
+# Variables of lx-control-center, not passed to the applications
+ENVIRONMENT_REMOVED = ["DESKTOP_STARTUP_ID", "LXCC_PROFILE", "LXCC_PROFILE_DUMP"]
+
+class LaunchError(Exception):
+    pass
+
+def unescape_string(value):
+    """ Value of a string key of a desktop file, with \\s, \\n, \\t, \\r and \\\\ replaced"""
+    if ("\\" not in value):
+        return value
+    result = []
+    escaped = False
+    for char in value:
+        if (escaped == True):
+            result.append(STRING_ESCAPES.get(char, "\\" + char))
+            escaped = False
+        elif (char == "\\"):
+            escaped = True
+        else:
+            result.append(char)
+    if (escaped == True):
+        result.append("\\")
+    return "".join(result)
+
+def split_exec(exec_value):
+    """ Split an Exec value in arguments, as defined by the Desktop Entry specification.
+        Return a list of (argument, quoted). Raise LaunchError if a quote is not closed."""
+    exec_value = unescape_string(exec_value)
+    args = []
+    current = []
+    in_arg = False
+    quoted = False
+    in_quotes = False
+    index = 0
+    while (index < len(exec_value)):
+        char = exec_value[index]
+        if (in_quotes == True):
+            if (char == "\\" and index + 1 < len(exec_value) and exec_value[index + 1] in QUOTED_ESCAPES):
+                index = index + 1
+                current.append(exec_value[index])
+            elif (char == '"'):
+                in_quotes = False
+            else:
+                current.append(char)
+        elif (char == '"'):
+            in_quotes = True
+            in_arg = True
+            quoted = True
+        elif (char in " \t\n"):
+            if (in_arg == True):
+                args.append(("".join(current), quoted))
+            current = []
+            in_arg = False
+            quoted = False
+        else:
+            current.append(char)
+            in_arg = True
+        index = index + 1
+    if (in_quotes == True):
+        raise LaunchError("unterminated quote in Exec : %s" % exec_value)
+    if (in_arg == True):
+        args.append(("".join(current), quoted))
+    return args
+
+def expand_field_codes(arg, name, icon, desktop_path):
+    """ Arguments replacing arg, with its field codes expanded"""
+    if (arg == "%i"):
+        if (icon):
+            return ["--icon", icon]
+        return []
+    if (len(arg) == 2 and arg[0] == "%" and arg[1] in FIELD_CODES_REMOVED):
+        return []
+    result = []
+    index = 0
+    while (index < len(arg)):
+        char = arg[index]
+        if (char == "%" and index + 1 < len(arg)):
+            index = index + 1
+            code = arg[index]
+            if (code == "%"):
+                result.append("%")
+            elif (code == "c"):
+                result.append(name)
+            elif (code == "k"):
+                result.append(desktop_path)
+            elif (code == "i"):
+                result.append(icon)
+            elif (code not in FIELD_CODES_REMOVED):
+                logging.warning("expand_field_codes: unknown field code %%%s in %s" % (code, arg))
+        else:
+            result.append(char)
+        index = index + 1
+    return ["".join(result)]
+
+def parse_exec(exec_value, name="", icon="", desktop_path=""):
+    """ Arguments of the command of an Exec value, with its field codes expanded.
+        Raise LaunchError if it's not valid."""
+    args = []
+    for arg, quoted in split_exec(exec_value):
+        if (quoted == True):
+            # Field codes can't be quoted
+            args.append(arg)
+        else:
+            args.extend(expand_field_codes(arg, name, icon, desktop_path))
+    if (len(args) == 0):
+        raise LaunchError("empty Exec")
+    return args
+
+def get_exec_program(exec_value):
+    """ The program of an Exec value, "" if it's not valid"""
+    try:
+        args = split_exec(exec_value)
+    except LaunchError:
+        return ""
+    if (len(args) == 0):
+        return ""
+    return args[0][0]
+
+def get_launch_environment():
+    env = dict(os.environ)
+    for variable in ENVIRONMENT_REMOVED:
+        env.pop(variable, None)
+    return env
+
+class Launcher(object):
+    """ Launch the applications and wait for them when they exit.
+        The frontends watch the children in their main loop (see Main.watch_child),
+        the others call reap regularly."""
+
+    def __init__(self, executables, profiler):
+        self.executables = executables
+        self.profiler = profiler
+        # pid => (path of the item, subprocess.Popen when posix_spawn is not available)
+        self.children = {}
+
+    def launch(self, item):
+        """ Launch the application item, return its pid. Raise LaunchError if it can't be launched."""
+        if (item.type != "application"):
+            raise LaunchError("%s is not an application" % item.path)
+        start = monotonic()
+        args = parse_exec(item.execute_command, item.name, item.icon, item.path)
+        program = self.executables.find(args[0])
+        if (program is None):
+            raise LaunchError("%s not found" % args[0])
+        pid, process = self.spawn(program, args, get_launch_environment())
+        duration = monotonic() - start
+        self.children[pid] = (item.path, process)
+        self.profiler.count("launches")
+        logging.info("Launcher.launch: %s launched, pid %s, in %.3f s" % (item.path, pid, duration))
+        return pid
+
+    def spawn(self, program, args, env):
+        """ Start program, in its own session, return its pid and the Popen object if any"""
+        try:
+            if (POSIX_SPAWN_SETSID == True):
+                return os.posix_spawn(program, args, env, setsid=True), None
+            import subprocess
+            process = subprocess.Popen(args, executable=program, env=env, close_fds=True, preexec_fn=os.setsid)
+            return process.pid, process
+        except (OSError, ValueError, TypeError) as e:
+            raise LaunchError("error launching %s : %s" % (program, e))
+
+    def child_exited(self, pid, status):
+        """ Forget the child pid, already waited by the main loop"""
+        path, process = self.children.pop(pid, (None, None))
+        if (process is not None):
+            # Waited by the main loop, tell Popen not to wait for it
+            process.returncode = status
+        logging.debug("Launcher.child_exited: %s (pid %s) exited with status %s" % (path, pid, status))
+
+    def reap(self):
+        """ Wait for the children which exited, without blocking"""
+        for pid in list(self.children):
+            try:
+                waited_pid, status = os.waitpid(pid, os.WNOHANG)
+            except OSError as e:
+                if (e.errno != errno.ECHILD):
+                    raise
+                # Already waited
+                waited_pid, status = pid, 0
+            if (waited_pid == pid):
+                self.child_exited(pid, status)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import io
+import logging
+
+# Versions of the format written by menu-cache-gen which can be read
+SUPPORTED_VERSION_MAJOR = 1
+SUPPORTED_VERSION_MINOR = 2
+
+# Flags of the applications
+FLAG_USE_TERMINAL = 1 << 0
+FLAG_USE_SN = 1 << 1
+FLAG_IS_NODISPLAY = 1 << 2
+
+# Desktop environments of the first bits of show_in_flags, the file lists the other ones
+KNOWN_DESKTOP_ENVIRONMENTS = ["LXDE", "GNOME", "KDE", "XFCE", "ROX"]
+
+class MenuCacheError(Exception):
+    pass
+
+class MenuCache(object):
+    """ Reader of the files of menu-cache (libmenu-cache), in $XDG_CACHE_HOME/menus/.
+        The file lists the applications of a menu, with the fields of their desktop files, so the
+        desktop files don't have to be read. Only the format 1.2 is supported, older ones
+        don't have the categories of the applications."""
+
+    def __init__(self, path):
+        self.path = path
+        self.menu_name = None
+        # Directories and files used to generate the cache
+        self.dirs = []
+        # Desktop environments of the bits of show_in_flags
+        self.desktop_environments = list(KNOWN_DESKTOP_ENVIRONMENTS)
+        # Applications, as dicts. An application can be listed in several sub-menus, only once here
+        self.applications = []
+        self.lines = None
+
+    def read_line(self):
+        line = next(self.lines, None)
+        if (line is None):
+            raise MenuCacheError("unexpected end of file")
+        return line.rstrip("\n")
+
+    def load(self):
+        """ Read the cache file. Raise MenuCacheError if it can't be read"""
+        try:
+            with io.open(self.path, 'r', encoding='utf-8', errors='replace') as cache_file:
+                self.lines = iter(cache_file.readlines())
+        except (IOError, OSError) as e:
+            raise MenuCacheError("can't read %s : %s" % (self.path, e))
+
+        version = self.read_line().split(".")
+        try:
+            if (int(version[0]) != SUPPORTED_VERSION_MAJOR or int(version[1]) != SUPPORTED_VERSION_MINOR):
+                raise MenuCacheError("unsupported version %s" % ".".join(version))
+        except (ValueError, IndexError):
+            raise MenuCacheError("%s is not a menu-cache file" % self.path)
+
+        self.menu_name = self.read_line()
+        try:
+            nbr_dirs = int(self.read_line())
+        except ValueError:
+            raise MenuCacheError("invalid number of directories")
+        for i in range(nbr_dirs):
+            line = self.read_line()
+            # Paths can be prefixed by their type
+            if (line[:1] != os.sep):
+                line = line[1:]
+            self.dirs.append(line)
+        self.desktop_environments.extend(d for d in self.read_line().split(";") if d != "")
+
+        ids = set()
+        root = self.read_item(ids)
+        if (root is None or root["type"] != "dir"):
+            raise MenuCacheError("no root menu")
+        self.lines = None
+        logging.debug("MenuCache.load: %s applications in %s" % (len(self.applications), self.path))
+
+    def read_int(self):
+        try:
+            return int(self.read_line())
+        except ValueError:
+            raise MenuCacheError("invalid number")
+
+    def read_item(self, ids):
+        """ Read an item and its children, return None at the end of a directory"""
+        line = next(self.lines, None)
+        if (line is None):
+            return None
+        line = line.rstrip("\n")
+        if (line[:1] == "+"):
+            item = {"type": "dir"}
+        elif (line == "-"):
+            return {"type": "separator"}
+        elif (line[:1] == "-"):
+            item = {"type": "application"}
+        else:
+            return None
+        item["id"] = line[1:]
+        item["name"] = self.read_line()
+        item["comment"] = self.read_line()
+        item["icon"] = self.read_line()
+        item["file_name"] = self.read_line() or item["id"]
+        index = self.read_int()
+        if (index < 0 or index >= len(self.dirs)):
+            raise MenuCacheError("invalid directory index %s" % index)
+        item["file_dir"] = self.dirs[index]
+
+        if (item["type"] == "dir"):
+            item["flags"] = self.read_int()
+            while (self.read_item(ids) is not None):
+                pass
+        else:
+            item["generic_name"] = self.read_line()
+            item["exec"] = self.read_line()
+            item["flags"] = self.read_int()
+            item["show_in_flags"] = self.read_int()
+            item["try_exec"] = self.read_line()
+            item["working_dir"] = self.read_line()
+            item["categories"] = [c for c in self.read_line().split(";") if c != ""]
+            item["keywords"] = [k for k in self.read_line().split(";") if k != ""]
+            path = self.get_path(item)
+            if (path not in ids):
+                ids.add(path)
+                self.applications.append(item)
+        return item
+
+    def get_path(self, item):
+        return os.path.join(item["file_dir"], item["file_name"])
+
+    def is_not_show_in(self, item):
+        """ True if show_in_flags lists the desktop environments of NotShowIn.
+            menu-cache-gen writes the complement of their bits on 32 bits, so the bits after
+            the known desktop environments are set."""
+        flags = item["show_in_flags"] & 0xFFFFFFFF
+        return (flags >> len(self.desktop_environments)) != 0
+
+    def get_only_show_in(self, item):
+        """ Desktop environments of OnlyShowIn of item, empty list if there is none"""
+        if (self.is_not_show_in(item) == True):
+            return []
+        return [d for n, d in enumerate(self.desktop_environments) if item["show_in_flags"] & (1 << n)]
+
+    def get_not_show_in(self, item):
+        """ Desktop environments of NotShowIn of item, empty list if there is none"""
+        if (self.is_not_show_in(item) == False):
+            return []
+        return [d for n, d in enumerate(self.desktop_environments) if not item["show_in_flags"] & (1 << n)]
+
+    def is_stale(self):
+        """ True if a directory used to generate the cache changed after it"""
+        try:
+            cache_mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return True
+        for path in self.dirs:
+            try:
+                if (os.stat(path).st_mtime > cache_mtime):
+                    logging.debug("MenuCache.is_stale: %s changed after %s" % (path, self.path))
+                    return True
+            except OSError:
+                # Removed since the generation
+                return True
+        return False
+
+def find_menu_cache_file(cache_dir):
+    """ Return the most recent menu-cache file of cache_dir, or None"""
+    try:
+        files = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir)]
+    except OSError:
+        return None
+    files = [f for f in files if os.path.isfile(f)]
+    if (len(files) == 0):
+        return None
+    return max(files, key=os.path.getmtime)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import sys
+import re
+import json
+import logging
+
+def import_source(name, path):
+    """ Import the python file path as a module called name"""
+    python_version = sys.version_info
+    if (python_version[0] == 2):
+        import imp
+        return imp.load_source(name, path)
+    elif (python_version[1] < 5):
+        from importlib.machinery import SourceFileLoader
+        return SourceFileLoader(name, path).load_module()
+    else:
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except:
+            del sys.modules[name]
+            raise
+        return module
+
+class ModulesManager(object):
+    """ Import each module once, and keep its LXCC_Module instance for the whole session.
+        Count how many times each module is opened, to pre-import the most used ones."""
+
+    def __init__(self, usage_path):
+        self.usage_path = usage_path
+        # Path of the desktop file => (item, python module)
+        self.modules = {}
+        # Path of the desktop file => (item, LXCC_Module instance)
+        self.instances = {}
+        # Path of the desktop file => number of times opened
+        self.usage = {}
+        self.usage_dirty = False
+
+    def qualified_name(self, item):
+        """ Name of the python module of item, unique for each module directory"""
+        directory = os.path.dirname(os.path.abspath(item.path))
+        return "lxcc_module_%s" % re.sub("[^0-9a-zA-Z_]", "_", directory.strip(os.sep))
+
+    def import_module(self, item):
+        """ Return the python module of item, importing it only the first time"""
+        cached = self.modules.get(item.path)
+        # A new item for the same path means the module was updated on disk
+        if (cached is not None and cached[0] is item):
+            return cached[1]
+
+        module_path = os.path.join(os.path.dirname(item.path), item.execute_command)
+        name = self.qualified_name(item)
+        logging.debug("ModulesManager.import_module: importing %s as %s" % (module_path, name))
+        module = import_source(name, module_path)
+        self.modules[item.path] = (item, module)
+        self.instances.pop(item.path, None)
+        item.module_spec = module
+        return module
+
+    def get_instance(self, item):
+        """ Return the LXCC_Module of item, creating it only the first time"""
+        module = self.import_module(item)
+        cached = self.instances.get(item.path)
+        if (cached is not None and cached[0] is item):
+            return cached[1]
+        instance = module.LXCC_Module()
+        self.instances[item.path] = (item, instance)
+        return instance
+
+    def forget(self, path):
+        """ Drop the module and the instance of the item path"""
+        cached = self.modules.pop(path, None)
+        self.instances.pop(path, None)
+        if (cached is not None):
+            sys.modules.pop(self.qualified_name(cached[0]), None)
+
+    def record_use(self, item):
+        self.usage[item.path] = self.usage.get(item.path, 0) + 1
+        self.usage_dirty = True
+
+    def get_most_used(self, nbr):
+        """ Return the paths of the nbr modules opened the most often"""
+        paths = sorted(self.usage, key=(lambda p: self.usage[p]), reverse=True)
+        return paths[:nbr]
+
+    def load_usage(self):
+        try:
+            with open(self.usage_path, 'r') as usage_file:
+                usage = json.load(usage_file)
+            self.usage = dict((str(p), int(usage[p])) for p in usage)
+        except (IOError, OSError):
+            logging.debug("ModulesManager.load_usage: no usage file on %s" % self.usage_path)
+        except (ValueError, TypeError, AttributeError):
+            logging.warning("ModulesManager.load_usage: %s is corrupted, ignoring it" % self.usage_path)
+            self.usage = {}
+
+    def save_usage(self):
+        if (self.usage_dirty == False):
+            return
+        dir_path = os.path.dirname(self.usage_path)
+        tmp_path = self.usage_path + ".tmp"
+        try:
+            if (os.path.exists(dir_path) == False):
+                os.makedirs(dir_path)
+            with open(tmp_path, 'w') as usage_file:
+                json.dump(self.usage, usage_file)
+            os.rename(tmp_path, self.usage_path)
+            self.usage_dirty = False
+        except (IOError, OSError) as e:
+            logging.warning("ModulesManager.save_usage: error saving %s : %s" % (self.usage_path, e))
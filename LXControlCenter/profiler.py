@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import sys
+import time
+import json
+import atexit
+import logging
+import threading
+import contextlib
+import collections
+
+monotonic = getattr(time, "monotonic", time.time)
+
+# Environment variables, used when --profile and --profile-dump are not passed
+PROFILE_ENV = "LXCC_PROFILE"
+PROFILE_DUMP_ENV = "LXCC_PROFILE_DUMP"
+
+# Phases kept, the oldest are dropped in long running processes like the daemon
+PHASES_MAX = 256
+
+class Profiler(object):
+    """ Record the duration of the startup phases, the time of events (like the first paint)
+        and counters (like files parsed), and write them as a JSON report.
+        Timings are always recorded, the report is written only when the profiler is enabled."""
+
+    def __init__(self):
+        self.start_time = monotonic()
+        self.enabled = False
+        self.report_path = None
+        self.dump_path = None
+        self.cprofile = None
+        # [{"name", "start", "duration"}], times in seconds since start_time
+        self.phases = collections.deque(maxlen=PHASES_MAX)
+        # Event name => time since start_time
+        self.marks = {}
+        self.counters = {}
+        # Counters are incremented by the threads scanning directories
+        self.lock = threading.Lock()
+        self.startup_finished = False
+
+    def configure(self, report_path=None, dump_path=None):
+        """ Enable the profiler if a report path is given, or set in the environment"""
+        if (report_path is None):
+            report_path = os.environ.get(PROFILE_ENV)
+        if (dump_path is None):
+            dump_path = os.environ.get(PROFILE_DUMP_ENV)
+        if (not report_path and not dump_path):
+            return
+        self.enabled = True
+        self.report_path = report_path
+        self.dump_path = dump_path
+        if (self.dump_path):
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        atexit.register(self.write_report)
+        logging.info("Profiler.configure: report on %s, cProfile dump on %s" % (self.report_path, self.dump_path))
+
+    def elapsed(self):
+        return monotonic() - self.start_time
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """ Record the duration of the code inside the with block"""
+        start = monotonic()
+        try:
+            yield
+        finally:
+            end = monotonic()
+            self.phases.append({"name": name, "start": start - self.start_time, "duration": end - start})
+
+    def mark(self, name):
+        """ Record the time of the event name, only the first time"""
+        if (name not in self.marks):
+            self.marks[name] = self.elapsed()
+            logging.info("Profiler.mark: %s %.3f s after start" % (name, self.marks[name]))
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def finish_startup(self):
+        """ Called when the window is painted for the first time : stop cProfile and write the report"""
+        if (self.startup_finished == True):
+            return
+        self.startup_finished = True
+        self.mark("startup")
+        if (self.cprofile is not None):
+            self.cprofile.disable()
+            try:
+                self.cprofile.dump_stats(self.dump_path)
+            except (IOError, OSError) as e:
+                logging.warning("Profiler.finish_startup: error saving %s : %s" % (self.dump_path, e))
+        self.write_report()
+
+    def get_report(self):
+        return {"version": 1,
+                "python": "%s.%s.%s" % sys.version_info[:3],
+                "argv": sys.argv,
+                "phases": list(self.phases),
+                "marks": self.marks,
+                "counters": self.counters}
+
+    def write_report(self):
+        """ Write the JSON report, again at exit to include what happened after the startup"""
+        if (self.enabled == False or not self.report_path):
+            return
+        tmp_path = self.report_path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as report_file:
+                json.dump(self.get_report(), report_file, indent=2, sort_keys=True)
+            os.rename(tmp_path, self.report_path)
+        except (IOError, OSError) as e:
+            logging.warning("Profiler.write_report: error saving %s : %s" % (self.report_path, e))
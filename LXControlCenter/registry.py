@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import collections
+import logging
+
+class ItemRegistry(object):
+    """ Items indexed by path, by filename (desktop file ID) and by type.
+        Iterating on the registry returns all the items, in the order they were added.
+        There are many items : the secondary indexes only keep paths, and the items by category
+        are listed on demand."""
+
+    def __init__(self):
+        self.by_path = collections.OrderedDict()
+        # Filename => path, or list of paths when several items have it
+        self.by_filename = {}
+        # Type => list of paths, in the order they were added
+        self.by_type = {}
+
+    def __iter__(self):
+        return iter(list(self.by_path.values()))
+
+    def __len__(self):
+        return len(self.by_path)
+
+    def __contains__(self, item):
+        return self.by_path.get(item.path) is item
+
+    def add(self, item):
+        """ Add item, replacing the item with the same path if any"""
+        if (item.path in self.by_path):
+            self.remove(self.by_path[item.path])
+        self.by_path[item.path] = item
+        paths = self.by_filename.get(item.filename)
+        if (paths is None):
+            self.by_filename[item.filename] = item.path
+        elif (isinstance(paths, list)):
+            paths.append(item.path)
+        else:
+            self.by_filename[item.filename] = [paths, item.path]
+        self.by_type.setdefault(item.type, []).append(item.path)
+
+    def remove(self, item):
+        if (self.by_path.get(item.path) is not item):
+            logging.debug("ItemRegistry.remove: %s not in registry" % item.path)
+            return
+        del self.by_path[item.path]
+        paths = self.by_filename[item.filename]
+        if (isinstance(paths, list)):
+            paths.remove(item.path)
+            if (len(paths) == 1):
+                self.by_filename[item.filename] = paths[0]
+        else:
+            del self.by_filename[item.filename]
+        paths = self.by_type[item.type]
+        paths.remove(item.path)
+        if (len(paths) == 0):
+            del self.by_type[item.type]
+
+    def clear(self):
+        self.by_path.clear()
+        self.by_filename.clear()
+        self.by_type.clear()
+
+    def get_by_path(self, path):
+        return self.by_path.get(path)
+
+    def get_by_filename(self, filename):
+        paths = self.by_filename.get(filename)
+        if (paths is None):
+            return []
+        if (isinstance(paths, list)):
+            return [self.by_path[p] for p in paths]
+        return [self.by_path[paths]]
+
+    def get_by_type(self, item_type):
+        return [self.by_path[p] for p in self.by_type.get(item_type, ())]
+
+    def get_by_category(self, category, active_only=True):
+        return [i for i in self.by_path.values() if i.category == category and (active_only == False or i.activate == True)]
+
+    def get_categories(self):
+        categories = []
+        for i in self.by_path.values():
+            if (i.category not in categories):
+                categories.append(i.category)
+        return categories
+
+    def get_active(self):
+        return [i for i in self.by_path.values() if i.activate == True]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import re
+import bisect
+import heapq
+import unicodedata
+
+from .utils import intern_string
+
+# Tokens are the words of the texts, split on anything else than letters and digits
+TOKEN_SEPARATOR = re.compile(r"[\W_]+", re.UNICODE)
+
+# Fields of the items indexed, with the weight of a match, a match on the name ranks first
+FIELDS_WEIGHTS = (("name", 16), ("generic_name", 8), ("keywords", 4), ("category", 2), ("categories_list", 2), ("comment", 1))
+
+# Fields with the same values in many items, tokenized once
+SHARED_FIELDS = ("category", "categories_list")
+
+# A token equal to the word searched weights more than a token only starting with it
+EXACT_MATCH_FACTOR = 2
+
+def fold(text):
+    """ text lowercased and without accents, "Réseau" is found with "reseau" """
+    if (isinstance(text, bytes)):
+        # str of python 2, like the text of the webkit frontend
+        text = text.decode("utf-8", "replace")
+    text = text.lower()
+    try:
+        text.encode("ascii")
+        return text
+    except UnicodeError:
+        pass
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+def tokenize(text):
+    return [t for t in TOKEN_SEPARATOR.split(fold(text)) if t != ""]
+
+class SearchIndex(object):
+    """ Inverted index of the words of the items (names, comments, keywords and categories,
+        localized when read), to search them while typing. The words searched are
+        prefixes of the words of the items, an item matches if it has all of them.
+        Updated item by item with add and remove."""
+
+    def __init__(self):
+        # Token => {path: weight}
+        self.postings = {}
+        # Tokens of postings, sorted, to find the ones starting with a prefix by bisection
+        self.tokens = []
+        # Path => tokens of the item, to remove it
+        self.items_tokens = {}
+        # Path => folded name, to sort the results of the same weight
+        self.names = {}
+        # Path => position in the order of the names, computed by get_order when the items changed
+        self.order = None
+        # Value of a field of SHARED_FIELDS => tokens
+        self.tokens_cache = {}
+        # Prefix => {path: weight}, cleared on each change, typing a word searches the same prefixes again
+        self.prefix_cache = {}
+
+    def __len__(self):
+        return len(self.items_tokens)
+
+    def get_item_weights(self, item):
+        """ Token => weight of the best field of item having it"""
+        weights = {}
+        for field, weight in FIELDS_WEIGHTS:
+            value = getattr(item, field, None)
+            if (not value):
+                continue
+            tokens = self.tokens_cache.get(value)
+            if (tokens is None):
+                tokens = tokenize(" ".join(value) if isinstance(value, tuple) else value)
+                if (field in SHARED_FIELDS):
+                    self.tokens_cache[value] = tokens
+            for token in tokens:
+                if (weights.get(token, 0) < weight):
+                    weights[token] = weight
+        return weights
+
+    def add(self, item):
+        """ Index item, replacing its previous version"""
+        self.remove(item.path)
+        self.prefix_cache.clear()
+        self.order = None
+        weights = self.get_item_weights(item)
+        for token in weights:
+            postings = self.postings.get(token)
+            if (postings is None):
+                token = intern_string(token)
+                postings = self.postings[token] = {}
+                bisect.insort(self.tokens, token)
+            postings[item.path] = weights[token]
+        self.items_tokens[item.path] = tuple(weights)
+        self.names[item.path] = fold(item.name or "")
+
+    def remove(self, path):
+        tokens = self.items_tokens.pop(path, None)
+        if (tokens is None):
+            return
+        self.prefix_cache.clear()
+        self.order = None
+        del self.names[path]
+        for token in tokens:
+            postings = self.postings[token]
+            del postings[path]
+            if (len(postings) == 0):
+                del self.postings[token]
+                del self.tokens[bisect.bisect_left(self.tokens, token)]
+
+    def clear(self):
+        self.__init__()
+
+    def get_order(self):
+        if (self.order is None):
+            paths = sorted(self.names, key=lambda p: (self.names[p], p))
+            self.order = dict((p, n) for n, p in enumerate(paths))
+        return self.order
+
+    def match_prefix(self, prefix):
+        """ Path => weight of the items with a token starting with prefix"""
+        matches = self.prefix_cache.get(prefix)
+        if (matches is not None):
+            return matches
+        parent = self.prefix_cache.get(prefix[:-1]) if len(prefix) > 1 else None
+        matches = {}
+        index = bisect.bisect_left(self.tokens, prefix)
+        while (index < len(self.tokens) and self.tokens[index].startswith(prefix)):
+            token = self.tokens[index]
+            factor = EXACT_MATCH_FACTOR if token == prefix else 1
+            postings = self.postings[token]
+            if (parent is not None and len(parent) < len(postings)):
+                # Typing : only the items matching the previous prefix can match
+                candidates = (p for p in parent if p in postings)
+            else:
+                candidates = postings
+            for path in candidates:
+                weight = postings[path] * factor
+                if (matches.get(path, 0) < weight):
+                    matches[path] = weight
+            index = index + 1
+        self.prefix_cache[prefix] = matches
+        return matches
+
+    def search(self, text, accept=None, limit=None):
+        """ Paths of the items matching all the words of text, the best first.
+            accept(path) can exclude items, limit the number of results."""
+        scores = None
+        for prefix in sorted(set(tokenize(text)), key=len, reverse=True):
+            matches = self.match_prefix(prefix)
+            if (scores is None):
+                scores = dict(matches)
+            else:
+                scores = dict((p, w + matches[p]) for p, w in scores.items() if p in matches)
+            if (len(scores) == 0):
+                break
+        if (not scores):
+            return []
+        if (accept is not None):
+            scores = dict((p, w) for p, w in scores.items() if accept(p))
+        order = self.get_order()
+        key = lambda p: (-scores[p], order[p])
+        if (limit is not None and limit < len(scores)):
+            return heapq.nsmallest(limit, scores, key=key)
+        return sorted(scores, key=key)
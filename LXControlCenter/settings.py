@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+# Derived state computed from the settings, to compute again when one of them changes
+INVALIDATES_ITEMS = "items"
+INVALIDATES_DESKTOP_ENVIRONMENTS = "desktop_environments"
+INVALIDATES_TRIAGE = "triage"
+INVALIDATES_VIEW = "view"
+INVALIDATES_ICONS = "icons"
+INVALIDATES_WINDOW = "window"
+
+try:
+    STRING_TYPES = (str, unicode)
+    INTEGER_TYPES = (int, long)
+except NameError:
+    STRING_TYPES = (str,)
+    INTEGER_TYPES = (int,)
+
+# Python types of the values of each type_to_get
+VALUE_TYPES = {"list": (list,), "float": (float,) + INTEGER_TYPES, "int": INTEGER_TYPES, "boolean": (bool,), "string": STRING_TYPES}
+
+def has_type(value, type_to_get):
+    """ True if value can be stored in a setting of type_to_get"""
+    if (isinstance(value, bool) and type_to_get != "boolean"):
+        return False
+    if (isinstance(value, VALUE_TYPES[type_to_get]) == False):
+        return False
+    if (type_to_get == "list"):
+        return all(isinstance(v, STRING_TYPES) for v in value)
+    return True
+
+def positive(value):
+    return value > 0
+
+def not_negative(value):
+    return value >= 0
+
+def one_of(*values):
+    return lambda value: value in values
+
+class Setting(object):
+    """ A key of settings.conf, stored in the attribute of Main of the same name (or attribute).
+        The default value is the attribute + "_default" of Main, set from default.
+        type_to_get : type of the value, see Utils.load_setting.
+        validator : function returning False if the value can't be used, called with values of type_to_get only.
+        invalidates : derived state to compute again when the value changes."""
+
+    def __init__(self, group, key, type_to_get, default, attribute=None, validator=None, invalidates=()):
+        self.group = group
+        self.key = key
+        self.type_to_get = type_to_get
+        self.default = default
+        self.attribute = attribute or key
+        self.validator = validator
+        self.invalidates = invalidates
+
+    def is_valid(self, value):
+        if (has_type(value, self.type_to_get) == False):
+            return False
+        if (self.validator is None):
+            return True
+        try:
+            return self.validator(value) == True
+        except (TypeError, ValueError):
+            return False
+
+# Settings of settings.conf, except [Categories] which has free keys
+SETTINGS = [
+    # Configuration
+    Setting("Configuration", "desktop_categories", "list",
+            ["Settings", "System", "DesktopSettings", "X-LXDE-Settings", "X-GNOME-Settings-Panel",
+             "X-GNOME-PersonalSettings", "X-XFCE-SettingsDialog", "X-XFCE-HardwareSetting"],
+            attribute="keyword_categories_settings_list", invalidates=(INVALIDATES_ITEMS,)),
+    Setting("Configuration", "desktop_environments", "list", ["Auto"],
+            attribute="desktop_environments_setting", invalidates=(INVALIDATES_DESKTOP_ENVIRONMENTS, INVALIDATES_TRIAGE)),
+    Setting("Configuration", "version_config", "float", 0.1),
+    Setting("Configuration", "modules_support", "boolean", True, invalidates=(INVALIDATES_TRIAGE,)),
+    Setting("Configuration", "applications_support", "boolean", True, invalidates=(INVALIDATES_TRIAGE,)),
+    Setting("Configuration", "applications_backend", "string", "desktop-files",
+            validator=one_of("desktop-files", "menu-cache"), invalidates=(INVALIDATES_ITEMS,)),
+    Setting("Configuration", "categories_fixed", "boolean", False),
+    Setting("Configuration", "modules_preload", "int", 3, validator=not_negative),
+    # Path, ordered by importance (first read take advantage)
+    Setting("Path", "applications_path", "list", ["/usr/share/applications", ";"], invalidates=(INVALIDATES_ITEMS,)),
+    Setting("Path", "modules_path", "list", ["/usr/lib/lx-control-center", "/usr/share/lx-control-center", "LXControlCenter/modules/"],
+            invalidates=(INVALIDATES_ITEMS,)),
+    # UI
+    Setting("UI", "window_size_w", "int", 800, validator=positive, invalidates=(INVALIDATES_WINDOW, INVALIDATES_VIEW)),
+    Setting("UI", "window_size_h", "int", 600, validator=positive, invalidates=(INVALIDATES_WINDOW,)),
+    Setting("UI", "window_icon", "string", "preferences-system", invalidates=(INVALIDATES_WINDOW,)),
+    Setting("UI", "window_title", "string", "LX-Control-Center", invalidates=(INVALIDATES_WINDOW,)),
+    Setting("UI", "icon_view_columns", "int", 5, validator=positive, invalidates=(INVALIDATES_VIEW,)),
+    Setting("UI", "icon_view_icons_size", "int", 32, validator=positive, invalidates=(INVALIDATES_ICONS, INVALIDATES_VIEW)),
+    Setting("UI", "icon_not_theme_allow", "boolean", False, invalidates=(INVALIDATES_ICONS,)),
+    Setting("UI", "icon_force_size", "boolean", True, invalidates=(INVALIDATES_ICONS,)),
+    Setting("UI", "icon_fallback", "string", "gtk-stop", invalidates=(INVALIDATES_ICONS,)),
+    Setting("UI", "view_mode", "string", "icons-all", validator=one_of("icons-all", "icons-categories"), invalidates=(INVALIDATES_VIEW,)),
+    Setting("UI", "view_visual_effects", "boolean", False, invalidates=(INVALIDATES_VIEW,)),
+]
+
+SETTINGS_BY_KEY = dict(((s.group, s.key), s) for s in SETTINGS)
+
+def get_invalidated(keys):
+    """ Derived state to compute again when the settings keys, as (group, key), changed"""
+    invalidated = set()
+    for key in keys:
+        setting = SETTINGS_BY_KEY.get(key)
+        if (setting is not None):
+            invalidated.update(setting.invalidates)
+    return invalidated
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import copy
+import logging
+
+class TriageFilter(object):
+    """ A predicate deciding if an item can be activated.
+        item_types : types of items the filter applies to.
+        depends : attributes of the settings object used by the predicate."""
+
+    def __init__(self, name, predicate, item_types, depends):
+        self.name = name
+        self.predicate = predicate
+        self.item_types = item_types
+        self.depends = depends
+
+class TriagePipeline(object):
+    """ Apply filters on items, caching the result of each filter for each item.
+        A filter is evaluated again only when one of its depends changed, or when the item changed."""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.filters = []
+        # Filter name => {path: result}
+        self.results = {}
+        # Depends attribute => value at the last run
+        self.snapshot = {}
+        # Path => activation computed by the filters
+        self.activated = {}
+        # Paths to evaluate on next run
+        self.dirty_items = set()
+        self.evaluations = 0
+
+    def add_filter(self, triage_filter):
+        self.filters.append(triage_filter)
+        self.results[triage_filter.name] = {}
+        for depend in triage_filter.depends:
+            if (depend not in self.snapshot):
+                self.snapshot[depend] = copy.deepcopy(getattr(self.settings, depend))
+
+    def invalidate_item(self, path):
+        """ Forget the results of the item path, to evaluate it again on next run"""
+        for results in self.results.values():
+            results.pop(path, None)
+        self.activated.pop(path, None)
+        self.dirty_items.add(path)
+
+    def check_settings(self, items):
+        """ Invalidate the filters depending on settings changed since the last run"""
+        changed = []
+        for depend in self.snapshot:
+            value = getattr(self.settings, depend)
+            if (value != self.snapshot[depend]):
+                changed.append(depend)
+                self.snapshot[depend] = copy.deepcopy(value)
+
+        for triage_filter in self.filters:
+            if (len([d for d in triage_filter.depends if d in changed]) > 0):
+                logging.debug("TriagePipeline.check_settings: %s changed, invalidating %s" % (changed, triage_filter.name))
+                self.results[triage_filter.name].clear()
+                for item_type in triage_filter.item_types:
+                    for i in items.get_by_type(item_type):
+                        self.dirty_items.add(i.path)
+        return changed
+
+    def run(self, items):
+        """ Set activate on the items which need it, return the paths evaluated"""
+        self.check_settings(items)
+        for i in items:
+            if (i.path not in self.activated):
+                self.dirty_items.add(i.path)
+
+        evaluated = self.dirty_items
+        self.dirty_items = set()
+        for path in evaluated:
+            i = items.get_by_path(path)
+            if (i is None):
+                continue
+            activate = True
+            for triage_filter in self.filters:
+                if (i.type not in triage_filter.item_types):
+                    continue
+                results = self.results[triage_filter.name]
+                result = results.get(path)
+                if (result is None):
+                    result = triage_filter.predicate(i)
+                    results[path] = result
+                    self.evaluations = self.evaluations + 1
+                if (result == False):
+                    activate = False
+                    break
+            self.activated[path] = activate
+            i.activate = activate
+
+        logging.debug("TriagePipeline.run: %s items evaluated, %s evaluations since start" % (len(evaluated), self.evaluations))
+        return evaluated
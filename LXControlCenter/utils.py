@@ -18,16 +18,56 @@
 #       MA 02110-1301, USA.
 
 import logging
-import xdg.DesktopEntry
-import xdg.IniFile
+import sys
+import os
 import os.path
+import io
+import re
 try:
-    import configparser as configparser
-except:
-    import ConfigParser as configparser
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+def intern_string(string):
+    """ The shared copy of string, to keep only one copy of the strings found in many items"""
+    try:
+        if (sys.version_info[0] < 3):
+            return intern(string)
+        return sys.intern(string)
+    except TypeError:
+        # unicode on python 2
+        return string
 
 class Utils(object):
+    # Item has no __dict__, Main has one
+    __slots__ = ()
+
+    # Keys read by read_desktop_entry, with the key of the entry dict and the type of the value
+    desktop_entry_keys = {  "Name":("name", "localestring"),
+                            "GenericName":("generic_name", "localestring"),
+                            "Comment":("comment", "localestring"),
+                            "Keywords":("keywords", "localelist"),
+                            "Categories":("categories", "list"),
+                            "Icon":("icon", "localestring"),
+                            "OnlyShowIn":("only_show_in", "list"),
+                            "NotShowIn":("not_show_in", "list"),
+                            "Exec":("exec", "string"),
+                            "TryExec":("try_exec", "string"),
+                            "X-LX-Control-Center-Application-Replaces":("module_replace_application", "list"),
+                            "X-LX-Control-Center-Depends":("module_depends", "list"),
+                            "X-LX-Control-Center-Version":("module_version", "numeric"),
+                            "X-LX-Control-Center-API-Version":("module_api_version", "numeric"),
+                            "X-LX-Control-Center-Toolkit":("module_toolkit", "string")
+                        }
+
+    # Locales to look for localized keys, most specific first. Computed once by get_locale_keys
+    locale_keys = None
+
     def load_xdgfile(self,path):
+        import xdg.DesktopEntry
         xdgfile = None
         try:
             xdgfile = xdg.DesktopEntry.DesktopEntry(path)
@@ -35,7 +75,170 @@ class Utils(object):
             logging.error("load_xdgfile: error, %s is not a desktop file" % path)
         return xdgfile
 
+    def desktop_entry_from_xdgfile(self, keyfile):
+        """ Extract the fields used by Item from a xdg.DesktopEntry, as a plain dict"""
+        entry = {}
+        entry["name"] = keyfile.getName()
+        entry["generic_name"] = keyfile.getGenericName()
+        entry["comment"] = keyfile.getComment()
+        entry["keywords"] = keyfile.get("Keywords", group="Desktop Entry", locale=True, type="string", list=True)
+        entry["categories"] = keyfile.getCategories()
+        entry["icon"] = keyfile.getIcon()
+        entry["only_show_in"] = keyfile.getOnlyShowIn()
+        entry["not_show_in"] = keyfile.getNotShowIn()
+        entry["exec"] = keyfile.getExec()
+        entry["try_exec"] = keyfile.getTryExec()
+        # Module specific
+        entry["module_replace_application"] = keyfile.get("X-LX-Control-Center-Application-Replaces", group="Desktop Entry", type="string", list=True)
+        entry["module_depends"] = keyfile.get("X-LX-Control-Center-Depends", group="Desktop Entry", type="string", list=True)
+        entry["module_version"] = keyfile.get("X-LX-Control-Center-Version", group="Desktop Entry", type="numeric")
+        entry["module_api_version"] = keyfile.get("X-LX-Control-Center-API-Version", group="Desktop Entry", type="numeric")
+        entry["module_toolkit"] = keyfile.get("X-LX-Control-Center-Toolkit", group="Desktop Entry", type="string")
+        return entry
+
+    def scan_directory(self, path):
+        """ Return the names of the files and of the sub-directories of path.
+            Use the file type of scandir entries when available, to avoid a stat per entry."""
+        files = []
+        dirs = []
+        if (scandir is not None):
+            for dir_entry in scandir(path):
+                if (dir_entry.is_file()):
+                    files.append(dir_entry.name)
+                elif (dir_entry.is_dir()):
+                    dirs.append(dir_entry.name)
+        else:
+            for name in os.listdir(path):
+                if (os.path.isfile(os.path.join(path, name))):
+                    files.append(name)
+                elif (os.path.isdir(os.path.join(path, name))):
+                    dirs.append(name)
+        return files, dirs
+
+    def get_locale_keys(self):
+        """ Return the locales matching the current LC_MESSAGES, as defined by the Desktop Entry specification"""
+        if (Utils.locale_keys is None):
+            locale_keys = []
+            for envar in ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG'):
+                value = os.environ.get(envar)
+                if value:
+                    for language in value.split(":"):
+                        modifier = ""
+                        country = ""
+                        if ("@" in language):
+                            language, modifier = language.split("@", 1)
+                            modifier = "@" + modifier
+                        language = language.split(".", 1)[0]
+                        if ("_" in language):
+                            language, country = language.split("_", 1)
+                            country = "_" + country
+                        for key in (language + country + modifier, language + country, language + modifier, language):
+                            if (key not in locale_keys and key not in ("", "C", "POSIX")):
+                                locale_keys.append(key)
+                    break
+            Utils.locale_keys = locale_keys
+        return Utils.locale_keys
+
+    def split_desktop_list(self, value):
+        """ Split a list value of a desktop file on unescaped ';'"""
+        if ("\\;" not in value):
+            return_list = value.split(";")
+        else:
+            return_list = [v.replace("\\;", ";") for v in re.split(r"(?<!\\);", value)]
+        if (return_list[-1] == ""):
+            return_list.pop()
+        return return_list
+
+    def new_desktop_entry(self):
+        """ Entry with the default value of each field, see read_desktop_entry"""
+        return {    "name":"", "generic_name":"", "comment":"", "keywords":[], "categories":[], "icon":"", "only_show_in":[], "not_show_in":[],
+                    "exec":"", "try_exec":"", "module_replace_application":[], "module_depends":[],
+                    "module_version":0.0, "module_api_version":0.0, "module_toolkit":""}
+
+    def read_desktop_entry(self, path, categories_filter=None):
+        """ Fast reader of the [Desktop Entry] group of a desktop file, returning the same dict
+            as desktop_entry_from_xdgfile, or None if path is not a desktop file.
+            If categories_filter is set and none of its categories is in Categories, stop reading
+            and return an entry with only categories set and partial = True."""
+        entry = self.new_desktop_entry()
+        keys = self.desktop_entry_keys
+        locale_keys = self.get_locale_keys()
+        # Rank of the locale found for each localized key, lower is better
+        locale_rank = {}
+        in_group = False
+        found_group = False
+        try:
+            with io.open(path, 'r', encoding='utf-8', errors='replace') as desktop_file:
+                for line in desktop_file:
+                    line = line.strip()
+                    if (not line or line[0] == "#"):
+                        continue
+                    if (line[0] == "["):
+                        if (in_group == True):
+                            break
+                        if (line in ("[Desktop Entry]", "[KDE Desktop Entry]")):
+                            in_group = True
+                            found_group = True
+                        continue
+                    if (in_group == False or "=" not in line):
+                        continue
+
+                    key, value = line.split("=", 1)
+                    key = key.strip()
+                    value = value.strip()
+                    if (not key):
+                        # Malformed line, like "=value"
+                        continue
+                    locale = None
+                    if (key.endswith("]") and "[" in key):
+                        key, locale = key[:-1].split("[", 1)
+                    if (key not in keys):
+                        continue
+
+                    entry_key, value_type = keys[key]
+                    if (locale is not None):
+                        if (value_type not in ("localestring", "localelist") or locale not in locale_keys):
+                            continue
+                        rank = locale_keys.index(locale)
+                    else:
+                        rank = len(locale_keys)
+                    if (locale_rank.get(entry_key, rank + 1) <= rank):
+                        continue
+                    locale_rank[entry_key] = rank
+
+                    if (value_type in ("list", "localelist")):
+                        value = self.split_desktop_list(value)
+                    elif (value_type == "numeric"):
+                        try:
+                            value = float(value)
+                        except ValueError:
+                            value = 0.0
+                    entry[entry_key] = value
+
+                    if (key == "Categories" and categories_filter is not None):
+                        if (set(categories_filter).isdisjoint(value)):
+                            return {"categories": value, "partial": True}
+        except (IOError, OSError):
+            logging.error("read_desktop_entry: error, can't read %s" % path)
+            return None
+        except (ValueError, IndexError, KeyError) as e:
+            # Skip the file, as with pyxdg
+            logging.error("read_desktop_entry: error, %s is not a valid desktop file : %s" % (path, e))
+            return None
+
+        if (found_group == False):
+            logging.error("read_desktop_entry: error, %s is not a desktop file" % path)
+            return None
+
+        if (categories_filter is not None and len(entry["categories"]) == 0):
+            return {"categories": [], "partial": True}
+        return entry
+
     def load_inifile(self,path):
+        try:
+            import configparser
+        except ImportError:
+            import ConfigParser as configparser
         inifile = None
         inifile = configparser.ConfigParser()
         inifile.optionxform = str
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import sys
+import time
+import errno
+import struct
+import logging
+import ctypes
+import ctypes.util
+
+# From sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+EVENT_HEADER = struct.Struct("iIII")
+
+monotonic = getattr(time, "monotonic", time.time)
+
+def load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+class DirectoryWatcher(object):
+    """ Watch directories with inotify, and collect the paths changed inside them.
+        Changes are reported once no event was received during debounce seconds,
+        so a burst of events (like a package installation) gives only one update."""
+
+    def __init__(self, debounce=0.5):
+        self.debounce = debounce
+        self.libc = load_libc()
+        self.fd = None
+        # Watch descriptor => directory path
+        self.watches = {}
+        # Changed paths, waiting for the end of the burst
+        self.pending = set()
+        self.last_event = None
+        # Events were lost, everything must be scanned again
+        self.overflow = False
+
+        if (self.libc is not None):
+            fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if (fd < 0):
+                logging.warning("DirectoryWatcher: inotify_init1 failed : %s" % os.strerror(ctypes.get_errno()))
+            else:
+                self.fd = fd
+
+    def is_available(self):
+        return self.fd is not None
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path):
+        if (self.fd is None or path in self.watches.values()):
+            return False
+        encoded_path = path
+        if (not isinstance(path, bytes)):
+            encoded_path = path.encode(sys.getfilesystemencoding())
+        wd = self.libc.inotify_add_watch(self.fd, encoded_path, WATCH_MASK)
+        if (wd < 0):
+            logging.debug("DirectoryWatcher.add_watch: can't watch %s : %s" % (path, os.strerror(ctypes.get_errno())))
+            return False
+        self.watches[wd] = path
+        logging.debug("DirectoryWatcher.add_watch: watching %s" % path)
+        return True
+
+    def remove_watch(self, path):
+        for wd in [wd for wd in self.watches if self.watches[wd] == path]:
+            self.libc.inotify_rm_watch(self.fd, wd)
+            del self.watches[wd]
+
+    def read_events(self):
+        """ Read the available events, without blocking. Return the number of events read."""
+        if (self.fd is None):
+            return 0
+        nbr_events = 0
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if (e.errno in (errno.EAGAIN, errno.EWOULDBLOCK)):
+                    break
+                raise
+            if (not data):
+                break
+
+            offset = 0
+            while (offset + EVENT_HEADER.size <= len(data)):
+                wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset = offset + EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset = offset + length
+                nbr_events = nbr_events + 1
+
+                if (mask & IN_Q_OVERFLOW):
+                    logging.warning("DirectoryWatcher.read_events: inotify queue overflow")
+                    self.overflow = True
+                    continue
+                if (mask & IN_IGNORED):
+                    self.watches.pop(wd, None)
+                    continue
+
+                directory = self.watches.get(wd)
+                if (directory is None):
+                    continue
+                if (name):
+                    if (not isinstance(name, str)):
+                        name = name.decode(sys.getfilesystemencoding(), "replace")
+                    self.pending.add(os.path.join(directory, name))
+                else:
+                    # Event on the watched directory itself
+                    self.pending.add(directory)
+
+        if (nbr_events > 0):
+            self.last_event = monotonic()
+        return nbr_events
+
+    def is_ready(self):
+        """ True when there are changes and the burst of events is finished"""
+        if (len(self.pending) == 0 and self.overflow == False):
+            return False
+        return monotonic() - self.last_event >= self.debounce
+
+    def pop_changes(self):
+        """ Return the changed paths and forget them"""
+        changes = self.pending
+        self.pending = set()
+        return changes
+
+    def close(self):
+        if (self.fd is not None):
+            os.close(self.fd)
+            self.fd = None
+            self.watches = {}
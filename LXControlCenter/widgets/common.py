@@ -18,6 +18,8 @@
 #       MA 02110-1301, USA.
 
 from ..base import Main
+from ..launcher import LaunchError
+from ..search import SearchIndex
 
 import collections
 import logging
@@ -25,6 +27,7 @@ import logging
 class UI(Main):
     def __init__(self):
         Main.__init__(self)
+        self.load()
 
         # Items visible in the view, to be display
         self.items_visible = []
@@ -40,6 +43,17 @@ class UI(Main):
         #  - module-UI ==> Display the current module loaded
         self.mode = "main-UI"
 
+        # Modules to import when idle after startup
+        self.modules_preload_queue = []
+
+        # Words searched, the icon view displays the items found instead of the categories
+        self.search_text = ""
+        # Index of the visible items, built by the first search, see search_items
+        self.search_index = None
+        self.search_results_max = 50
+
+        self.subscribe_settings(self.on_settings_changed)
+
         # Menu items labels & tooltips
         self.icons_menu_item = _("Icons")
         self.preferences_menu_item = _("Preferences")
@@ -48,25 +62,32 @@ class UI(Main):
         self.icons_menu_item_tooltip = _("Icons")
         self.preferences_menu_item_tooltip = _("Preferences")
         self.edit_menu_item_tooltip = _("Edit")
+        self.search_placeholder = _("Search")
+        self.search_results_label = _("Search results")
 
         # Pref Mode labels
         self.pref_category_configuration_label = _("Configuration")
         self.pref_modules_support_label = _("Activate module support")
         self.pref_applications_support_label = _("Activate applications support")
 
+    def on_settings_changed(self, keys, invalidated):
+        """ Generate the view again if the settings changed need it, see settings.SETTINGS"""
+        if (len(invalidated & set(["items", "triage"])) > 0):
+            # The categories of the items may have changed
+            self.search_index = None
+        if (len(invalidated & set(["items", "triage", "view"])) > 0):
+            self.generate_view()
+
     def generate_view(self):
         self.triage_items()
         self.items_visible_generate()
         self.items_visible_by_categories_generate()
         self.icon_view_columns_generate()
+        self.search_index_update()
 
     def items_visible_generate(self):
         logging.debug("items_visible_generate: enter function")
-        self.items_visible = []
-        for i in self.items:
-            if (i.activate == True):
-                logging.debug("items_visible_generate: append %s in items_visible_generate" % i.path)
-                self.items_visible.append(i)
+        self.items_visible = self.items.get_active()
 
     def items_visible_by_categories_generate(self):
         logging.debug("items_visible_by_categories_generate: enter function")
@@ -83,6 +104,48 @@ class UI(Main):
 
     #TODO Sorting items inside categories
 
+    def search_index_update(self):
+        """ Index the items which became visible, remove the ones hidden"""
+        if (self.search_index is None):
+            return
+        visible = dict((i.path, i) for i in self.items_visible)
+        for path in list(self.search_index.items_tokens):
+            if (path not in visible):
+                self.search_index.remove(path)
+        for path in visible:
+            if (path not in self.search_index.items_tokens):
+                self.search_index.add(visible[path])
+
+    def search_index_invalidate(self, paths):
+        """ Remove the items of paths changed, indexed again by generate_view if they are visible"""
+        if (self.search_index is not None):
+            for path in paths:
+                self.search_index.remove(path)
+
+    def search_items(self, text, limit=None):
+        """ Visible items matching the words of text, the best first, see search.SearchIndex"""
+        if (self.search_index is None):
+            self.search_index = SearchIndex()
+            self.search_index_update()
+            logging.debug("search_items: %s items indexed" % len(self.search_index))
+        items = []
+        for path in self.search_index.search(text, limit=limit):
+            i = self.items.get_by_path(path)
+            if (i is not None):
+                items.append(i)
+        return items
+
+    def get_view_categories(self):
+        """ Items displayed by the icon view, by category, or the items found when searching"""
+        if (self.search_text != ""):
+            return collections.OrderedDict([(self.search_results_label, self.search_items(self.search_text, self.search_results_max))])
+        return self.items_visible_by_categories
+
+    def on_search_changed_common(self, text):
+        self.search_text = text.strip()
+        self.mode = "main-UI"
+        self.draw_ui()
+
     def icon_view_columns_generate(self):
         # TODO use iconview item size (or any way to have the size of the item instead of the size of the icon)
         logging.debug("icon_view_columns_generate: self.window_size_w : %s" % self.window_size_w)
@@ -124,23 +187,73 @@ class UI(Main):
 
     def build_module_view(self):
         self.clean_main_view()
-        module_class = self.module_activated.module_spec.LXCC_Module()
+        module_class = self.modules_manager.get_instance(self.module_activated)
         self.content_ui_vbox.add(module_class.main_box)
 
+    def modules_preload_generate(self):
+        """ Queue the modules to import when idle, see preload_next_module"""
+        self.modules_preload_queue = self.get_modules_to_preload()
+        logging.debug("modules_preload_generate: %s modules to preload" % len(self.modules_preload_queue))
+        return len(self.modules_preload_queue) > 0
+
+    def preload_next_module(self):
+        """ Import the next module of the queue. Return True while modules are left, to be used as an idle callback"""
+        if (len(self.modules_preload_queue) == 0):
+            return False
+        i = self.modules_preload_queue.pop(0)
+        if (i.activate == True):
+            try:
+                self.modules_manager.get_instance(i)
+            except Exception as e:
+                logging.warning("preload_next_module: error loading module %s : %s" % (i.path, e))
+        return len(self.modules_preload_queue) > 0
+
     def on_item_activated_common(self, path):
-        for i in self.items:
-            logging.debug("on_item_activated: test item path = %s" % i.path)
-            if (i.path == path):
-                i.launch()
-                if (i.type == "module"):
-                    self.mode = "module-UI"
-                    self.module_active(i)
-                    self.draw_ui()
-                break
+        i = self.items.get_by_path(path)
+        if (i is None):
+            logging.warning("on_item_activated: no item for path %s" % path)
+            return
+        if (i.type == "module"):
+            self.modules_manager.record_use(i)
+            self.modules_manager.save_usage()
+            self.mode = "module-UI"
+            self.module_active(i)
+            self.draw_ui()
+        else:
+            try:
+                if (self.daemon_client is None or self.daemon_client.launch(i.path) == False):
+                    self.launch_item(i)
+            except LaunchError as e:
+                logging.warning("on_item_activated: error launching %s : %s" % (i.path, e))
+                self.show_launch_error(i, e)
+
+    def show_launch_error(self, item, error):
+        """ Tell the user that item was not launched"""
+        pass
 
     def draw_ui(self):
         pass
 
+    def start_watcher(self):
+        pass
+
+    def on_watcher_ready(self):
+        """ Apply the changes of the watched directories, once the burst of events is finished"""
+        changed = self.update_items_from_watcher()
+        if (self.watcher is None):
+            # The daemon stopped, watch the directories in process
+            self.start_watcher()
+        if (len(changed) > 0):
+            self.on_items_changed(changed)
+
+    def on_items_changed(self, paths):
+        """ Called when items of paths were added, updated or removed"""
+        logging.debug("on_items_changed: %s" % paths)
+        self.search_index_invalidate(paths)
+        self.generate_view()
+        if (self.mode == "main-UI"):
+            self.draw_ui()
+
     def on_resize_common(self, w, h):
         if (self.mode == "main-UI"):
             logging.debug("on_resize: resize activated")
@@ -149,4 +262,9 @@ class UI(Main):
             tmp_icons_col = self.icon_view_columns
             self.icon_view_columns_generate()
             if (self.icon_view_columns != tmp_icons_col):
-                self.draw_ui()
+                self.update_icon_view_columns()
+
+    def update_icon_view_columns(self):
+        """ Apply a new self.icon_view_columns on the view. Redraw all by default,
+            frontends can only change the columns of the existing views"""
+        self.draw_ui()
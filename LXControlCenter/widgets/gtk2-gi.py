@@ -25,6 +25,7 @@ from gi.repository.GdkPixbuf import Pixbuf
 import logging
 
 from .common import UI
+from .icons import IconCache
 
 class Gtk2App(UI):
     def __init__(self):
@@ -45,6 +46,10 @@ class Gtk2App(UI):
         # GTK2 Specific: add_with_viewport
         window_scrolled.add_with_viewport(self.vbox)
 
+        self.theme = Gtk.IconTheme.get_default()
+        self.icon_cache = IconCache(self.get_pixbuf_size)
+        self.theme.connect("changed", self.on_icon_theme_changed)
+
         #Function to launch at startup
         self.build_UI()
 
@@ -86,37 +91,52 @@ class Gtk2App(UI):
             else:
                 icon_lookup_flags = Gtk.IconLookupFlags.GENERIC_FALLBACK
 
-            theme = Gtk.IconTheme.get_default()
-
             for i in self.items_visible_by_categories[category]:
                 if (len(i.icon) > 0):
                     if (self.icon_not_theme_allow == True):
                         if (i.icon[0] == "/"):
                             #Absolute path
                             try:
-                                pixbuf = GdkPixbuf.Pixbuf.new_from_file(i.icon)
+                                pixbuf = self.load_icon(i.icon, icon_lookup_flags)
                             except:
-                                pixbuf = theme.load_icon( self.icon_fallback,
-                                                                                self.icon_view_icons_size,
-                                                                                icon_lookup_flags)
+                                pixbuf = self.load_icon(self.icon_fallback, icon_lookup_flags)
                                 logging.info("Error loading icon %s" % i.icon)                   
                     else:
                         try:
-                            pixbuf = theme.load_icon( i.icon,
-                                                                            self.icon_view_icons_size,
-                                                                            icon_lookup_flags)
+                            pixbuf = self.load_icon(i.icon, icon_lookup_flags)
                         except:
-                            pixbuf = theme.load_icon( self.icon_fallback,
-                                                                            self.icon_view_icons_size,
-                                                                            icon_lookup_flags)
+                            pixbuf = self.load_icon(self.icon_fallback, icon_lookup_flags)
                 else:
-                    pixbuf = theme.load_icon(self.icon_fallback, self.icon_view_icons_size, icon_lookup_flags)
+                    pixbuf = self.load_icon(self.icon_fallback, icon_lookup_flags)
 
                 liststore.append([pixbuf, i.name, i.path])
             hbox.add(iconview)
-       
+
+        self.icon_cache.print_stats()
         self.window.show_all()
 
+    def load_icon(self, icon, icon_lookup_flags):
+        """ Load icon (absolute path or themed name), from the icon cache if possible"""
+        key = (icon, self.icon_view_icons_size, int(icon_lookup_flags), self.get_icon_theme_name())
+        pixbuf = self.icon_cache.get(key)
+        if (pixbuf is None):
+            if (icon[0] == "/"):
+                pixbuf = Pixbuf.new_from_file(icon)
+            else:
+                pixbuf = self.theme.load_icon(icon, self.icon_view_icons_size, icon_lookup_flags)
+            self.icon_cache.put(key, pixbuf)
+        return pixbuf
+
+    def get_pixbuf_size(self, pixbuf):
+        return pixbuf.get_rowstride() * pixbuf.get_height()
+
+    def get_icon_theme_name(self):
+        return Gtk.Settings.get_default().props.gtk_icon_theme_name
+
+    def on_icon_theme_changed(self, theme):
+        logging.debug("on_icon_theme_changed: icon theme changed, invalidating icon cache")
+        self.icon_cache.clear()
+
     # GTK2 specific => enable single selection click
     def on_icon_view_selection_changed(self, widget):
         # TODO fix IndexError out of range
@@ -127,11 +147,7 @@ class Gtk2App(UI):
         model = icon_view.get_model()
         path = model[tree_path][2]
         logging.debug("on_item_activated: path = %s" % path)
-        for i in self.items:
-            logging.debug("on_item_activated: test item path = %s" % i.path)
-            if (i.path == path):
-                i.launch()
-                break
+        self.on_item_activated_common(path)
         icon_view.unselect_all()
 
     def on_resize(self):
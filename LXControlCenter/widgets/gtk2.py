@@ -20,10 +20,14 @@
 import pygtk
 pygtk.require('2.0')
 import gtk as Gtk
+import gobject
 
 import logging
+import gettext
+_ = gettext.gettext
 
 from .common import UI
+from .icons import IconCache
 
 class Gtk2App(UI):
     def __init__(self):
@@ -39,6 +43,7 @@ class Gtk2App(UI):
 
         self.window.connect("destroy", self.destroy)
         self.window.connect("check-resize", self.on_resize)
+        self.window.connect("expose-event", self.on_first_expose)
 
         window_scrolled = Gtk.ScrolledWindow()
         # GTK2 specific
@@ -69,11 +74,42 @@ class Gtk2App(UI):
 
         #GTK2 specific
         self.theme = Gtk.icon_theme_get_default()
+        self.icon_cache = IconCache(self.get_pixbuf_size)
+        self.theme.connect("changed", self.on_icon_theme_changed)
+
+        # Icon views of the current view, to change their columns on resize
+        self.icon_views = []
+
+        self.watcher_timeout_id = None
 
         # Function to launch at startup
-        self.generate_view()
-        self.build_toolbar()
-        self.draw_ui()
+        with self.profiler.phase("generate_view"):
+            self.generate_view()
+        with self.profiler.phase("build_ui"):
+            self.build_toolbar()
+            self.draw_ui()
+        self.start_watcher()
+        if (self.modules_preload_generate() == True):
+            gobject.idle_add(self.preload_next_module, priority=gobject.PRIORITY_LOW)
+
+    def start_watcher(self):
+        if (self.watch_directories() is not None):
+            gobject.io_add_watch(self.watcher.fileno(), gobject.IO_IN, self.on_watcher_event)
+
+    def on_watcher_event(self, fd, condition):
+        self.watcher.read_events()
+        if (self.watcher_timeout_id is None):
+            self.watcher_timeout_id = gobject.timeout_add(int(self.watcher_debounce * 1000), self.on_watcher_timeout)
+        # Stop watching a closed connection to the daemon
+        return self.watcher.is_available()
+
+    def on_watcher_timeout(self):
+        if (self.watcher.is_ready() == False):
+            # Events still coming, wait for the end of the burst
+            return True
+        self.watcher_timeout_id = None
+        self.on_watcher_ready()
+        return False
 
     def draw_ui(self):
         if (self.mode == "main-UI"):
@@ -171,6 +207,7 @@ class Gtk2App(UI):
 
     def build_icon_view(self):
         self.clean_main_view()
+        self.icon_views = []
 
         for category in self.items_visible_by_categories:
             frame = Gtk.Frame(label=category)
@@ -209,16 +246,55 @@ class Gtk2App(UI):
             self.define_icon_type_with_gtk_theme()
 
             for i in self.items_visible_by_categories[category]:
-                if (i.icon_type == "fix"):
-                    pixbuf = Gtk.gdk.pixbuf_new_from_file(i.icon)
-                elif (i.icon_type == "themed"):
-                    pixbuf = self.theme.load_icon(i.icon, self.icon_view_icons_size, icon_lookup_flags)
-                else:
-                    pixbuf = self.theme.load_icon(self.icon_fallback, self.icon_view_icons_size, icon_lookup_flags)
-
+                pixbuf = self.load_item_icon(i, icon_lookup_flags)
                 liststore.append([pixbuf, i.name, i.path])
 
             hbox.add(iconview)
+            self.icon_views.append(iconview)
+
+        self.icon_cache.print_stats()
+
+    def load_item_icon(self, i, icon_lookup_flags):
+        """ Load the pixbuf of the item i, from the icon cache if possible"""
+        if (i.icon_type == "fix"):
+            icon = i.icon
+        elif (i.icon_type == "themed"):
+            icon = i.icon
+        else:
+            icon = self.icon_fallback
+        key = (icon, self.icon_view_icons_size, int(icon_lookup_flags), self.get_icon_theme_name())
+        pixbuf = self.icon_cache.get(key)
+        if (pixbuf is None):
+            self.profiler.count("icons_loaded")
+            if (i.icon_type == "fix"):
+                pixbuf = Gtk.gdk.pixbuf_new_from_file(icon)
+            else:
+                pixbuf = self.theme.load_icon(icon, self.icon_view_icons_size, icon_lookup_flags)
+            self.icon_cache.put(key, pixbuf)
+        return pixbuf
+
+    def on_first_expose(self, widget, event):
+        self.profiler.mark("first_paint")
+        self.window.disconnect_by_func(self.on_first_expose)
+        self.profiler.finish_startup()
+        return False
+
+    def get_pixbuf_size(self, pixbuf):
+        return pixbuf.get_rowstride() * pixbuf.get_height()
+
+    def get_icon_theme_name(self):
+        return Gtk.settings_get_default().get_property("gtk-icon-theme-name")
+
+    def on_settings_changed(self, keys, invalidated):
+        if ("icons" in invalidated):
+            self.icon_cache.clear()
+        UI.on_settings_changed(self, keys, invalidated)
+
+    def on_icon_theme_changed(self, theme):
+        logging.debug("on_icon_theme_changed: icon theme changed, invalidating icon cache")
+        self.icon_cache.clear()
+        for i in self.items:
+            i.define_icon_type()
 
     def define_icon_type_with_gtk_theme(self):
         for i in self.items_visible:
@@ -244,6 +320,31 @@ class Gtk2App(UI):
     def on_resize(self, widget, data=None):
         self.on_resize_common(self.window.get_size()[0], self.window.get_size()[1])
 
+    def update_icon_view_columns(self):
+        for iconview in self.icon_views:
+            iconview.set_columns(self.icon_view_columns)
+
+    def watch_child(self, pid):
+        gobject.child_watch_add(pid, self.on_child_exited)
+
+    def on_child_exited(self, pid, status):
+        self.launcher.child_exited(pid, status)
+
+    def show_launch_error(self, item, error):
+        dialog = Gtk.MessageDialog(self.window, Gtk.DIALOG_MODAL, Gtk.MESSAGE_ERROR, Gtk.BUTTONS_CLOSE,
+                                   _("%s can't be launched") % item.name)
+        dialog.format_secondary_text(str(error))
+        dialog.run()
+        dialog.destroy()
+
+    def schedule_save_settings(self):
+        gobject.timeout_add(self.settings_autosave_delay, self.on_save_settings_timeout)
+
+    def on_save_settings_timeout(self):
+        if (self.settings_autosave_pending == True):
+            self.save_settings()
+        return False
+
     def destroy(self, widget, data=None):
         self.save_settings()
         Gtk.main_quit()
@@ -20,11 +20,21 @@
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
+from gi.repository import GLib
+from gi.repository import Gdk
+from gi.repository import GdkPixbuf
 from gi.repository.GdkPixbuf import Pixbuf
 
+import time
+import collections
 import logging
+import gettext
+_ = gettext.gettext
 
 from .common import UI
+from .icons import IconCache
+
+monotonic = getattr(time, "monotonic", time.time)
 
 class Gtk3App(UI):
     def __init__(self):
@@ -41,11 +51,13 @@ class Gtk3App(UI):
         self.window.connect("destroy", self.destroy)
         self.window.connect("check-resize", self.on_resize)
 
-        window_scrolled = Gtk.ScrolledWindow()
-        self.window.add(window_scrolled)
+        self.window.connect("draw", self.on_first_draw)
+
+        self.window_scrolled = Gtk.ScrolledWindow()
+        self.window.add(self.window_scrolled)
 
         self.window_box = Gtk.VBox()
-        window_scrolled.add(self.window_box)
+        self.window_scrolled.add(self.window_box)
 
         self.header_bar = Gtk.HeaderBar()
 
@@ -53,15 +65,60 @@ class Gtk3App(UI):
         self.window_box.pack_start(self.content_ui_vbox, True, True, 0)
 
         self.menu_button = Gtk.MenuButton()
+        self.search_entry = Gtk.SearchEntry()
 
         self.action_group = Gtk.ActionGroup("actions")
 
         self.theme = Gtk.IconTheme.get_default()
+        self.icon_cache = IconCache(self.get_pixbuf_size)
+        self.theme.connect("changed", self.on_icon_theme_changed)
+
+        # Icons loaded asynchronously : [iconview, liststore, deque of (treeiter, item, icon_lookup_flags)]
+        self.icon_load_queue = []
+        self.icon_load_source_id = None
+        # Maximum time spent loading icons in one idle callback, in seconds
+        self.icon_load_batch_time = 0.008
+        self.icon_placeholder = None
+
+        # Widgets of the icon view, kept to be reused : [(frame, iconview)]
+        self.icon_view_widgets = []
+        # Content displayed by icon_view_widgets, see get_icon_view_signature
+        self.icon_view_signature = None
+
+        # Resize events are coalesced, to relayout at most once in resize_delay ms
+        self.resize_delay = 16
+        self.resize_timeout_id = None
+
+        self.watcher_timeout_id = None
 
         # Function to launch at startup
-        self.generate_view()
-        self.build_toolbar()
-        self.draw_ui()
+        with self.profiler.phase("generate_view"):
+            self.generate_view()
+        with self.profiler.phase("build_ui"):
+            self.build_toolbar()
+            self.draw_ui()
+        self.start_watcher()
+        if (self.modules_preload_generate() == True):
+            GLib.idle_add(self.preload_next_module, priority=GLib.PRIORITY_LOW)
+
+    def start_watcher(self):
+        if (self.watch_directories() is not None):
+            GLib.io_add_watch(self.watcher.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self.on_watcher_event)
+
+    def on_watcher_event(self, fd, condition):
+        self.watcher.read_events()
+        if (self.watcher_timeout_id is None):
+            self.watcher_timeout_id = GLib.timeout_add(int(self.watcher_debounce * 1000), self.on_watcher_timeout)
+        # Stop watching a closed connection to the daemon
+        return self.watcher.is_available()
+
+    def on_watcher_timeout(self):
+        if (self.watcher.is_ready() == False):
+            # Events still coming, wait for the end of the burst
+            return True
+        self.watcher_timeout_id = None
+        self.on_watcher_ready()
+        return False
 
     def draw_ui(self):
         if (self.mode == "main-UI"):
@@ -116,6 +173,26 @@ class Gtk3App(UI):
         self.menu_button.add(image)
         self.header_bar.pack_start(self.menu_button)
 
+        # search-changed is emitted once the user stops typing
+        self.search_entry.set_placeholder_text(self.search_placeholder)
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        self.search_entry.connect("stop-search", self.on_stop_search)
+        self.header_bar.pack_end(self.search_entry)
+        # Typing anywhere in the window starts a search
+        self.window.connect("key-press-event", self.on_key_press)
+
+    def on_key_press(self, widget, event):
+        if (self.search_entry.has_focus() == False and self.search_entry.handle_event(event) == Gdk.EVENT_STOP):
+            self.search_entry.grab_focus_without_selecting()
+            return True
+        return False
+
+    def on_search_changed(self, entry):
+        self.on_search_changed_common(entry.get_text())
+
+    def on_stop_search(self, entry):
+        entry.set_text("")
+
     def create_switch_conf(self, grid, label, default, group, key, position):
         label_widget = Gtk.Label(label)
         switch_widget = Gtk.Switch()
@@ -135,7 +212,6 @@ class Gtk3App(UI):
     def on_switch_click(self, switch, gparam, group, key):
         logging.debug("on_switch_click: Setting %s - %s to %s" % (group, key, switch.get_active()))
         self.set_setting(group, key, switch.get_active())
-        self.generate_view()
 
     def clean_main_view(self):
         for children in self.content_ui_vbox.get_children():
@@ -158,11 +234,41 @@ class Gtk3App(UI):
         #TODO
         self.clean_main_view()       
 
+    def get_icon_view_signature(self, view_categories):
+        """ Identify what the icon view displays, to know if the existing widgets can be reused"""
+        signature = [self.icon_view_icons_size, self.icon_force_size, self.icon_fallback]
+        for category in view_categories:
+            signature.append(category)
+            for i in view_categories[category]:
+                signature.append((i.path, i.name, i.icon, i.icon_type))
+        return signature
+
     def build_icon_view(self):
 
         self.clean_main_view()
 
-        for category in self.items_visible_by_categories:
+        if (self.icon_force_size == True):
+            icon_lookup_flags = Gtk.IconLookupFlags.FORCE_SIZE
+        else:
+            icon_lookup_flags = Gtk.IconLookupFlags.GENERIC_FALLBACK
+
+        self.define_icon_type_with_gtk_theme()
+
+        view_categories = self.get_view_categories()
+        signature = self.get_icon_view_signature(view_categories)
+        if (signature == self.icon_view_signature):
+            logging.debug("build_icon_view: content unchanged, reusing widgets")
+            for frame, iconview in self.icon_view_widgets:
+                iconview.set_columns(self.icon_view_columns)
+                self.content_ui_vbox.add(frame)
+            return
+
+        self.icon_view_signature = signature
+        self.icon_view_widgets = []
+        # Icons waiting to be loaded belong to the widgets replaced
+        self.icon_load_queue = []
+
+        for category in view_categories:
             frame = Gtk.Frame(label=category)
             self.content_ui_vbox.add(frame)
 
@@ -189,25 +295,122 @@ class Gtk3App(UI):
             logging.debug("build_UI: get_item_padding = %s" % iconview.get_item_padding())
             logging.debug("build_UI: item orientation = %s" % iconview.get_item_orientation())
 
-
-            if (self.icon_force_size == True):
-                icon_lookup_flags = Gtk.IconLookupFlags.FORCE_SIZE
-            else:
-                icon_lookup_flags = Gtk.IconLookupFlags.GENERIC_FALLBACK
-
-            self.define_icon_type_with_gtk_theme()
-
-            for i in self.items_visible_by_categories[category]:
-                if (i.icon_type == "fix"):
-                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(i.icon)
-                elif (i.icon_type == "themed"):
-                    pixbuf = self.theme.load_icon(i.icon, self.icon_view_icons_size, icon_lookup_flags)
+            # Rows are added with the cached icon or a placeholder, missing icons are loaded when idle
+            jobs = collections.deque()
+            for i in view_categories[category]:
+                pixbuf = self.load_item_icon(i, icon_lookup_flags, cached_only=True)
+                if (pixbuf is None):
+                    treeiter = liststore.append([self.get_icon_placeholder(), i.name, i.path])
+                    jobs.append((treeiter, i, icon_lookup_flags))
                 else:
-                    pixbuf = self.theme.load_icon(self.icon_fallback, self.icon_view_icons_size, icon_lookup_flags)
-
-                liststore.append([pixbuf, i.name, i.path])
+                    liststore.append([pixbuf, i.name, i.path])
+            if (len(jobs) > 0):
+                self.icon_load_queue.append([iconview, liststore, jobs])
 
             hbox.add(iconview)
+            self.icon_view_widgets.append((frame, iconview))
+
+        if (len(self.icon_load_queue) > 0 and self.icon_load_source_id is None):
+            self.icon_load_source_id = GLib.idle_add(self.load_icons_batch, priority=GLib.PRIORITY_LOW)
+        self.icon_cache.print_stats()
+
+    def get_icon_placeholder(self):
+        """ Transparent pixbuf displayed until the icon is loaded"""
+        size = self.icon_view_icons_size
+        if (self.icon_placeholder is None or self.icon_placeholder.get_width() != size):
+            self.icon_placeholder = Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, size, size)
+            self.icon_placeholder.fill(0)
+        return self.icon_placeholder
+
+    def is_visible_in_window(self, widget):
+        """ True if widget is in the scrolled part of the window currently displayed"""
+        allocation = widget.get_allocation()
+        vadjustment = self.window_scrolled.get_vadjustment()
+        top = vadjustment.get_value()
+        bottom = top + vadjustment.get_page_size()
+        return allocation.y + allocation.height >= top and allocation.y <= bottom
+
+    def pop_icon_load_job(self):
+        """ Return the next icon to load, taking first the icon views visible in the window"""
+        group = None
+        for queued_group in self.icon_load_queue:
+            if (self.is_visible_in_window(queued_group[0])):
+                group = queued_group
+                break
+        if (group is None):
+            group = self.icon_load_queue[0]
+        treeiter, i, icon_lookup_flags = group[2].popleft()
+        if (len(group[2]) == 0):
+            self.icon_load_queue.remove(group)
+        return group[1], treeiter, i, icon_lookup_flags
+
+    def load_icons_batch(self):
+        """ Idle callback, load the icons waiting for icon_load_batch_time at most"""
+        start = monotonic()
+        while (len(self.icon_load_queue) > 0 and monotonic() - start < self.icon_load_batch_time):
+            liststore, treeiter, i, icon_lookup_flags = self.pop_icon_load_job()
+            pixbuf = self.load_item_icon(i, icon_lookup_flags)
+            liststore.set_value(treeiter, 0, pixbuf)
+
+        if (len(self.icon_load_queue) > 0):
+            return True
+        self.profiler.mark("all_icons_loaded")
+        self.icon_load_source_id = None
+        return False
+
+    def on_first_draw(self, widget, cairo_context):
+        self.profiler.mark("first_paint")
+        self.window.disconnect_by_func(self.on_first_draw)
+        self.profiler.finish_startup()
+        return False
+
+    def load_item_icon(self, i, icon_lookup_flags, cached_only=False):
+        """ Load the pixbuf of the item i, from the icon cache if possible.
+            With cached_only, return None if the icon is not in the cache."""
+        if (i.icon_type == "fix"):
+            icon = i.icon
+        elif (i.icon_type == "themed"):
+            icon = i.icon
+        else:
+            icon = self.icon_fallback
+        key = (icon, self.icon_view_icons_size, int(icon_lookup_flags), self.get_icon_theme_name())
+        if (cached_only == True):
+            pixbuf = self.icon_cache.get(key)
+            if (pixbuf is not None):
+                self.profiler.count("icons_cached")
+            return pixbuf
+        pixbuf = self.icon_cache.peek(key)
+        if (pixbuf is None):
+            self.profiler.count("icons_loaded")
+            try:
+                if (i.icon_type == "fix"):
+                    pixbuf = Pixbuf.new_from_file(icon)
+                else:
+                    pixbuf = self.theme.load_icon(icon, self.icon_view_icons_size, icon_lookup_flags)
+            except GLib.Error as e:
+                logging.info("load_item_icon: error loading icon %s : %s" % (icon, e))
+                pixbuf = self.theme.load_icon(self.icon_fallback, self.icon_view_icons_size, icon_lookup_flags)
+            self.icon_cache.put(key, pixbuf)
+        return pixbuf
+
+    def get_pixbuf_size(self, pixbuf):
+        return pixbuf.get_rowstride() * pixbuf.get_height()
+
+    def get_icon_theme_name(self):
+        return Gtk.Settings.get_default().props.gtk_icon_theme_name
+
+    def on_settings_changed(self, keys, invalidated):
+        if ("icons" in invalidated):
+            self.icon_cache.clear()
+            self.icon_view_signature = None
+        UI.on_settings_changed(self, keys, invalidated)
+
+    def on_icon_theme_changed(self, theme):
+        logging.debug("on_icon_theme_changed: icon theme changed, invalidating icon cache")
+        self.icon_cache.clear()
+        self.icon_view_signature = None
+        for i in self.items:
+            i.define_icon_type()
 
     def define_icon_type_with_gtk_theme(self):
         for i in self.items_visible:
@@ -228,7 +431,39 @@ class Gtk3App(UI):
         icon_view.unselect_all()
 
     def on_resize(self, widget, data=None):
+        if (self.resize_timeout_id is None):
+            self.resize_timeout_id = GLib.timeout_add(self.resize_delay, self.on_resize_timeout)
+
+    def on_resize_timeout(self):
+        self.resize_timeout_id = None
         self.on_resize_common(self.window.get_size()[0], self.window.get_size()[1])
+        return False
+
+    def update_icon_view_columns(self):
+        for frame, iconview in self.icon_view_widgets:
+            iconview.set_columns(self.icon_view_columns)
+
+    def watch_child(self, pid):
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, self.on_child_exited)
+
+    def on_child_exited(self, pid, status):
+        self.launcher.child_exited(pid, status)
+
+    def show_launch_error(self, item, error):
+        dialog = Gtk.MessageDialog(transient_for=self.window, modal=True,
+                                   message_type=Gtk.MessageType.ERROR, buttons=Gtk.ButtonsType.CLOSE,
+                                   text=_("%s can't be launched") % item.name)
+        dialog.format_secondary_text(str(error))
+        dialog.run()
+        dialog.destroy()
+
+    def schedule_save_settings(self):
+        GLib.timeout_add(self.settings_autosave_delay, self.on_save_settings_timeout)
+
+    def on_save_settings_timeout(self):
+        if (self.settings_autosave_pending == True):
+            self.save_settings()
+        return False
 
     def destroy(self, widget, data=None):
         self.save_settings()
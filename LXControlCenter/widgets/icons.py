@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import collections
+import logging
+
+class IconCache(object):
+    """ LRU cache of loaded icons, independent of the toolkit.
+        Keys are (icon name or path, size, lookup flags, theme name).
+        sizeof returns the memory used by an icon, in bytes."""
+
+    def __init__(self, sizeof, max_entries=512, max_bytes=8 * 1024 * 1024):
+        self.sizeof = sizeof
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        icon = self.entries.pop(key, None)
+        if (icon is None):
+            self.misses = self.misses + 1
+            return None
+        # Move to the end, as most recently used
+        self.entries[key] = icon
+        self.hits = self.hits + 1
+        return icon
+
+    def peek(self, key):
+        """ Return the icon of key without counting a hit or a miss, or changing the LRU order"""
+        return self.entries.get(key)
+
+    def put(self, key, icon):
+        if (icon is None):
+            return
+        if (key in self.entries):
+            self.bytes = self.bytes - self.sizeof(self.entries.pop(key))
+        self.entries[key] = icon
+        self.bytes = self.bytes + self.sizeof(icon)
+        while (len(self.entries) > self.max_entries or (self.bytes > self.max_bytes and len(self.entries) > 1)):
+            old_key, old_icon = self.entries.popitem(last=False)
+            self.bytes = self.bytes - self.sizeof(old_icon)
+            self.evictions = self.evictions + 1
+
+    def clear(self):
+        logging.debug("IconCache.clear: %s icons dropped" % len(self.entries))
+        self.entries.clear()
+        self.bytes = 0
+
+    def print_stats(self):
+        total = self.hits + self.misses
+        hit_rate = 0.0
+        if (total > 0):
+            hit_rate = 100.0 * self.hits / total
+        logging.debug("IconCache: %s icons, %s bytes, %s hits, %s misses (%.1f%% hit rate), %s evictions" % (len(self.entries), self.bytes, self.hits, self.misses, hit_rate, self.evictions))
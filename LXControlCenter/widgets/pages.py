@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+import os
+import os.path
+import hashlib
+import collections
+import logging
+
+class PageCache(object):
+    """ Cache of rendered HTML pages, in memory and in files of cache_dir, to display
+        a page again without substituting its template.
+        Keys are strings identifying everything the page depends on (template, options,
+        locale, items), they are hashed to name the files."""
+
+    def __init__(self, cache_dir, max_entries=4, max_files=16):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html")
+
+    def get(self, key):
+        html = self.entries.pop(key, None)
+        if (html is None):
+            html = self.read(key)
+        if (html is None):
+            self.misses = self.misses + 1
+            return None
+        # Move to the end, as most recently used
+        self.entries[key] = html
+        self.hits = self.hits + 1
+        return html
+
+    def put(self, key, html):
+        self.entries.pop(key, None)
+        self.entries[key] = html
+        while (len(self.entries) > self.max_entries):
+            self.entries.popitem(last=False)
+        self.write(key, html)
+
+    def read(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, 'rb') as page_file:
+                html = page_file.read()
+            # The files used recently are kept by prune
+            os.utime(path, None)
+        except (IOError, OSError):
+            return None
+        if (not isinstance(html, str)):
+            html = html.decode("utf-8")
+        logging.debug("PageCache.read: %s read" % path)
+        return html
+
+    def write(self, key, html):
+        path = self.get_path(key)
+        tmp_path = path + ".tmp"
+        if (not isinstance(html, bytes)):
+            html = html.encode("utf-8")
+        try:
+            if (os.path.exists(self.cache_dir) == False):
+                os.makedirs(self.cache_dir)
+            with open(tmp_path, 'wb') as page_file:
+                page_file.write(html)
+            os.rename(tmp_path, path)
+            self.prune()
+        except (IOError, OSError) as e:
+            logging.warning("PageCache.write: error writing %s : %s" % (path, e))
+
+    def prune(self):
+        """ Remove the files of the pages used the least recently, above max_files"""
+        paths = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith(".html")]
+        if (len(paths) <= self.max_files):
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.max_files]:
+            os.remove(path)
+
+    def print_stats(self):
+        logging.debug("PageCache: %s pages in memory, %s hits, %s misses" % (len(self.entries), self.hits, self.misses))
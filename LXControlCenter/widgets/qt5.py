@@ -23,6 +23,8 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtGui import *
 
 import logging
+import gettext
+_ = gettext.gettext
 
 from .common import UI
 
@@ -42,8 +44,48 @@ class Qt5App(UI):
 
         self.window.setLayout(self.grid)
 
+        self.watcher_notifier = None
+        self.watcher_timer = None
+        self.children_poll_pending = False
+
         #Function to launch at startup
-        self.generate_view()
+        with self.profiler.phase("generate_view"):
+            self.generate_view()
+        with self.profiler.phase("build_ui"):
+            self.build_UI()
+        self.start_watcher()
+
+    def start_watcher(self):
+        if (self.watcher_timer is not None):
+            self.watcher_timer.stop()
+        if (self.watch_directories() is not None):
+            self.watcher_notifier = QSocketNotifier(self.watcher.fileno(), QSocketNotifier.Read)
+            self.watcher_notifier.activated.connect(self.on_watcher_event)
+            self.watcher_timer = QTimer()
+            self.watcher_timer.setInterval(int(self.watcher_debounce * 1000))
+            self.watcher_timer.timeout.connect(self.on_watcher_timeout)
+
+    def on_watcher_event(self, fd):
+        self.watcher.read_events()
+        if (self.watcher.is_available() == False):
+            # Stop watching a closed connection to the daemon
+            self.watcher_notifier.setEnabled(False)
+        if (self.watcher_timer.isActive() == False):
+            self.watcher_timer.start()
+
+    def on_watcher_timeout(self):
+        if (self.watcher.is_ready() == True):
+            self.watcher_timer.stop()
+            self.on_watcher_ready()
+
+    def clean_main_view(self):
+        while (self.grid.count() > 0):
+            widget = self.grid.takeAt(0).widget()
+            if (widget is not None):
+                widget.deleteLater()
+
+    def draw_ui(self):
+        self.clean_main_view()
         self.build_UI()
 
     def build_UI(self):
@@ -75,6 +117,7 @@ class Qt5App(UI):
                     pixbuf = QIcon.fromTheme(self.icon_fallback)
 
                 # Add Icon + Tooltip
+                self.profiler.count("icons_loaded")
                 pixmap = QPixmap(pixbuf.pixmap(QSize(self.icon_view_icons_size, self.icon_view_icons_size)))
                 image = QLabel()
                 image.setPixmap(pixmap)
@@ -100,8 +143,40 @@ class Qt5App(UI):
 
         self.window.show()
 
+    def watch_child(self, pid):
+        # No child watch in Qt, the children are checked regularly while some are running
+        self.schedule_children_poll()
+
+    def schedule_children_poll(self):
+        if (self.children_poll_pending == False):
+            self.children_poll_pending = True
+            QTimer.singleShot(int(self.children_poll_delay * 1000), self.on_children_poll_timeout)
+
+    def on_children_poll_timeout(self):
+        self.children_poll_pending = False
+        self.launcher.reap()
+        if (len(self.launcher.children) > 0):
+            self.schedule_children_poll()
+
+    def show_launch_error(self, item, error):
+        QMessageBox.warning(self.window, self.window_title, _("%s can't be launched") % item.name + "\n" + str(error))
+
+    def schedule_save_settings(self):
+        QTimer.singleShot(self.settings_autosave_delay, self.on_save_settings_timeout)
+
+    def on_save_settings_timeout(self):
+        if (self.settings_autosave_pending == True):
+            self.save_settings()
+
     def main(self):
+        self.app.aboutToQuit.connect(self.save_settings)
+        # Called by the event loop after the pending events, including the first paint
+        QTimer.singleShot(0, self.on_first_paint)
         sys.exit(self.app.exec_())
 
+    def on_first_paint(self):
+        self.profiler.mark("first_paint")
+        self.profiler.finish_startup()
+
     def on_item_activated(self,item):
           QMessageBox.information(self, "ListWidget", "You clicked: "+item.text())
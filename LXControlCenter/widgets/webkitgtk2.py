@@ -19,6 +19,7 @@
 import pygtk
 pygtk.require('2.0')
 import gtk
+import gobject
 
 import webkit
 import string
@@ -31,10 +32,17 @@ _ = gettext.gettext
 import logging
 
 import os
+import hashlib
+from xml.sax.saxutils import escape, quoteattr
 
 from .common import UI
+from .pages import PageCache
 
 class WebkitApp(UI):
+    # Read once per process : template file => string.Template, and the texts of the pages
+    templates = {}
+    strings_text = None
+
     def __init__(self):
         UI.__init__(self)
         self.share_path = os.path.join('data/webkit')
@@ -49,9 +57,16 @@ class WebkitApp(UI):
         self.items_cache = []
         self.items_advanced_cache = []
         self.theme = gtk.icon_theme_get_default()
+        self.theme.connect("changed", self.on_icon_theme_changed)
+        # Icon name => path, see get_item_icon_path
+        self.icon_paths = {}
+        # Category => JSON of its items for showCategory, see category_pages_generate
+        self.category_pages = None
 
         # Text mapping
         self.text = {}
+        # Pages rendered, see render_page
+        self.page_cache = PageCache(self.get_cache_path("webkit-pages"))
 
         # The list of categories is fixed and hardcoded in js files.
         self.categories_fixed = True
@@ -67,7 +82,8 @@ class WebkitApp(UI):
                                 }
         self.categories_triaged_generate()       
 
-        self.generate_view()
+        with self.profiler.phase("generate_view"):
+            self.generate_view()
 
         self.print_debug()
 
@@ -87,77 +103,116 @@ class WebkitApp(UI):
         self.treeview_items.set_reorderable(False)
         self.treeview_items.show()
 
-        self.builder.get_object('window').connect('destroy', gtk.main_quit)
+        self.builder.get_object('window').connect('destroy', self.destroy)
         self.browser = webkit.WebView()
         self.builder.get_object('window').add(self.browser)
         self.browser.connect('button-press-event', lambda w, e: e.button == 3)
 
-        self.set_options_status()
-
-        if (self.view_mode == "icons-all"):
-            self.load_advanced()
-
-        template = self.get_template()
-        html = string.Template(template).safe_substitute(self.text)
-        self.browser.load_html_string(html, "file://%s/" % self.html_path)
+        with self.profiler.phase("build_ui"):
+            html = self.render_page()
+            self.browser.connect('load-finished', self.on_first_load_finished)
+            self.browser.load_html_string(html, "file://%s/" % self.html_path)
         self.browser.connect('title-changed', self.title_changed)
 
         self.window.show_all()
 
-    def get_template(self):
+        self.watcher_timeout_id = None
+        self.start_watcher()
+
+    def watch_child(self, pid):
+        gobject.child_watch_add(pid, self.on_child_exited)
+
+    def on_child_exited(self, pid, status):
+        self.launcher.child_exited(pid, status)
+
+    def show_launch_error(self, item, error):
+        dialog = gtk.MessageDialog(self.window, gtk.DIALOG_MODAL, gtk.MESSAGE_ERROR, gtk.BUTTONS_CLOSE,
+                                   _("%s can't be launched") % item.name)
+        dialog.format_secondary_text(str(error))
+        dialog.run()
+        dialog.destroy()
+
+    def schedule_save_settings(self):
+        gobject.timeout_add(self.settings_autosave_delay, self.on_save_settings_timeout)
+
+    def on_save_settings_timeout(self):
+        if (self.settings_autosave_pending == True):
+            self.save_settings()
+        return False
+
+    def destroy(self, widget, data=None):
+        self.save_settings()
+        gtk.main_quit()
+
+    def start_watcher(self):
+        if (self.watch_directories() is not None):
+            gobject.io_add_watch(self.watcher.fileno(), gobject.IO_IN, self.on_watcher_event)
+
+    def on_watcher_event(self, fd, condition):
+        self.watcher.read_events()
+        if (self.watcher_timeout_id is None):
+            self.watcher_timeout_id = gobject.timeout_add(int(self.watcher_debounce * 1000), self.on_watcher_timeout)
+        # Stop watching a closed connection to the daemon
+        return self.watcher.is_available()
+
+    def on_watcher_timeout(self):
+        if (self.watcher.is_ready() == False):
+            # Events still coming, wait for the end of the burst
+            return True
+        self.watcher_timeout_id = None
+        self.on_watcher_ready()
+        return False
+
+    def on_first_load_finished(self, view, frame):
+        self.profiler.mark("first_paint")
+        self.browser.disconnect_by_func(self.on_first_load_finished)
+        self.profiler.finish_startup()
+
+    def on_items_changed(self, paths):
+        self.search_index_invalidate(paths)
+        self.generate_view()
+        self.change_skin(self)
+
+    def get_template_file(self):
         if (self.view_visual_effects == True and self.view_mode == "icons-categories"):
-            template_file = os.path.join(self.html_path, 'frontend/default.html')
+            return os.path.join(self.html_path, 'frontend/default.html')
         elif (self.view_visual_effects == False and self.view_mode == "icons-categories"):
-            template_file = os.path.join(self.html_path, 'frontend/default-faster.html')
+            return os.path.join(self.html_path, 'frontend/default-faster.html')
         elif (self.view_visual_effects == True and self.view_mode == "icons-all"):
-            template_file = os.path.join(self.html_path, 'frontend/advanced.html')
-        else:
-            template_file = os.path.join(self.html_path, 'frontend/advanced-faster.html')
-        with open(template_file, 'r') as f:
-            template = f.read()
-        return template
+            return os.path.join(self.html_path, 'frontend/advanced.html')
+        return os.path.join(self.html_path, 'frontend/advanced-faster.html')
+
+    def get_template(self, template_file):
+        """ Template of template_file, read once"""
+        if (template_file not in WebkitApp.templates):
+            with open(template_file, 'r') as f:
+                WebkitApp.templates[template_file] = string.Template(f.read())
+        return WebkitApp.templates[template_file]
 
     def read_strings(self, widget):
-        self.string_file = os.path.join(self.share_path, 'strings/y0001y')
-        if os.path.isfile(self.string_file):
-            with open(self.string_file, 'r') as string_file:
-                string = json.load(string_file)
-        for k in string:
-           self.text = {}
-           self.text['x0001x'] = _(string['x0001x'])
-           self.text['x0002x'] = _(string['x0002x'])
-           self.text['x0003x'] = _(string['x0003x'])
-           self.text['x0004x'] = _(string['x0004x'])
-           self.text['x0005x'] = _(string['x0005x'])
-           self.text['x0006x'] = _(string['x0006x'])
-           self.text['x0007x'] = _(string['x0007x'])
-           self.text['x0008x'] = _(string['x0008x'])
-           self.text['x0009x'] = _(string['x0009x'])
-           self.text['x0010x'] = _(string['x0010x'])
-           self.text['x0011x'] = _(string['x0011x'])
-           self.text['x0012x'] = _(string['x0012x'])
-           self.text['x0013x'] = _(string['x0013x'])
-           self.text['x0014x'] = _(string['x0014x'])
-           self.text['x0015x'] = _(string['x0015x'])
-           self.text['x0016x'] = _(string['x0016x'])
-           self.text['x0017x'] = _(string['x0017x'])
-           self.text['x0018x'] = _(string['x0018x'])
-           self.text['x0019x'] = _(string['x0019x'])
-           self.text['x0020x'] = _(string['x0020x'])
-           self.text['x0021x'] = _(string['x0021x'])
-           self.text['x0022x'] = _(string['x0022x'])
-           self.text['x0023x'] = _(string['x0023x'])
-           self.text['x0024x'] = _(string['x0024x'])
-           self.text['back'] = _('Back to menu')
-           self.text['options'] = _('Options')
-           self.text['mode'] = _('Mode')
-           self.text['advanced_mode'] = _('Advanced mode')
-           self.text['normal_mode'] = _('Normal mode')
-           self.text['visual'] = _('Visual effects')
-           self.text['nice'] = _('Use visual effects (slower)')
-           self.text['note_visual'] = _('If you want better performance (faster), disable visual effects.')
-           self.text['apply'] = _('Apply')
-           self.text['edit_items'] = _('Edit items')
+        """ Texts of the pages, read and translated once"""
+        if (WebkitApp.strings_text is None):
+            self.string_file = os.path.join(self.share_path, 'strings/y0001y')
+            strings = {}
+            if os.path.isfile(self.string_file):
+                with open(self.string_file, 'r') as string_file:
+                    strings = json.load(string_file)
+            text = {}
+            for k in strings:
+                text[k] = _(strings[k])
+            text['back'] = _('Back to menu')
+            text['options'] = _('Options')
+            text['mode'] = _('Mode')
+            text['advanced_mode'] = _('Advanced mode')
+            text['normal_mode'] = _('Normal mode')
+            text['visual'] = _('Visual effects')
+            text['nice'] = _('Use visual effects (slower)')
+            text['note_visual'] = _('If you want better performance (faster), disable visual effects.')
+            text['apply'] = _('Apply')
+            text['edit_items'] = _('Edit items')
+            text['search'] = self.search_placeholder
+            WebkitApp.strings_text = text
+        self.text = dict(WebkitApp.strings_text)
 
     def set_options_status(self):
         if (self.view_mode == "icons-categories"):
@@ -176,37 +231,14 @@ class WebkitApp(UI):
         self.current_commands = []
         if title.startswith('exec:'):
             command = title.split(':', 1)[1]
-            for item in self.items_visible:
-                if (item.path  == command):
-                    item.launch()
-        # TODO show an error message if it's not launched           
+            item = self.items.get_by_path(command)
+            if (item is not None and item.activate == True):
+                self.on_item_activated_common(command)
+        elif title.startswith('search:'):
+            self.show_search_results(title.split(':', 1)[1])
         elif title.startswith('category:'):
             category = title.split(':')[1]
-            for item in self.items_visible:
-                try:
-                    if (self.categories_triaged[item.category] == category):
-                        command = item.path
-                        title = item.name
-                        owner = "user"
-                        icon = item.icon
-                        icon_theme = self.theme
-                        if (len(item.icon) > 0):
-                            if (self.icon_not_theme_allow == True):
-                                if (item.icon[0] == "/"):
-                                    icon = item.icon
-                                else:
-                                    icon_info = icon_theme.lookup_icon(self.icon_fallback, 32, 0)
-                            else:
-                                try:
-                                    icon_info = icon_theme.lookup_icon(item.icon, 32, 0)
-                                    icon = icon_info.get_filename()
-                                except:
-                                    logging.info("title_changed: error when loading icon from %s" % item.path)
-
-                        self.browser.execute_script("addItem('%s','%s','%s','%s')" % (title, command, category, icon))
-                        self.browser.execute_script("setContent('" + category + "')")
-                except KeyError as e:
-                    logging.error("title_changed: error on loading %s with error %s" % (item.path, e))
+            self.show_category(category)
 # TODO To Implement
 #        elif title == 'edit-item':
 #            self.items_window(self)
@@ -232,42 +264,107 @@ class WebkitApp(UI):
             print("self.mode: %s" % self.mode)
             print("self.view_visual_effects: %s" % self.view_visual_effects)
 
-            self.save_settings()
+            self.request_save_settings()
             self.change_skin(self)
 
+    def get_item_icon_path(self, item):
+        """ Path of the icon of item, for the background of its element in the page.
+            Each icon name is looked up once in the theme."""
+        if (len(item.icon) == 0 or item.icon[0] == "/" or self.icon_not_theme_allow == True):
+            return item.icon
+        icon = self.icon_paths.get(item.icon)
+        if (icon is None):
+            icon = item.icon
+            icon_info = self.theme.lookup_icon(item.icon, 32, 0)
+            if (icon_info is not None):
+                icon = icon_info.get_filename()
+            else:
+                logging.info("get_item_icon_path: error when loading icon from %s" % item.path)
+            self.icon_paths[item.icon] = icon
+        return icon
+
+    def on_icon_theme_changed(self, theme):
+        logging.debug("on_icon_theme_changed: icon theme changed, looking up the icons again")
+        self.icon_paths = {}
+        self.category_pages = None
+
+    def generate_view(self):
+        UI.generate_view(self)
+        # Generated again on the next navigation
+        self.category_pages = None
+
+    def category_pages_generate(self):
+        """ JSON of the visible items of each category of the page, sent by show_category"""
+        pages = {}
+        for item_category in self.items_visible_by_categories:
+            category = self.categories_triaged.get(item_category)
+            if (category is None):
+                continue
+            if (category not in pages):
+                pages[category] = []
+            for item in self.items_visible_by_categories[item_category]:
+                pages[category].append({"path": item.path, "name": item.name, "icon": self.get_item_icon_path(item)})
+        self.category_pages = {}
+        for category in pages:
+            self.category_pages[category] = json.dumps({"category": category, "items": pages[category]})
+
+    def show_category(self, category):
+        """ Display the items of category, rendered by the page in one update"""
+        if (self.category_pages is None):
+            self.category_pages_generate()
+        page = self.category_pages.get(category)
+        if (page is None):
+            page = json.dumps({"category": category, "items": []})
+        self.browser.execute_script("showCategory(%s)" % page)
+
+    def show_search_results(self, text):
+        """ Send the items found to the page, in one call. Without words, the page displays the items again"""
+        results = {"title": self.search_results_label, "items": None}
+        if (text.strip() != ""):
+            results["items"] = [{"path": i.path, "name": i.name, "icon": self.get_item_icon_path(i)}
+                                for i in self.search_items(text, self.search_results_max)]
+        self.browser.execute_script("showSearchResults(%s)" % json.dumps(results))
+
     def load_advanced(self):
         li_content = []
         self.category = 'advanced'
         for item in self.items_visible:
-            command = item.path
-            title = item.name
-            owner = "user"
-            icon = item.icon
-            icon_theme = self.theme
-            if (len(item.icon) > 0):
-                if (self.icon_not_theme_allow == True):
-                    if (item.icon[0] == "/"):
-                        icon = item.icon
-                    else:
-                        icon_info = icon_theme.lookup_icon(self.icon_fallback, 32, 0)
-                else:
-                    try:
-                        icon_info = icon_theme.lookup_icon(item.icon, 32, 0)
-                        icon = icon_info.get_filename()
-                    except:
-                        logging.info("title_changed: error when loading icon from %s" % item.path)
-            content = "<li id='" + command + "' onclick='javascript:changeTitle(\"exec:" + command + "\")' class='item' style='background-image: url(" + icon + ")'>" + _(title) + "</li>"
+            self.profiler.count("icons_loaded")
+            icon = self.get_item_icon_path(item)
+            content = "<li id=%s data-path=%s class='item' style=%s>%s</li>" % (quoteattr(item.path), quoteattr(item.path),
+                                                                                  quoteattr("background-image: url(%s)" % icon), escape(item.name))
             li_content.append(content)
         self.text['li_content'] = '\n'.join(li_content)
 
+    def get_page_key(self, template_file):
+        """ Identify everything the page depends on, see render_page"""
+        texts = hashlib.sha1(json.dumps(WebkitApp.strings_text, sort_keys=True).encode("utf-8")).hexdigest()
+        key = [template_file, os.path.getmtime(template_file), self.view_mode, self.view_visual_effects, self.get_locale_keys(), texts]
+        if (self.view_mode == "icons-all"):
+            # The items are in the page
+            items = hashlib.sha1()
+            for item in self.items_visible:
+                items.update(("%s\t%s\t%s\n" % (item.path, item.name, item.icon)).encode("utf-8"))
+            key.extend([items.hexdigest(), gtk.settings_get_default().get_property("gtk-icon-theme-name"), self.icon_not_theme_allow])
+        return json.dumps(key)
+
+    def render_page(self):
+        """ HTML of the page for the current options and items, from the cache if it was rendered before"""
+        self.set_options_status()
+        template_file = self.get_template_file()
+        key = self.get_page_key(template_file)
+        html = self.page_cache.get(key)
+        if (html is None):
+            if (self.view_mode == "icons-all"):
+                self.load_advanced()
+            html = self.get_template(template_file).safe_substitute(self.text)
+            self.page_cache.put(key, html)
+        self.page_cache.print_stats()
+        return html
+
     def change_skin(self, widget):
         # TODO make a draw_ui function
-        self.set_options_status()
-        template = self.get_template()
-        if not self.mode:
-            self.load_advanced()
-        html = string.Template(template).safe_substitute(self.text)
-        self.browser.load_html_string(html, "file://%s/" % self.html_path)
+        self.browser.load_html_string(self.render_page(), "file://%s/" % self.html_path)
 
     def define_paths(self):
         # TODO dynamicly define path for ressources
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Check lx-control-center on fixtures and synthetic corpora, without display.
+    Run from the top source directory :
+        python3 benchmarks/check.py [name of check ...]
+    Exit with an error if a check fails."""
+
+import os
+import sys
+import glob
+import shutil
+import tempfile
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import write_corpus
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Fields of the entries compared between the readers
+ENTRY_FIELDS = ["name", "comment", "icon", "categories", "only_show_in", "not_show_in", "exec", "try_exec"]
+
+# Memory allocated by an application item built from its entry : minimum part saved compared to
+# an item with a __dict__ (see DictItem), and maximum bytes (415 measured on CPython 3.11)
+ITEM_BYTES_GAIN = 0.2
+ITEM_BYTES_MAX = 470
+
+CHECKS = []
+
+class CheckError(Exception):
+    pass
+
+def check(function):
+    CHECKS.append(function)
+    return function
+
+def expect(condition, message):
+    if (not condition):
+        raise CheckError(message)
+
+def expect_equal(value, expected, message):
+    if (value != expected):
+        raise CheckError("%s : %r, expected %r" % (message, value, expected))
+
+@check
+def check_desktop_reader_malformed(root):
+    """ Malformed lines are skipped by the fast reader, as by pyxdg"""
+    from LXControlCenter.utils import Utils
+    utils = Utils()
+    path = os.path.join(root, "malformed.desktop")
+    with open(path, 'w') as f:
+        f.write("[Desktop Entry]\nType=Application\nName=Malformed\n=value without key\n ]=no key\nName[=no locale end\n"
+                "Exec=malformed\nCategories=Settings;\n")
+    entry = utils.read_desktop_entry(path)
+    expect(entry is not None, "%s not read" % path)
+    expected = utils.desktop_entry_from_xdgfile(utils.load_xdgfile(path))
+    for field in ENTRY_FIELDS:
+        expect_equal(entry[field], expected[field], "%s of %s" % (field, path))
+
+    # The corpus has malformed applications too
+    write_corpus(os.path.join(root, "corpus"), 200)
+    paths = sorted(glob.glob(os.path.join(root, "corpus", "applications*", "*.desktop")))
+    for path in paths:
+        entry = utils.read_desktop_entry(path)
+        expected = utils.desktop_entry_from_xdgfile(utils.load_xdgfile(path))
+        for field in ENTRY_FIELDS:
+            expect_equal(entry[field], expected[field], "%s of %s" % (field, path))
+
+def copy_menu_cache_fixture(root, cache_file):
+    """ Copy the menu-cache fixture in root with the cache file cache_file of its menus/, with
+        their paths, return the Main using it.
+        The cache file is in $XDG_CACHE_HOME/menus/, newer than its directories."""
+    from xdg import BaseDirectory
+    from LXControlCenter.base import Main
+    fixture_path = os.path.join(root, "menu-cache")
+    shutil.copytree(os.path.join(FIXTURES_PATH, "menu-cache"), fixture_path, ignore=shutil.ignore_patterns("menus"))
+    menus_path = os.path.join(BaseDirectory.xdg_cache_home, "menus")
+    if (os.path.exists(menus_path) == True):
+        shutil.rmtree(menus_path)
+    os.makedirs(menus_path)
+    with open(os.path.join(FIXTURES_PATH, "menu-cache", "menus", cache_file), 'r') as f:
+        content = f.read().replace("@FIXTURE@", fixture_path)
+    with open(os.path.join(menus_path, "lxde-applications"), 'w') as f:
+        f.write(content)
+    settings_path = os.path.join(root, "settings.conf")
+    with open(settings_path, 'w') as f:
+        f.write("[Configuration]\napplications_backend = menu-cache\nmodules_support = false\n")
+        f.write("[Path]\napplications_path=%s;\nmodules_path=\n" % os.path.join(fixture_path, "applications"))
+    main = Main()
+    main.settings_path = settings_path
+    main.load(["--no-cache", "--no-daemon"])
+    return main, fixture_path, menus_path
+
+@check
+def check_menu_cache(root):
+    """ The menu-cache backend gives the same applications as the desktop files, with each cache
+        file of the fixture (see fixtures/menu-cache/README)"""
+    for cache_file in sorted(os.listdir(os.path.join(FIXTURES_PATH, "menu-cache", "menus"))):
+        try:
+            check_menu_cache_file(os.path.join(root, cache_file), cache_file)
+        except CheckError as e:
+            raise CheckError("%s : %s" % (cache_file, e))
+
+def check_menu_cache_file(root, cache_file):
+    main, fixture_path, menus_path = copy_menu_cache_fixture(root, cache_file)
+    from_cache = main.list_all_applications_from_menu_cache()
+    from_dirs = main.list_all_applications_from_dirs()
+    expect(from_cache is not None, "menu-cache file not used")
+    expect_equal([p for p, e in from_cache], [p for p, e in from_dirs], "paths of the applications")
+    expect_equal(len(from_cache), 5, "number of applications")
+    for (path, entry), (dir_path, expected) in zip(from_cache, from_dirs):
+        for field in ENTRY_FIELDS + ["generic_name", "keywords"]:
+            expect_equal(entry[field], expected[field], "%s of %s" % (field, path))
+    expect_equal(sorted(i.path for i in main.items), sorted(p for p, e in from_dirs), "items loaded")
+
+    # OnlyShowIn and NotShowIn, with desktop environments in the cache file or not
+    from LXControlCenter.item import Item
+    items = []
+    for (path, entry), (dir_path, expected) in zip(from_cache, from_dirs):
+        for source_entry in (entry, expected):
+            item = Item()
+            item.load_application_from_entry(path, source_entry)
+            items.append(item)
+    for desktop in ("LXDE", "GNOME", "KDE", "MATE", "Budgie"):
+        main.desktop_environments = [desktop]
+        for item, expected in zip(items[0::2], items[1::2]):
+            expect_equal(main.filter_desktop_env(item), main.filter_desktop_env(expected),
+                         "%s shown in %s" % (item.path, desktop))
+
+    # Stale : a directory changed after the cache
+    cache_files = glob.glob(os.path.join(menus_path, "*"))
+    future = os.stat(cache_files[0]).st_mtime + 10
+    os.utime(os.path.join(fixture_path, "applications"), (future, future))
+    expect(main.list_all_applications_from_menu_cache() is None, "stale menu-cache file used")
+    main.rescan_all_items()
+    expect_equal(sorted(i.path for i in main.items), sorted(p for p, e in from_dirs), "items loaded without up to date cache")
+
+    # Missing
+    for path in cache_files:
+        os.remove(path)
+    expect(main.list_all_applications_from_menu_cache() is None, "missing menu-cache file used")
+    main.rescan_all_items()
+    expect_equal(sorted(i.path for i in main.items), sorted(p for p, e in from_dirs), "items loaded without cache")
+
+@check
+def check_settings_types(root):
+    """ The settings only accept values of the type of their schema"""
+    from LXControlCenter.settings import SETTINGS, SETTINGS_BY_KEY
+    for setting in SETTINGS:
+        expect(setting.is_valid(setting.default), "default of %s not valid" % setting.key)
+    for key, value in ((("Configuration", "modules_support"), "yes"),
+                       (("Configuration", "modules_support"), 1),
+                       (("UI", "window_size_w"), "800"),
+                       (("UI", "window_size_w"), True),
+                       (("UI", "view_mode"), None),
+                       (("Path", "applications_path"), "/usr/share/applications")):
+        expect(SETTINGS_BY_KEY[key].is_valid(value) == False, "%r accepted for %s" % (value, key[1]))
+
+class DictItem(object):
+    """ An application item as before __slots__ : the fields in a __dict__, the lists of the entry
+        not shared between items, and the fields removed since then"""
+
+    def __init__(self, item, entry):
+        for field in item.__slots__:
+            setattr(self, field, getattr(item, field))
+        self.categories_list = entry["categories"]
+        self.only_show_in = entry["only_show_in"]
+        self.not_show_in = entry["not_show_in"]
+        self.version_config = 0.1
+        self.name_original = self.name
+        self.comment_original = self.comment
+        self.icon_original = self.icon
+        self.changed = False
+        self.module_replace_application = []
+        self.module_depends = []
+        self.module_version = 0.0
+        self.module_api_version = 0.0
+        self.module_spec = None
+        self.module_toolkit = None
+
+def measure_items(entries, build):
+    """ Items built by build(path, entry) for entries, and the bytes allocated per item"""
+    import gc
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = [build(path, entry) for path, entry in entries]
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return items, float(sum(s.size_diff for s in after.compare_to(before, "filename"))) / len(items)
+
+@check
+def check_items_memory(root):
+    """ The items have no __dict__, share their repeated strings, use less memory than items
+        with a __dict__ by ITEM_BYTES_GAIN and stay under ITEM_BYTES_MAX"""
+    from LXControlCenter.base import Main
+    from LXControlCenter.item import Item, ModuleItem
+    config_path = write_corpus(os.path.join(root, "corpus"), 2000)
+    main = Main()
+    main.settings_path = os.path.join(config_path, "lx-control-center", "settings.conf")
+    main.load(["--no-cache", "--no-daemon"])
+    entries = main.list_all_applications_from_dirs()
+
+    def build(path, entry):
+        item = Item()
+        item.load_application_from_entry(path, entry)
+        return item
+    dict_items, dict_per_item = measure_items(entries, lambda path, entry: DictItem(build(path, entry), entry))
+    del dict_items
+    items, per_item = measure_items(entries, build)
+    print("      %s items : %.0f bytes per item with a __dict__, %.0f with __slots__ (-%.0f%%)"
+          % (len(items), dict_per_item, per_item, 100.0 * (1 - per_item / dict_per_item)))
+    expect(per_item <= dict_per_item * (1 - ITEM_BYTES_GAIN), "less than %.0f%% saved" % (100.0 * ITEM_BYTES_GAIN))
+    expect(per_item <= ITEM_BYTES_MAX, "%.0f bytes per item, more than %s" % (per_item, ITEM_BYTES_MAX))
+
+    for item_class in (Item, ModuleItem):
+        expect(hasattr(item_class(), "__dict__") == False, "%s has a __dict__" % item_class.__name__)
+    strings = {}
+    for item in items:
+        for value in item.categories_list + item.only_show_in + item.not_show_in + (item.icon,):
+            expect(strings.setdefault(value, value) is value, "%r of %s not shared" % (value, item.path))
+        for values in (item.keywords, item.only_show_in, item.not_show_in):
+            expect(len(values) > 0 or values is tuple(), "empty tuple of %s not shared" % item.path)
+
+def main():
+    names = sys.argv[1:]
+    root = tempfile.mkdtemp(prefix="lxcc-check-")
+    # Read by xdg.BaseDirectory when imported, by the first check using it
+    os.environ["XDG_CACHE_HOME"] = os.path.join(root, "cache")
+    os.environ["XDG_CONFIG_HOME"] = os.path.join(root, "config")
+    os.environ["XDG_CONFIG_DIRS"] = os.path.join(root, "config-dirs")
+    os.environ["HOME"] = os.path.join(root, "home")
+    # The fixtures are not localized
+    os.environ["LANGUAGE"] = "C"
+    os.environ.pop("XDG_RUNTIME_DIR", None)
+    sys.path.insert(0, os.getcwd())
+    failures = 0
+    try:
+        for function in CHECKS:
+            if (names and function.__name__ not in names):
+                continue
+            check_root = os.path.join(root, function.__name__)
+            os.makedirs(check_root)
+            try:
+                function(check_root)
+                print("OK    %s" % function.__name__)
+            except Exception:
+                failures = failures + 1
+                print("FAIL  %s" % function.__name__)
+                traceback.print_exc()
+    finally:
+        shutil.rmtree(root)
+    return 1 if failures > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
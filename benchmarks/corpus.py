@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Generate synthetic trees of applications and modules, to benchmark lx-control-center.
+    Run from the top source directory :
+        python3 benchmarks/corpus.py directory [number of applications]"""
+
+import os
+import sys
+import random
+
+# Categories of the settings applications, as found in real desktop files
+SETTINGS_CATEGORIES = [ ["Settings", "DesktopSettings"],
+                        ["Settings", "HardwareSettings"],
+                        ["Settings", "HardwareSettings", "Printing"],
+                        ["System", "PackageManager"],
+                        ["System", "TerminalEmulator"],
+                        ["System", "FileManager", "FileTools"],
+                        ["System", "Monitor"],
+                        ["Settings", "Security"],
+                        ["Settings", "Accessibility"],
+                        ["Settings", "X-LXDE-Settings"],
+                        ["Settings", "X-GNOME-Settings-Panel", "X-GNOME-PersonalSettings"],
+                        ["Settings", "X-XFCE-SettingsDialog", "X-XFCE-HardwareSetting"]]
+
+# Categories of the other applications, not displayed
+OTHER_CATEGORIES = [["Network", "WebBrowser"],
+                    ["Office", "WordProcessor"],
+                    ["Graphics", "2DGraphics"],
+                    ["AudioVideo", "Player"],
+                    ["Development", "IDE"],
+                    ["Game", "ArcadeGame"]]
+
+LOCALES = ["fr", "de", "es", "pt_BR", "zh_CN", "ja", "ru", "it"]
+
+DESKTOP_ENVIRONMENTS = ["LXDE", "GNOME", "KDE", "XFCE", "MATE"]
+
+ICONS = ["preferences-system", "preferences-desktop", "utilities-terminal", "system-file-manager", "printer", "network-wired"]
+
+# Ratio of settings applications, the others are filtered by categories
+SETTINGS_RATIO = 0.4
+
+# One application of this number has malformed lines
+MALFORMED_EVERY = 100
+
+# Ratio of applications with their program installed in the bin directory of the corpus
+INSTALLED_RATIO = 0.85
+
+def write_application(path, index, rng):
+    lines = ["[Desktop Entry]", "Type=Application"]
+    lines.append("Name=Application %s" % index)
+    lines.append("GenericName=Generic application %s" % index)
+    lines.append("Comment=Comment of the application %s" % index)
+    for locale in rng.sample(LOCALES, rng.randint(0, len(LOCALES))):
+        lines.append("Name[%s]=Application %s (%s)" % (locale, index, locale))
+        lines.append("Comment[%s]=Comment %s (%s)" % (locale, index, locale))
+    if (rng.random() < 0.9):
+        lines.append("Icon=%s" % rng.choice(ICONS))
+    else:
+        lines.append("Icon=/usr/share/pixmaps/application%s.png" % index)
+    command = "application%s" % index
+    lines.append("Exec=%s %%U" % command)
+    ratio = rng.random()
+    if (ratio < 0.1):
+        # Available on every system
+        lines.append("TryExec=sh")
+    elif (ratio < 0.2):
+        lines.append("TryExec=%s" % command)
+    elif (ratio < 0.25):
+        lines.append("TryExec=/usr/bin/%s" % command)
+    ratio = rng.random()
+    if (ratio < 0.1):
+        lines.append("OnlyShowIn=%s;" % ";".join(rng.sample(DESKTOP_ENVIRONMENTS, rng.randint(1, 2))))
+    elif (ratio < 0.2):
+        lines.append("NotShowIn=%s;" % ";".join(rng.sample(DESKTOP_ENVIRONMENTS, rng.randint(1, 2))))
+    if (rng.random() < SETTINGS_RATIO):
+        categories = rng.choice(SETTINGS_CATEGORIES)
+    else:
+        categories = rng.choice(OTHER_CATEGORIES)
+    lines.append("Categories=%s;" % ";".join(categories))
+    lines.append("Keywords=keyword%s;settings;" % index)
+    if (index % MALFORMED_EVERY == 0):
+        # Lines found in broken desktop files, ignored by the readers
+        lines.append("=value without key")
+        lines.append("Name[=no locale end")
+        lines.append("]=no key")
+    if (rng.random() < 0.3):
+        lines.append("")
+        lines.append("[Desktop Action New]")
+        lines.append("Name=New window")
+        lines.append("Exec=%s --new-window" % command)
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+def write_module(path, index, rng, replaces):
+    lines = ["[Desktop Entry]", "Type=Module"]
+    lines.append("Name=Module %s" % index)
+    lines.append("Comment=Comment of the module %s" % index)
+    for locale in rng.sample(LOCALES, rng.randint(0, 3)):
+        lines.append("Name[%s]=Module %s (%s)" % (locale, index, locale))
+    lines.append("Icon=%s" % rng.choice(ICONS))
+    lines.append("Exec=main.py")
+    lines.append("Categories=X-LX-Control-Center-Module;%s;" % ";".join(rng.choice(SETTINGS_CATEGORIES)))
+    lines.append("X-LX-Control-Center-Depends=;")
+    lines.append("X-LX-Control-Center-Version=0.1")
+    lines.append("X-LX-Control-Center-API-Version=0.1")
+    lines.append("X-LX-Control-Center-Application-Replaces=%s;" % ";".join(replaces))
+    lines.append("X-LX-Control-Center-Toolkit=%s" % rng.choice(["GTK3", "GTK2", "Qt5"]))
+    with open(path, 'w') as f:
+        f.write("\n".join(lines) + "\n")
+
+def get_bin_path(root):
+    """ Directory of the programs of the applications of the corpus, to add to PATH"""
+    return os.path.join(root, "bin")
+
+def write_corpus(root, nbr_applications, nbr_modules=None, nbr_dirs=2, seed=0):
+    """ Write nbr_applications desktop files spread in nbr_dirs directories, and nbr_modules modules
+        (default 1 for 20 applications), with a settings.conf using them, and the programs of
+        most applications in get_bin_path(root).
+        Return the directory to use as XDG_CONFIG_DIRS."""
+    rng = random.Random(seed)
+    if (nbr_modules is None):
+        nbr_modules = max(1, nbr_applications // 20)
+
+    # Own generator, the desktop files are the same as without programs
+    bin_rng = random.Random(seed + 1)
+    bin_path = get_bin_path(root)
+    os.makedirs(bin_path)
+    for i in range(nbr_applications):
+        if (bin_rng.random() < INSTALLED_RATIO):
+            program_path = os.path.join(bin_path, "application%s" % i)
+            with open(program_path, 'w') as f:
+                f.write("#!/bin/sh\n")
+            os.chmod(program_path, 0o755)
+
+    applications_paths = []
+    for d in range(nbr_dirs):
+        applications_path = os.path.join(root, "applications%s" % d)
+        os.makedirs(applications_path)
+        applications_paths.append(applications_path)
+    for i in range(nbr_applications):
+        filename = "application%s.desktop" % i
+        write_application(os.path.join(applications_paths[i % nbr_dirs], filename), i, rng)
+        # Some desktop file IDs are also in the last directory, hidden by the first one
+        if (i % 50 == 0 and i % nbr_dirs != nbr_dirs - 1):
+            write_application(os.path.join(applications_paths[-1], filename), i, rng)
+
+    modules_path = os.path.join(root, "modules")
+    for i in range(nbr_modules):
+        module_path = os.path.join(modules_path, "module%s" % i)
+        os.makedirs(module_path)
+        replaces = []
+        if (rng.random() < 0.2):
+            replaces.append("application%s.desktop" % rng.randrange(nbr_applications))
+        write_module(os.path.join(module_path, "module%s.desktop" % i), i, rng, replaces)
+        with open(os.path.join(module_path, "main.py"), 'w') as f:
+            f.write("class LXCC_Module(object):\n    def __init__(self):\n        self.main_box = None\n")
+
+    config_path = os.path.join(root, "config")
+    settings_path = os.path.join(config_path, "lx-control-center")
+    os.makedirs(settings_path)
+    with open(os.path.join(settings_path, "settings.conf"), 'w') as f:
+        f.write("[Configuration]\n")
+        f.write("desktop_environments = LXDE;\n")
+        f.write("[Path]\n")
+        f.write("applications_path=%s;\n" % ";".join(applications_paths))
+        f.write("modules_path=%s;\n" % modules_path)
+    return config_path
+
+if __name__ == "__main__":
+    if (len(sys.argv) < 2):
+        print(__doc__)
+        sys.exit(1)
+    nbr_applications = 1000
+    if (len(sys.argv) > 2):
+        nbr_applications = int(sys.argv[2])
+    print(write_corpus(sys.argv[1], nbr_applications))
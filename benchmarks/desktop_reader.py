@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Compare the fast desktop file reader with pyxdg (strict mode).
+    Run from the top source directory :
+        python3 benchmarks/desktop_reader.py [directory ...] [--files=N]
+    Desktop files are taken from the directories (default /usr/share/applications),
+    and repeated until N files (default 3000) are read by each reader."""
+
+import os
+import sys
+import glob
+import timeit
+
+sys.path.insert(0, os.getcwd())
+from LXControlCenter.utils import Utils
+
+def main():
+    nbr_files = 3000
+    directories = []
+    for arg in sys.argv[1:]:
+        if (arg.startswith("--files=")):
+            nbr_files = int(arg.split("=", 1)[1])
+        else:
+            directories.append(arg)
+    if (directories == []):
+        directories = ["/usr/share/applications"]
+
+    files = []
+    for directory in directories:
+        files.extend(sorted(glob.glob(os.path.join(directory, "*.desktop"))))
+    if (files == []):
+        print("No desktop files found in %s" % directories)
+        sys.exit(1)
+    files = (files * (nbr_files // len(files) + 1))[:nbr_files]
+
+    utils = Utils()
+    categories_filter = ["Settings", "System", "DesktopSettings"]
+
+    def strict():
+        for path in files:
+            utils.desktop_entry_from_xdgfile(utils.load_xdgfile(path))
+
+    def fast():
+        for path in files:
+            utils.read_desktop_entry(path)
+
+    def fast_filtered():
+        for path in files:
+            utils.read_desktop_entry(path, categories_filter)
+
+    print("%s files (%s distinct)" % (len(files), len(set(files))))
+    results = {}
+    for name, function in (("pyxdg", strict), ("fast", fast), ("fast + categories filter", fast_filtered)):
+        results[name] = min(timeit.repeat(function, number=1, repeat=3))
+        print("%-26s %8.1f ms  %6.1f us/file" % (name, results[name] * 1000, results[name] * 1000000 / len(files)))
+    print("speedup (fast vs pyxdg): %.1fx" % (results["pyxdg"] / results["fast"]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Check the time needed to import LXControlCenter.base, measured with python -X importtime (python >= 3.7).
+    Run from the top source directory :
+        python3 benchmarks/importtime.py [--budget=50] [--repeat=5] [--module=LXControlCenter.base]
+    Exit with an error if the best time is over the budget (in ms), or if a module
+    which must be imported only when needed is imported."""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Imported by the code which needs them, never when importing the core
+DEFERRED_MODULES = ["xdg", "argparse", "subprocess", "importlib.util", "multiprocessing", "ctypes", "configparser"]
+
+def measure(module):
+    """ Return the cumulative import time of module in ms, and the modules it imported"""
+    code = "import sys, json; before = set(sys.modules); import %s; print(json.dumps(sorted(set(sys.modules) - before)))" % module
+    process = subprocess.Popen([sys.executable, "-X", "importtime", "-c", code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=os.getcwd())
+    stdout, stderr = process.communicate()
+    if (process.returncode != 0):
+        sys.stderr.write(stderr.decode("utf-8"))
+        sys.exit(2)
+    cumulative = None
+    details = []
+    for line in stderr.decode("utf-8").splitlines():
+        if (not line.startswith("import time:") or "|" not in line):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us = int(fields[0])
+            cumulative_us = int(fields[1])
+        except ValueError:
+            # Header line
+            continue
+        name = fields[2].strip()
+        details.append((self_us, name))
+        if (name == module):
+            cumulative = cumulative_us / 1000.0
+    return cumulative, json.loads(stdout.decode("utf-8")), sorted(details, reverse=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time of the lx-control-center core')
+    parser.add_argument('--module', default="LXControlCenter.base", help='Module to import')
+    parser.add_argument('--budget', type=float, default=50.0, help='Maximum import time, in ms')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of imports, the best time is used')
+    args = parser.parse_args()
+
+    if (sys.version_info < (3, 7)):
+        print("python -X importtime needs python 3.7 or later")
+        return 2
+
+    sys.path.insert(0, os.getcwd())
+    best = None
+    for n in range(args.repeat):
+        cumulative, imported, details = measure(args.module)
+        if (best is None or cumulative < best[0]):
+            best = (cumulative, imported, details)
+    cumulative, imported, details = best
+
+    print("import %s : %.1f ms (budget %.1f ms)" % (args.module, cumulative, args.budget))
+    print("Slowest modules (self time) :")
+    for self_us, name in [d for d in details if d[1] in imported][:10]:
+        print("  %-40s %8.1f ms" % (name, self_us / 1000.0))
+
+    failed = False
+    for name in DEFERRED_MODULES:
+        if (name in imported):
+            print("ERROR %s is imported by %s, it must be imported only when needed" % (name, args.module))
+            failed = True
+    if (cumulative > args.budget):
+        print("ERROR import time over budget")
+        failed = True
+    if (failed == True):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
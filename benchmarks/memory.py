@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Measure the memory used by the items, with tracemalloc, on a synthetic corpus.
+    Run from the top source directory :
+        python3 benchmarks/memory.py [--size=10000] [--budget=bytes per item]
+    The desktop files are parsed first, only the items built from the parsed entries
+    (and their indexes in the registry) are measured."""
+
+import os
+import sys
+import gc
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import write_corpus, get_bin_path
+
+def measure():
+    """ Run in this process, on the corpus set in the environment"""
+    sys.path.insert(0, os.getcwd())
+    from LXControlCenter.base import Main
+
+    main = Main()
+    main.load(["--no-daemon"])
+    main.items.clear()
+    gc.collect()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    main.load_all_applications()
+    main.load_all_modules()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    total = sum(s.size_diff for s in stats)
+    by_file = [(s.traceback[0].filename, s.size_diff) for s in stats if s.size_diff > 0]
+    return {"items": len(main.items),
+            "bytes": total,
+            "by_file": sorted(by_file, key=lambda f: f[1], reverse=True)[:5]}
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the memory used by the items')
+    parser.add_argument('--size', type=int, default=10000, help='Number of applications of the corpus')
+    parser.add_argument('--budget', type=float, help='Maximum bytes per item, exit with an error above')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if (args.worker == True):
+        print(json.dumps(measure()))
+        return 0
+
+    root = tempfile.mkdtemp(prefix="lxcc-memory-")
+    try:
+        env = dict(os.environ)
+        env["XDG_CONFIG_DIRS"] = write_corpus(os.path.join(root, "corpus"), args.size)
+        env["PATH"] = get_bin_path(os.path.join(root, "corpus")) + os.pathsep + env.get("PATH", os.defpath)
+        env["XDG_CACHE_HOME"] = os.path.join(root, "cache")
+        env["HOME"] = os.path.join(root, "home")
+        # Measure the items scanned in process, not loaded from a running daemon
+        env.pop("XDG_RUNTIME_DIR", None)
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--worker"], env=env)
+        result = json.loads(output.decode("utf-8"))
+    finally:
+        shutil.rmtree(root)
+
+    per_item = float(result["bytes"]) / max(1, result["items"])
+    print("%s items : %s bytes, %.0f bytes per item" % (result["items"], result["bytes"], per_item))
+    for filename, size in result["by_file"]:
+        print("  %-60s %10s bytes" % (os.path.relpath(filename), size))
+    if (args.budget is not None and per_item > args.budget):
+        print("ERROR over budget (%.0f bytes per item)" % args.budget)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Count how many times each desktop file is parsed while Main is loaded.
+    Run from the top source directory : python3 benchmarks/parse_count.py [number of applications]
+    The corpus is written by benchmarks/corpus.py."""
+
+import os
+import sys
+import shutil
+import tempfile
+import collections
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import write_corpus, get_bin_path
+
+def main():
+    nbr_files = 200
+    if (len(sys.argv) > 1):
+        nbr_files = int(sys.argv[1])
+
+    root = tempfile.mkdtemp(prefix="lxcc-bench-")
+    try:
+        # Must be set before importing xdg.BaseDirectory
+        os.environ["XDG_CONFIG_DIRS"] = write_corpus(root, nbr_files)
+        os.environ["PATH"] = get_bin_path(root) + os.pathsep + os.environ.get("PATH", os.defpath)
+        sys.path.insert(0, os.getcwd())
+
+        from LXControlCenter.utils import Utils
+        from LXControlCenter.base import Main
+
+        counter = collections.Counter()
+        load_xdgfile = Utils.load_xdgfile
+        def counting_load_xdgfile(self, path):
+            counter[path] += 1
+            return load_xdgfile(self, path)
+        Utils.load_xdgfile = counting_load_xdgfile
+        read_desktop_entry = Utils.read_desktop_entry
+        def counting_read_desktop_entry(self, path, categories_filter=None):
+            counter[path] += 1
+            return read_desktop_entry(self, path, categories_filter)
+        Utils.read_desktop_entry = counting_read_desktop_entry
+
+        Main().load(["--no-cache"])
+
+        nbr_parsed = len(counter)
+        nbr_parses = sum(counter.values())
+        print("files parsed: %s" % nbr_parsed)
+        print("total parses: %s" % nbr_parses)
+        print("parses per file: %.2f" % (float(nbr_parses) / max(nbr_parsed, 1)))
+    finally:
+        shutil.rmtree(root)
+
+if __name__ == "__main__":
+    main()
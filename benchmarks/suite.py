@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding:UTF-8 -*-
+#  lx-control-center
+#
+#       Copyright 2016 (c) Julien Lavergne <gilir@ubuntu.com>
+#
+#       This program is free software; you can redistribute it and/or modify
+#       it under the terms of the GNU General Public License as published by
+#       the Free Software Foundation; either version 2 of the License, or
+#       (at your option) any later version.
+#       This program is distributed in the hope that it will be useful,
+#       but WITHOUT ANY WARRANTY; without even the implied warranty of
+#       MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#       GNU General Public License for more details.
+#       You should have received a copy of the GNU General Public License
+#       along with this program; if not, write to the Free Software
+#       Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#       MA 02110-1301, USA.
+
+""" Benchmark lx-control-center on synthetic corpora, without display.
+    Run from the top source directory :
+        python3 benchmarks/suite.py [--sizes=100,1000,10000] [--repeat=5] [--output=results.json]
+                                    [--compare=baseline.json] [--threshold=0.25]
+    With --compare, exit with an error if a benchmark is slower than in the baseline
+    by more than threshold (0.25 = 25%)."""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from corpus import write_corpus, get_bin_path
+
+monotonic = getattr(time, "monotonic", time.time)
+
+# Differences under this time (in seconds) are noise, never a regression
+NOISE_FLOOR = 0.002
+
+def timed(function):
+    start = monotonic()
+    function()
+    return monotonic() - start
+
+def run_benchmarks(repeat):
+    """ Run the benchmarks in this process, on the corpus set in the environment.
+        Must run in its own process : xdg.BaseDirectory reads XDG_CONFIG_DIRS when imported."""
+    sys.path.insert(0, os.getcwd())
+    from LXControlCenter.base import Main
+    from LXControlCenter.widgets.common import UI
+
+    results = {}
+    def add(name, duration):
+        results.setdefault(name, []).append(duration)
+
+    sys.argv = [sys.argv[0], "--no-daemon"]
+    for n in range(repeat):
+        add("main_construct", timed(Main))
+        add("main_load_no_cache", timed(lambda: Main().load(["--no-cache", "--no-daemon"])))
+        if (n == 0):
+            # Fill the cache
+            Main().load(["--no-daemon"])
+        add("main_load_cached", timed(lambda: Main().load(["--no-daemon"])))
+
+        ui = UI()
+        def triage_full():
+            ui.triage = None
+            ui.triage_filters_generate()
+            ui.triage_items()
+        add("triage_items_full", timed(triage_full))
+        add("triage_items_incremental", timed(ui.triage_items))
+        def apply_items_categories_full():
+            # Define the category of every item, as after a change of categories
+            ui.category_table_applied = None
+            ui.apply_items_categories()
+        add("apply_items_categories_full", timed(apply_items_categories_full))
+        add("generate_view", timed(ui.generate_view))
+        add("items_visible_by_categories_generate", timed(ui.items_visible_by_categories_generate))
+        def search_index_build():
+            ui.search_index = None
+            ui.search_items("")
+        add("search_index_build", timed(search_index_build))
+        def search_typing():
+            # One search per keystroke, the time is per keystroke
+            text = "application 12"
+            for n in range(1, len(text) + 1):
+                ui.search_items(text[:n], ui.search_results_max)
+        add("search_keystroke", timed(search_typing) / len("application 12"))
+        add("load_settings", timed(ui.load_settings))
+        def save_settings():
+            # Force a write, settings are usually unchanged
+            ui.settings_changed.add(("UI", "window_size_w"))
+            ui.save_settings()
+        add("save_settings", timed(save_settings))
+
+    return {"items": len(ui.items), "items_visible": len(ui.items_visible), "timings": results}
+
+def run_size(size, repeat):
+    root = tempfile.mkdtemp(prefix="lxcc-bench-")
+    try:
+        env = dict(os.environ)
+        env["XDG_CONFIG_DIRS"] = write_corpus(os.path.join(root, "corpus"), size)
+        env["PATH"] = get_bin_path(os.path.join(root, "corpus")) + os.pathsep + env.get("PATH", os.defpath)
+        env["XDG_CACHE_HOME"] = os.path.join(root, "cache")
+        # Settings are saved in the home directory
+        env["HOME"] = os.path.join(root, "home")
+        # Measure the scan in process, not the loads from a running daemon
+        env.pop("XDG_RUNTIME_DIR", None)
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--worker", "--repeat=%s" % repeat], env=env)
+        return json.loads(output.decode("utf-8"))
+    finally:
+        shutil.rmtree(root)
+
+def summarize(timings):
+    summary = {}
+    for name in timings:
+        runs = sorted(timings[name])
+        summary[name] = {"median": runs[len(runs) // 2], "min": runs[0], "max": runs[-1], "runs": timings[name]}
+    return summary
+
+def compare(results, baseline, threshold):
+    """ Return the benchmarks slower than baseline by more than threshold"""
+    regressions = []
+    for size in results["sizes"]:
+        if (size not in baseline.get("sizes", {})):
+            continue
+        for name in results["sizes"][size]["timings"]:
+            old = baseline["sizes"][size]["timings"].get(name)
+            if (old is None):
+                continue
+            new_time = results["sizes"][size]["timings"][name]["median"]
+            old_time = old["median"]
+            if (new_time - old_time > NOISE_FLOOR and new_time > old_time * (1 + threshold)):
+                regressions.append((size, name, old_time, new_time))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark lx-control-center on synthetic corpora')
+    parser.add_argument('--sizes', default="100,1000,10000", help='Numbers of applications of the corpora, separated by commas')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each benchmark')
+    parser.add_argument('--output', help='Write the results as JSON in this file')
+    parser.add_argument('--compare', help='JSON results of a previous run, to detect regressions')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Maximum slowdown allowed with --compare (0.25 = 25%%)')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if (args.worker == True):
+        print(json.dumps(run_benchmarks(args.repeat)))
+        return 0
+
+    results = {"version": 1,
+               "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+               "python": "%s.%s.%s" % sys.version_info[:3],
+               "repeat": args.repeat,
+               "sizes": {}}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        worker = run_size(size, args.repeat)
+        results["sizes"][str(size)] = {"items": worker["items"], "items_visible": worker["items_visible"], "timings": summarize(worker["timings"])}
+        print("%s applications : %s items, %s visible" % (size, worker["items"], worker["items_visible"]))
+        timings = results["sizes"][str(size)]["timings"]
+        for name in sorted(timings):
+            print("  %-40s %10.4f s" % (name, timings[name]["median"]))
+
+    if (args.output is not None):
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if (args.compare is not None):
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for size, name, old_time, new_time in regressions:
+            print("REGRESSION %s applications, %s : %.4f s => %.4f s (+%.0f%%)" % (size, name, old_time, new_time, 100.0 * (new_time / old_time - 1)))
+        if (len(regressions) > 0):
+            return 1
+        print("No regression above %.0f%%" % (100.0 * args.threshold))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -44,3 +44,44 @@ function showOptions() {
     $('#advanced_html').hide();
     $('#options_html').fadeIn();
 }
+
+function searchItems(text) {
+    changeTitle('search:' + text);
+}
+
+function createItem(item) {
+    li = document.createElement('li');
+    li.setAttribute('class', 'item');
+    li.setAttribute('data-path', item.path);
+    li.style.backgroundImage = 'url(' + item.icon + ')';
+    li.textContent = item.name;
+    return li;
+}
+
+function showSearchResults(results) {
+    search_ul = document.getElementById('search_ul');
+    search_ul.innerHTML = '';
+    if (results.items === null) {
+        search_ul.style.display = 'none';
+        document.getElementById('advanced_ul').style.display = 'block';
+        return;
+    }
+    for (i = 0; i < results.items.length; i++)
+        search_ul.appendChild(createItem(results.items[i]));
+    document.getElementById('advanced_ul').style.display = 'none';
+    search_ul.style.display = 'block';
+}
+
+// Typing outside of a field starts a search
+document.onkeypress = function(event) {
+    search = document.getElementById('search');
+    if (document.activeElement.tagName != 'INPUT' && event.charCode > 32)
+        search.focus();
+};
+
+// Items created by createItem, including the copies of setContent
+document.addEventListener('click', function(event) {
+    path = event.target.getAttribute('data-path');
+    if (path)
+        changeTitle('exec:' + path);
+});
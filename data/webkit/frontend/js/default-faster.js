@@ -26,15 +26,14 @@ function setContent(category) {
     document.getElementById('container').style.display = 'block';
 }
 
-function addItem(title, command, category, icon) {
-    document.getElementById('ajax').innerHTML = '';
-    li = document.createElement('li');
-    li.setAttribute('id', command);
-    li.setAttribute('class', 'item');
-    li.setAttribute('onclick', 'javascript:changeTitle("exec:' + command + '")');
-    li.setAttribute('style', 'background-image: url(' + icon + ')');
-    li.innerHTML = title;
-    document.getElementById(category + '_ul').appendChild(li);
+function showCategory(page) {
+    items = document.createDocumentFragment();
+    for (i = 0; i < page.items.length; i++)
+        items.appendChild(createItem(page.items[i]));
+    ul = document.getElementById(page.category + '_ul');
+    ul.innerHTML = '';
+    ul.appendChild(items);
+    setContent(page.category);
 }
 
 function editItem(title, old_command, new_command, icon) {
@@ -68,8 +67,61 @@ function saveOptions() {
 }
 
 function back() {
+    document.getElementById('search').value = '';
     document.getElementById('main').style.display = 'block';
     document.getElementById('container').style.display = 'none';
     cat = null;
     side = false;
 }
+
+function searchItems(text) {
+    changeTitle('search:' + text);
+}
+
+function createItem(item) {
+    li = document.createElement('li');
+    li.setAttribute('class', 'item');
+    li.setAttribute('data-path', item.path);
+    li.style.backgroundImage = 'url(' + item.icon + ')';
+    li.textContent = item.name;
+    return li;
+}
+
+function showSearchResults(results) {
+    if (results.items === null) {
+        if (cat == 'search')
+            back();
+        return;
+    }
+    ul = document.createElement('ul');
+    for (i = 0; i < results.items.length; i++)
+        ul.appendChild(createItem(results.items[i]));
+    h2 = document.createElement('h2');
+    h2.textContent = results.title;
+    ajax = document.getElementById('ajax');
+    ajax.innerHTML = '';
+    ajax.appendChild(h2);
+    ajax.appendChild(ul);
+    if (!side) {
+        side = true;
+        document.getElementById('side').style.width = '190px';
+    }
+    ajax.style.display = 'block';
+    document.getElementById('main').style.display = 'none';
+    document.getElementById('container').style.display = 'block';
+    cat = 'search';
+}
+
+// Typing outside of a field starts a search
+document.onkeypress = function(event) {
+    search = document.getElementById('search');
+    if (document.activeElement.tagName != 'INPUT' && event.charCode > 32)
+        search.focus();
+};
+
+// Items created by createItem, including the copies of setContent
+document.addEventListener('click', function(event) {
+    path = event.target.getAttribute('data-path');
+    if (path)
+        changeTitle('exec:' + path);
+});
@@ -16,9 +16,14 @@ function setContent(category) {
     $('#container').show();
 }
 
-function addItem(title, command, category, icon) {
-    li = "<li id='" + command + "' class='item' onclick='javascript:changeTitle(\"exec:" + command + "\")' style='background-image: url(" + icon + ")'>" + title + "</li>";
-    $('ul#' + category + '_ul').append(li);
+function showCategory(page) {
+    items = document.createDocumentFragment();
+    for (i = 0; i < page.items.length; i++)
+        items.appendChild(createItem(page.items[i]));
+    ul = document.getElementById(page.category + '_ul');
+    ul.innerHTML = '';
+    ul.appendChild(items);
+    setContent(page.category);
 }
 
 function editItem(title, old_command, new_command, icon) {
@@ -44,6 +49,7 @@ function saveOptions() {
 }
 
 function back() {
+    document.getElementById('search').value = '';
     $('#ajax').fadeOut(50);
     $('#side').css('width', '0').fadeOut(80);
     $('#main').fadeIn();
@@ -69,3 +75,55 @@ $(function() {
         }
     });
 });
+
+function searchItems(text) {
+    changeTitle('search:' + text);
+}
+
+function createItem(item) {
+    li = document.createElement('li');
+    li.setAttribute('class', 'item');
+    li.setAttribute('data-path', item.path);
+    li.style.backgroundImage = 'url(' + item.icon + ')';
+    li.textContent = item.name;
+    return li;
+}
+
+function showSearchResults(results) {
+    if (results.items === null) {
+        if (cat == 'search')
+            back();
+        return;
+    }
+    ul = document.createElement('ul');
+    for (i = 0; i < results.items.length; i++)
+        ul.appendChild(createItem(results.items[i]));
+    h2 = document.createElement('h2');
+    h2.textContent = results.title;
+    ajax = document.getElementById('ajax');
+    ajax.innerHTML = '';
+    ajax.appendChild(h2);
+    ajax.appendChild(ul);
+    if (!side) {
+        side = true;
+        $('#main').hide();
+        $('#side').css('width', '190px').show();
+        $('#container').show();
+    }
+    $('#ajax').show();
+    cat = 'search';
+}
+
+// Typing outside of a field starts a search
+document.onkeypress = function(event) {
+    search = document.getElementById('search');
+    if (document.activeElement.tagName != 'INPUT' && event.charCode > 32)
+        search.focus();
+};
+
+// Items created by createItem, including the copies of setContent
+document.addEventListener('click', function(event) {
+    path = event.target.getAttribute('data-path');
+    if (path)
+        changeTitle('exec:' + path);
+});
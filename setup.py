@@ -12,6 +12,7 @@ setup(name='lx-control-center',
                 'LXControlCenter.widgets',
                 ],
       scripts=[
+               'lx-control-center',
                'lx-control-center-gtk2',
                'lx-control-center-gtk3',
                'lx-control-center-qt5',